@@ -0,0 +1,353 @@
+"""Кэш для данных, которые должны совпадать во всех процессах и экземплярах.
+
+Бэкенд задается CACHE_URL:
+    memory://                — LRU с TTL в памяти процесса (по умолчанию);
+    redis://[:пароль@]хост[:порт][/номер БД] — любой сервер с протоколом Redis.
+
+При промахе значение вычисляется один раз: в процессе остальные потоки ждут
+на блокировке ключа, а в Redis процессы договариваются через SET NX и ждут,
+пока значение появится. При недоступности Redis кэш работает как промах, и
+значение просто вычисляется заново.
+"""
+from collections import OrderedDict
+from contextlib import contextmanager
+from urllib.parse import urlparse
+import json
+import socket
+import threading
+import time
+import uuid
+import os
+from dotenv import load_dotenv
+
+load_dotenv()
+
+CACHE_URL = os.getenv("CACHE_URL", "memory://")
+# Сколько записей держит кэш в памяти процесса
+CACHE_MAX_ENTRIES = int(os.getenv("CACHE_MAX_ENTRIES", "1024"))
+# Префикс ключей в Redis, чтобы несколько приложений могли делить один сервер
+CACHE_KEY_PREFIX = os.getenv("CACHE_KEY_PREFIX", "whattodraw:")
+# Сколько ждать ответа Redis, секунд
+CACHE_SOCKET_TIMEOUT = float(os.getenv("CACHE_SOCKET_TIMEOUT", "0.5"))
+# Сколько другие процессы ждут, пока один вычисляет значение, секунд
+CACHE_LOCK_TIMEOUT = float(os.getenv("CACHE_LOCK_TIMEOUT", "10"))
+
+
+class CacheError(Exception):
+    """Ошибка обращения к бэкенду кэша"""
+
+
+class Cache:
+    """Общая часть бэкендов: объединение промахов и метрики"""
+
+    name = "base"
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.coalesced = 0
+        self.errors = 0
+        self._key_locks = {}
+        self._key_locks_lock = threading.Lock()
+
+    # Методы бэкенда: значение или None, запись, удаление
+    def _get(self, key):
+        raise NotImplementedError
+
+    def _set(self, key, value, ttl):
+        raise NotImplementedError
+
+    def _delete(self, key):
+        raise NotImplementedError
+
+    def get(self, key):
+        try:
+            value = self._get(key)
+        except CacheError:
+            self.errors += 1
+            value = None
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    def set(self, key, value, ttl):
+        try:
+            self._set(key, value, ttl)
+        except CacheError:
+            self.errors += 1
+
+    def delete(self, key):
+        try:
+            self._delete(key)
+        except CacheError:
+            self.errors += 1
+
+    @contextmanager
+    def _key_lock(self, key):
+        with self._key_locks_lock:
+            entry = self._key_locks.setdefault(key, [threading.Lock(), 0])
+            entry[1] += 1
+        try:
+            with entry[0]:
+                yield
+        finally:
+            with self._key_locks_lock:
+                entry[1] -= 1
+                if entry[1] == 0:
+                    del self._key_locks[key]
+
+    def get_or_set(self, key, loader, ttl):
+        """Значение из кэша; при промахе вычисляется loader() один раз на всех"""
+        value = self.get(key)
+        if value is not None:
+            return value
+
+        with self._key_lock(key):
+            try:
+                value = self._get(key)
+            except CacheError:
+                self.errors += 1
+                value = None
+            if value is not None:
+                # Пока ждали блокировку, значение вычислил другой поток
+                self.coalesced += 1
+                return value
+            return self._load(key, loader, ttl)
+
+    def _load(self, key, loader, ttl):
+        value = loader()
+        self.set(key, value, ttl)
+        return value
+
+    def metrics(self):
+        return {
+            "backend": self.name,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "coalesced": self.coalesced,
+            "errors": self.errors,
+        }
+
+
+class LocalCache(Cache):
+    """LRU с TTL в памяти процесса; значения хранятся как есть, без копирования"""
+
+    name = "memory"
+
+    def __init__(self, max_entries=CACHE_MAX_ENTRIES):
+        super().__init__()
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at is not None and expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def _set(self, key, value, ttl):
+        expires_at = time.monotonic() + ttl if ttl else None
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def _delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def metrics(self):
+        return {**super().metrics(), "entries": len(self._entries), "max_entries": self.max_entries}
+
+
+def encode_command(*args):
+    """Команда в формате RESP: массив bulk-строк"""
+    parts = [b"*%d\r\n" % len(args)]
+    for arg in args:
+        if not isinstance(arg, bytes):
+            arg = str(arg).encode("utf-8")
+        parts.append(b"$%d\r\n%s\r\n" % (len(arg), arg))
+    return b"".join(parts)
+
+
+def read_reply(stream):
+    """Прочитать один ответ RESP из файлового объекта сокета"""
+    line = stream.readline()
+    if not line.endswith(b"\r\n"):
+        raise CacheError("Соединение с Redis закрыто")
+    kind, body = line[:1], line[1:-2]
+    if kind == b"+":
+        return body.decode("utf-8")
+    if kind == b"-":
+        raise CacheError(body.decode("utf-8", "replace"))
+    if kind == b":":
+        return int(body)
+    if kind == b"$":
+        length = int(body)
+        if length < 0:
+            return None
+        data = stream.read(length + 2)
+        if len(data) != length + 2:
+            raise CacheError("Соединение с Redis закрыто")
+        return data[:-2]
+    if kind == b"*":
+        length = int(body)
+        return None if length < 0 else [read_reply(stream) for _ in range(length)]
+    raise CacheError(f"Неизвестный ответ Redis: {line!r}")
+
+
+class RedisCache(Cache):
+    """Кэш в Redis; значения хранятся в JSON. Соединение — одно на поток"""
+
+    name = "redis"
+
+    def __init__(self, url, prefix=CACHE_KEY_PREFIX, timeout=CACHE_SOCKET_TIMEOUT,
+                 lock_timeout=CACHE_LOCK_TIMEOUT):
+        super().__init__()
+        parsed = urlparse(url)
+        self.host = parsed.hostname or "localhost"
+        self.port = parsed.port or 6379
+        self.password = parsed.password
+        self.db = int(parsed.path.lstrip("/") or 0)
+        self.prefix = prefix
+        self.timeout = timeout
+        self.lock_timeout = lock_timeout
+        self._local = threading.local()
+
+    def _connection(self):
+        conn = getattr(self._local, "conn", None)
+        # Соединение, унаследованное через fork, использовать нельзя
+        if conn is not None and conn[0] == os.getpid():
+            return conn[1], conn[2]
+
+        sock = socket.create_connection((self.host, self.port), timeout=self.timeout)
+        stream = sock.makefile("rb")
+        self._local.conn = (os.getpid(), sock, stream)
+        if self.password:
+            self._call_on(sock, stream, "AUTH", self.password)
+        if self.db:
+            self._call_on(sock, stream, "SELECT", self.db)
+        return sock, stream
+
+    @staticmethod
+    def _call_on(sock, stream, *args):
+        sock.sendall(encode_command(*args))
+        return read_reply(stream)
+
+    def execute(self, *args):
+        """Выполнить команду; при сетевой ошибке соединение сбрасывается"""
+        try:
+            sock, stream = self._connection()
+            return self._call_on(sock, stream, *args)
+        except OSError as e:
+            self._close()
+            raise CacheError(f"Redis недоступен: {e}")
+        except CacheError:
+            self._close()
+            raise
+
+    def _close(self):
+        conn = getattr(self._local, "conn", None)
+        self._local.conn = None
+        if conn is not None and conn[0] == os.getpid():
+            try:
+                conn[1].close()
+            except OSError:
+                pass
+
+    def _get(self, key):
+        data = self.execute("GET", self.prefix + key)
+        return None if data is None else json.loads(data)
+
+    def _set(self, key, value, ttl):
+        data = json.dumps(value, ensure_ascii=False, separators=(",", ":"))
+        if ttl:
+            self.execute("SET", self.prefix + key, data, "PX", max(int(ttl * 1000), 1))
+        else:
+            self.execute("SET", self.prefix + key, data)
+
+    def _delete(self, key):
+        self.execute("DEL", self.prefix + key)
+
+    def _load(self, key, loader, ttl):
+        """Вычислить значение, договорившись с другими процессами через SET NX"""
+        lock_key = f"{self.prefix}lock:{key}"
+        token = uuid.uuid4().hex
+        try:
+            acquired = self.execute("SET", lock_key, token, "NX", "PX", int(self.lock_timeout * 1000))
+        except CacheError:
+            self.errors += 1
+            return loader()
+
+        if acquired is None:
+            # Значение уже вычисляет другой процесс — ждем его результат
+            deadline = time.monotonic() + self.lock_timeout
+            while time.monotonic() < deadline:
+                time.sleep(0.02)
+                try:
+                    value = self._get(key)
+                except CacheError:
+                    self.errors += 1
+                    break
+                if value is not None:
+                    self.coalesced += 1
+                    return value
+            return super()._load(key, loader, ttl)
+
+        try:
+            return super()._load(key, loader, ttl)
+        finally:
+            try:
+                if self.execute("GET", lock_key) == token.encode():
+                    self.execute("DEL", lock_key)
+            except CacheError:
+                self.errors += 1
+
+
+def create_cache(url=CACHE_URL):
+    """Создать кэш по адресу бэкенда"""
+    scheme = urlparse(url).scheme or "memory"
+    if scheme == "memory":
+        return LocalCache()
+    if scheme in ("redis", "rediss"):
+        if scheme == "rediss":
+            raise ValueError("TLS-соединения с Redis не поддерживаются")
+        return RedisCache(url)
+    raise ValueError(f"Неизвестный бэкенд кэша: {url}")
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_cache():
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = create_cache()
+    return _cache
+
+
+def configure(url):
+    """Заменить бэкенд кэша (например, в тестах)"""
+    global _cache
+    with _cache_lock:
+        _cache = create_cache(url)
+    return _cache
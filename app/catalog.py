@@ -0,0 +1,229 @@
+from sqlalchemy.orm import Session
+from fastapi import HTTPException
+from . import models
+from .cache import get_cache
+from bisect import bisect_left
+import hashlib
+import json
+import threading
+import time
+import os
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Как долго снимок каталога считается актуальным, секунд
+CATALOG_TTL = float(os.getenv("CATALOG_TTL", "300"))
+# Как часто сверять снимок с версией каталога в общем кэше, секунд
+CATALOG_VERSION_CHECK_INTERVAL = float(os.getenv("CATALOG_VERSION_CHECK_INTERVAL", "5"))
+# Сколько браузер может не перепроверять /api/catalog, секунд
+CATALOG_MAX_AGE = int(os.getenv("CATALOG_MAX_AGE", "60"))
+
+
+class CatalogSnapshot:
+    """Неизменяемый снимок каталога усложнений"""
+
+    def __init__(self, challenges):
+        # Каждое усложнение: {'id', 'category', 'name', 'description'}, по возрастанию id
+        self.challenges = tuple(sorted(challenges, key=lambda c: c['id']))
+        self.loaded_at = time.monotonic()
+
+        # Корзины усложнений по категориям
+        by_category = {}
+        for challenge in self.challenges:
+            by_category.setdefault(challenge['category'], []).append(challenge)
+        self.categories = tuple(sorted(by_category))
+        self.by_category = {name: tuple(items) for name, items in by_category.items()}
+
+        content = json.dumps(self.challenges, ensure_ascii=False, sort_keys=True)
+        self.version = hashlib.sha256(content.encode('utf-8')).hexdigest()[:16]
+        self._compact = None
+
+    @property
+    def etag(self):
+        return f'"{self.version}"'
+
+    def compact(self):
+        """Каталог для выбора усложнений на клиенте в виде готового JSON
+
+        Название категории не повторяется в каждой записи: запись
+        [id, номер категории, название, описание] ссылается на список categories.
+        """
+        if self._compact is None:
+            category_index = {name: index for index, name in enumerate(self.categories)}
+            payload = {
+                'version': self.version,
+                'categories': self.categories,
+                'challenges': [
+                    [c['id'], category_index[c['category']], c['name'], c['description']]
+                    for c in self.challenges
+                ],
+            }
+            self._compact = json.dumps(payload, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+        return self._compact
+
+    def __len__(self):
+        return len(self.challenges)
+
+    def get(self, challenge_id):
+        """Усложнение по id или None; записи упорядочены по id, поэтому двоичный поиск"""
+        index = bisect_left(self.challenges, challenge_id, key=lambda c: c['id'])
+        if index < len(self.challenges) and self.challenges[index]['id'] == challenge_id:
+            return self.challenges[index]
+        return None
+
+    def is_fresh(self):
+        return time.monotonic() - self.loaded_at < CATALOG_TTL
+
+
+# Задание на случай пустого каталога; в счетчики усложнений не попадает
+FALLBACK_CHALLENGE = {
+    'category': 'Усложнение',
+    'name': 'Базовое задание',
+    'description': 'Создайте рисунок на свободную тему'
+}
+
+CATALOG_CACHE_KEY = "catalog"
+# Версия последнего записанного каталога; хранится без TTL
+CATALOG_VERSION_KEY = "catalog:version"
+
+_snapshot = None
+_snapshot_lock = threading.Lock()
+_version_checked_at = None
+
+
+def _version_changed(snapshot):
+    """Каталог заменен в другом процессе (например, импортом)
+
+    Версия в общем кэше сверяется не чаще раза в CATALOG_VERSION_CHECK_INTERVAL.
+    """
+    global _version_checked_at
+    now = time.monotonic()
+    if _version_checked_at is not None and now - _version_checked_at < CATALOG_VERSION_CHECK_INTERVAL:
+        return False
+    _version_checked_at = now
+    version = get_cache().get(CATALOG_VERSION_KEY)
+    return version is not None and version != snapshot.version
+
+
+def _publish(snapshot):
+    """Записать снимок и его версию в общий кэш"""
+    cache = get_cache()
+    cache.set(CATALOG_CACHE_KEY, {'version': snapshot.version, 'challenges': list(snapshot.challenges)}, CATALOG_TTL)
+    cache.set(CATALOG_VERSION_KEY, snapshot.version, None)
+
+
+def load_catalog(db: Session):
+    """Прочитать каталог из БД одним запросом"""
+    rows = (
+        db.query(models.Challenge.id, models.ChallengeCategory.name,
+                 models.Challenge.name, models.Challenge.description)
+        .join(models.Challenge.category)
+    )
+    return CatalogSnapshot(
+        {
+            'id': challenge_id,
+            'category': category,
+            'name': name,
+            'description': description
+        }
+        for challenge_id, category, name, description in rows
+    )
+
+
+def get_catalog(db: Session):
+    """Получить актуальный снимок каталога, перечитав его при необходимости
+
+    Снимок хранится в памяти процесса, а его содержимое — в общем кэше, поэтому
+    все процессы видят одну и ту же версию и БД читает только один из них.
+    Замену каталога в другом процессе снимок замечает по версии в общем кэше.
+    """
+    global _snapshot
+
+    snapshot = _snapshot
+    if snapshot is not None and snapshot.is_fresh() and not _version_changed(snapshot):
+        return snapshot
+
+    with _snapshot_lock:
+        if _snapshot is not None and _snapshot is not snapshot and _snapshot.is_fresh():
+            return _snapshot
+
+        loaded = []
+
+        def load():
+            loaded.append(load_catalog(db))
+            get_cache().set(CATALOG_VERSION_KEY, loaded[0].version, None)
+            return {'version': loaded[0].version, 'challenges': list(loaded[0].challenges)}
+
+        cached = get_cache().get_or_set(CATALOG_CACHE_KEY, load, CATALOG_TTL)
+        if _snapshot is not None and _snapshot.version == cached['version']:
+            # Каталог не изменился — продлеваем текущий снимок, а не заменяем
+            # его копией: снимок, загруженный до fork, остается общим с мастером
+            _snapshot.loaded_at = time.monotonic()
+        elif loaded:
+            _snapshot = loaded[0]
+        else:
+            _snapshot = CatalogSnapshot(cached['challenges'])
+        return _snapshot
+
+
+def refresh_catalog(db: Session):
+    """Перечитать каталог из БД и сразу заменить им текущий снимок
+
+    Пока новый снимок строится, запросы продолжают получать прежний. Другие
+    процессы перейдут на него, когда заметят новую версию в общем кэше.
+    """
+    global _snapshot
+    snapshot = load_catalog(db)
+    with _snapshot_lock:
+        _snapshot = snapshot
+        _publish(snapshot)
+    return snapshot
+
+
+def invalidate_catalog():
+    """Сбросить снимок каталога, чтобы он был перечитан при следующем обращении"""
+    global _snapshot
+    with _snapshot_lock:
+        _snapshot = None
+        get_cache().delete(CATALOG_CACHE_KEY)
+
+
+def pick_entry(snapshot, rng, categories=None):
+    """Выбрать запись снимка, при необходимости только из указанных категорий"""
+    if categories is None:
+        return rng.choice(snapshot.challenges) if snapshot.challenges else None
+
+    buckets = [snapshot.by_category[name] for name in set(categories) if name in snapshot.by_category]
+    total = sum(len(bucket) for bucket in buckets)
+    if total == 0:
+        return None
+
+    # Равновероятно среди всех усложнений выбранных категорий
+    index = rng.randrange(total)
+    for bucket in sorted(buckets, key=lambda b: b[0]['id']):
+        if index < len(bucket):
+            return bucket[index]
+        index -= len(bucket)
+
+
+def pick_challenge_entry(snapshot, rng, categories=None):
+    """Выбрать запись снимка (вместе с id); 404, если выбирать не из чего"""
+    challenge = pick_entry(snapshot, rng, categories)
+    if challenge is None:
+        raise HTTPException(status_code=404, detail="Нет доступных усложнений")
+    return challenge
+
+
+def challenge_fields(challenge):
+    """Усложнение в том виде, в каком его отдает API"""
+    return {
+        'category': challenge['category'],
+        'name': challenge['name'],
+        'description': challenge['description']
+    }
+
+
+def pick_challenge(snapshot, rng, categories=None):
+    """Выбрать усложнение из снимка"""
+    return challenge_fields(pick_challenge_entry(snapshot, rng, categories))
@@ -0,0 +1,219 @@
+from bisect import bisect_left
+import random
+
+# Локальная таблица именованных цветов (CSS Color Module Level 4)
+COLOR_TABLE = (
+    ('Alice Blue', '#F0F8FF'),
+    ('Antique White', '#FAEBD7'),
+    ('Aqua', '#00FFFF'),
+    ('Aquamarine', '#7FFFD4'),
+    ('Azure', '#F0FFFF'),
+    ('Beige', '#F5F5DC'),
+    ('Bisque', '#FFE4C4'),
+    ('Black', '#000000'),
+    ('Blanched Almond', '#FFEBCD'),
+    ('Blue', '#0000FF'),
+    ('Blue Violet', '#8A2BE2'),
+    ('Brown', '#A52A2A'),
+    ('Burly Wood', '#DEB887'),
+    ('Cadet Blue', '#5F9EA0'),
+    ('Chartreuse', '#7FFF00'),
+    ('Chocolate', '#D2691E'),
+    ('Coral', '#FF7F50'),
+    ('Cornflower Blue', '#6495ED'),
+    ('Cornsilk', '#FFF8DC'),
+    ('Crimson', '#DC143C'),
+    ('Dark Blue', '#00008B'),
+    ('Dark Cyan', '#008B8B'),
+    ('Dark Goldenrod', '#B8860B'),
+    ('Dark Gray', '#A9A9A9'),
+    ('Dark Green', '#006400'),
+    ('Dark Khaki', '#BDB76B'),
+    ('Dark Magenta', '#8B008B'),
+    ('Dark Olive Green', '#556B2F'),
+    ('Dark Orange', '#FF8C00'),
+    ('Dark Orchid', '#9932CC'),
+    ('Dark Red', '#8B0000'),
+    ('Dark Salmon', '#E9967A'),
+    ('Dark Sea Green', '#8FBC8F'),
+    ('Dark Slate Blue', '#483D8B'),
+    ('Dark Slate Gray', '#2F4F4F'),
+    ('Dark Turquoise', '#00CED1'),
+    ('Dark Violet', '#9400D3'),
+    ('Deep Pink', '#FF1493'),
+    ('Deep Sky Blue', '#00BFFF'),
+    ('Dim Gray', '#696969'),
+    ('Dodger Blue', '#1E90FF'),
+    ('Fire Brick', '#B22222'),
+    ('Floral White', '#FFFAF0'),
+    ('Forest Green', '#228B22'),
+    ('Gainsboro', '#DCDCDC'),
+    ('Ghost White', '#F8F8FF'),
+    ('Gold', '#FFD700'),
+    ('Goldenrod', '#DAA520'),
+    ('Gray', '#808080'),
+    ('Green', '#008000'),
+    ('Green Yellow', '#ADFF2F'),
+    ('Honeydew', '#F0FFF0'),
+    ('Hot Pink', '#FF69B4'),
+    ('Indian Red', '#CD5C5C'),
+    ('Indigo', '#4B0082'),
+    ('Ivory', '#FFFFF0'),
+    ('Khaki', '#F0E68C'),
+    ('Lavender', '#E6E6FA'),
+    ('Lavender Blush', '#FFF0F5'),
+    ('Lawn Green', '#7CFC00'),
+    ('Lemon Chiffon', '#FFFACD'),
+    ('Light Blue', '#ADD8E6'),
+    ('Light Coral', '#F08080'),
+    ('Light Cyan', '#E0FFFF'),
+    ('Light Goldenrod Yellow', '#FAFAD2'),
+    ('Light Gray', '#D3D3D3'),
+    ('Light Green', '#90EE90'),
+    ('Light Pink', '#FFB6C1'),
+    ('Light Salmon', '#FFA07A'),
+    ('Light Sea Green', '#20B2AA'),
+    ('Light Sky Blue', '#87CEFA'),
+    ('Light Slate Gray', '#778899'),
+    ('Light Steel Blue', '#B0C4DE'),
+    ('Light Yellow', '#FFFFE0'),
+    ('Lime', '#00FF00'),
+    ('Lime Green', '#32CD32'),
+    ('Linen', '#FAF0E6'),
+    ('Maroon', '#800000'),
+    ('Medium Aquamarine', '#66CDAA'),
+    ('Medium Blue', '#0000CD'),
+    ('Medium Orchid', '#BA55D3'),
+    ('Medium Purple', '#9370DB'),
+    ('Medium Sea Green', '#3CB371'),
+    ('Medium Slate Blue', '#7B68EE'),
+    ('Medium Spring Green', '#00FA9A'),
+    ('Medium Turquoise', '#48D1CC'),
+    ('Medium Violet Red', '#C71585'),
+    ('Midnight Blue', '#191970'),
+    ('Mint Cream', '#F5FFFA'),
+    ('Misty Rose', '#FFE4E1'),
+    ('Moccasin', '#FFE4B5'),
+    ('Navajo White', '#FFDEAD'),
+    ('Navy', '#000080'),
+    ('Old Lace', '#FDF5E6'),
+    ('Olive', '#808000'),
+    ('Olive Drab', '#6B8E23'),
+    ('Orange', '#FFA500'),
+    ('Orange Red', '#FF4500'),
+    ('Orchid', '#DA70D6'),
+    ('Pale Goldenrod', '#EEE8AA'),
+    ('Pale Green', '#98FB98'),
+    ('Pale Turquoise', '#AFEEEE'),
+    ('Pale Violet Red', '#DB7093'),
+    ('Papaya Whip', '#FFEFD5'),
+    ('Peach Puff', '#FFDAB9'),
+    ('Peru', '#CD853F'),
+    ('Pink', '#FFC0CB'),
+    ('Plum', '#DDA0DD'),
+    ('Powder Blue', '#B0E0E6'),
+    ('Purple', '#800080'),
+    ('Rebecca Purple', '#663399'),
+    ('Red', '#FF0000'),
+    ('Rosy Brown', '#BC8F8F'),
+    ('Royal Blue', '#4169E1'),
+    ('Saddle Brown', '#8B4513'),
+    ('Salmon', '#FA8072'),
+    ('Sandy Brown', '#F4A460'),
+    ('Sea Green', '#2E8B57'),
+    ('Seashell', '#FFF5EE'),
+    ('Sienna', '#A0522D'),
+    ('Silver', '#C0C0C0'),
+    ('Sky Blue', '#87CEEB'),
+    ('Slate Blue', '#6A5ACD'),
+    ('Slate Gray', '#708090'),
+    ('Snow', '#FFFAFA'),
+    ('Spring Green', '#00FF7F'),
+    ('Steel Blue', '#4682B4'),
+    ('Tan', '#D2B48C'),
+    ('Teal', '#008080'),
+    ('Thistle', '#D8BFD8'),
+    ('Tomato', '#FF6347'),
+    ('Turquoise', '#40E0D0'),
+    ('Violet', '#EE82EE'),
+    ('Wheat', '#F5DEB3'),
+    ('White', '#FFFFFF'),
+    ('White Smoke', '#F5F5F5'),
+    ('Yellow', '#FFFF00'),
+    ('Yellow Green', '#9ACD32'),
+)
+
+
+def hex_to_rgb(hex_value):
+    """Преобразовать HEX-код в кортеж (r, g, b)"""
+    hex_value = hex_value.lstrip('#')
+    if len(hex_value) == 3:
+        hex_value = ''.join(ch * 2 for ch in hex_value)
+    if len(hex_value) != 6:
+        raise ValueError(f"Некорректный HEX-код цвета: #{hex_value}")
+    return tuple(int(hex_value[i:i + 2], 16) for i in (0, 2, 4))
+
+
+def rgb_to_hex(rgb):
+    """Преобразовать кортеж (r, g, b) в HEX-код"""
+    return '#' + ''.join(f"{max(0, min(255, round(c))):02X}" for c in rgb)
+
+
+_TABLE_RGB = tuple((name, hex_to_rgb(hex_value)) for name, hex_value in COLOR_TABLE)
+
+# Таблица, упорядоченная по зеленой компоненте: у нее самый большой вес в
+# расстоянии, поэтому поиск идет от ближайших по зеленому и останавливается,
+# как только одна разница по зеленому превышает лучшее найденное расстояние
+_BY_GREEN = sorted(
+    (rgb[1], index, name, rgb) for index, (name, rgb) in enumerate(_TABLE_RGB)
+)
+_GREENS = [entry[0] for entry in _BY_GREEN]
+
+
+def _distance(r, g, b, tr, tg, tb):
+    """Взвешенное евклидово расстояние ("redmean")"""
+    mean_r = (r + tr) / 2
+    return ((2 + mean_r / 256) * (r - tr) ** 2
+            + 4 * (g - tg) ** 2
+            + (2 + (255 - mean_r) / 256) * (b - tb) ** 2)
+
+
+def _nearest(rgb):
+    r, g, b = rgb
+    best = None  # (расстояние, позиция в таблице, название)
+    upper = bisect_left(_GREENS, g)
+    lower = upper - 1
+    while lower >= 0 or upper < len(_BY_GREEN):
+        # Берем кандидата, ближайшего по зеленому
+        if upper >= len(_BY_GREEN) or (lower >= 0 and g - _GREENS[lower] <= _GREENS[upper] - g):
+            green, index, name, (tr, tg, tb) = _BY_GREEN[lower]
+            lower -= 1
+        else:
+            green, index, name, (tr, tg, tb) = _BY_GREEN[upper]
+            upper += 1
+        if best is not None and 4 * (g - green) ** 2 > best[0]:
+            break
+        candidate = (_distance(r, g, b, tr, tg, tb), index, name)
+        if best is None or candidate < best:
+            best = candidate
+    return best[2]
+
+
+def nearest_color_name(hex_value):
+    """Название ближайшего цвета из локальной таблицы"""
+    return _nearest(hex_to_rgb(hex_value))
+
+
+def nearest_color_names(hex_values):
+    """Названия ближайших цветов для нескольких HEX-кодов, поиск отдельно для каждого"""
+    return [_nearest(hex_to_rgb(hex_value)) for hex_value in hex_values]
+
+
+def random_color(rng=None):
+    """Случайный цвет без обращения к внешнему сервису"""
+    rng = rng or random
+    hex_value = rgb_to_hex(tuple(rng.randrange(256) for _ in range(3)))
+    return {
+        'name': nearest_color_name(hex_value),
+        'hex': hex_value
+    }
@@ -1,14 +1,31 @@
 from fastapi import HTTPException
-from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy.orm import Session, joinedload, contains_eager
+from sqlalchemy import func, select, text
+from contextlib import contextmanager
 from . import models
+from .catalog import get_catalog, invalidate_catalog, pick_entry
+from .database import SessionLocal, replica_router
+from .decks import decks
 import random
+import tempfile
 import os
 from dotenv import load_dotenv
 
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
 # Загружаем переменные окружения
 load_dotenv()
 
+# Ключ advisory-блокировки PostgreSQL на время заполнения БД
+SEED_LOCK_KEY = 0x77546F44
+# Файл блокировки для остальных СУБД (процессы на одной машине)
+SEED_LOCK_FILE = os.getenv(
+    "SEED_LOCK_FILE", os.path.join(tempfile.gettempdir(), "whattodraw-seed.lock")
+)
+
 
 def get_data_file_path():
     """Получить путь к файлу данных из переменной окружения"""
@@ -27,9 +44,40 @@ def get_data_file_path():
     return data_file
 
 
-def get_random_challenge(db: Session):
-    """Получить случайное усложнение"""
-    random_challenge = db.query(models.Challenge).order_by(func.random()).first()
+def get_random_challenge(db: Session, client_id: str = None, weights: dict = None,
+                         categories: list = None):
+    """Получить случайное усложнение
+
+    Если передан client_id, усложнения выдаются без повторов, пока клиент
+    не пройдет весь каталог; weights задает веса категорий.
+    categories ограничивает выбор указанными категориями.
+    """
+    if client_id is not None:
+        if categories:
+            weights = {
+                name: (weights or {}).get(name, 1) if name in categories else 0
+                for name in get_catalog(db).categories
+            }
+        result = get_next_challenge_for_client(db, client_id, weights)
+        if result is not None:
+            return result
+        if weights is not None and not any(weights.get(name, 1) > 0 for name in get_catalog(db).categories):
+            # Все категории исключены весами — выбирать не из чего
+            raise HTTPException(status_code=404, detail="Нет доступных усложнений с заданными весами категорий")
+
+    if categories:
+        return get_random_challenge_in_categories(db, categories)
+
+    # Категорию подгружаем тем же запросом, чтобы не было ленивой загрузки
+    query = db.query(models.Challenge).options(joinedload(models.Challenge.category))
+    if db.get_bind().dialect.name == "sqlite":
+        # SQLite сортирует всю таблицу ради ORDER BY random(); случайное
+        # смещение от числа строк выбирает равновероятно без сортировки
+        total = select(func.count(models.Challenge.id)).scalar_subquery()
+        query = query.offset(func.abs(func.random()) % func.max(total, 1))
+    else:
+        query = query.order_by(func.random())
+    random_challenge = query.first()
 
     if not random_challenge:
         raise HTTPException(status_code=404, detail="Нет доступных усложнений")
@@ -41,6 +89,81 @@ def get_random_challenge(db: Session):
     }
 
 
+def get_random_challenge_in_categories(db: Session, categories: list):
+    """Случайное усложнение из указанных категорий
+
+    id выбирается из корзин снимка каталога, а сама запись читается по
+    первичному ключу, так что стоимость не зависит от размера категорий.
+    """
+    entry = pick_entry(get_catalog(db), random, categories)
+    challenge = get_challenge_or_primary(db, entry['id']) if entry is not None else None
+
+    if challenge is None:
+        # Снимок мог устареть — выбираем напрямую в БД по индексу категории
+        invalidate_catalog()
+        challenge = (
+            db.query(models.Challenge)
+            .join(models.Challenge.category)
+            .options(contains_eager(models.Challenge.category))
+            .filter(models.ChallengeCategory.name.in_(categories))
+            .order_by(func.random())
+            .first()
+        )
+
+    if challenge is None:
+        raise HTTPException(status_code=404, detail="Нет доступных усложнений в выбранных категориях")
+
+    return {
+        "category": challenge.category,
+        "challenge": challenge
+    }
+
+
+def get_challenge_by_id(db: Session, challenge_id: int):
+    """Получить усложнение вместе с категорией по id"""
+    return (
+        db.query(models.Challenge)
+        .options(joinedload(models.Challenge.category))
+        .filter(models.Challenge.id == challenge_id)
+        .first()
+    )
+
+
+def get_challenge_or_primary(db: Session, challenge_id: int):
+    """Усложнение по id; если его нет на реплике, читаем из основной БД
+
+    Реплика может отставать от основной БД и еще не видеть новых усложнений —
+    это не значит, что снимок каталога устарел.
+    """
+    challenge = get_challenge_by_id(db, challenge_id)
+    if challenge is None and replica_router and replica_router.is_replica(db.get_bind()):
+        primary = SessionLocal()
+        try:
+            challenge = get_challenge_by_id(primary, challenge_id)
+        finally:
+            primary.close()
+    return challenge
+
+
+def get_next_challenge_for_client(db: Session, client_id: str, weights: dict = None):
+    """Следующее усложнение из колоды клиента (без повторов)"""
+    entry = decks.draw(client_id, get_catalog(db), weights)
+    if entry is None:
+        return None
+
+    challenge = get_challenge_or_primary(db, entry['id'])
+    if challenge is None:
+        # Усложнения нет и в основной БД: снимок каталога устарел — перечитаем
+        # его при следующем обращении
+        invalidate_catalog()
+        return None
+
+    return {
+        "category": challenge.category,
+        "challenge": challenge
+    }
+
+
 def load_data_from_file(file_path: str = None):
     """Загрузить данные из текстового файла"""
     # Если путь не указан, используем переменную окружения
@@ -119,4 +242,34 @@ def create_initial_data(db: Session, data_file: str = None):
             db.rollback()
             raise
     else:
-        print("Данные уже существуют в базе.")
\ No newline at end of file
+        print("Данные уже существуют в базе.")
+
+
+@contextmanager
+def seeding_lock(db: Session):
+    """Межпроцессная блокировка на время заполнения БД"""
+    if db.get_bind().dialect.name == "postgresql":
+        # Снимается при завершении транзакции: после commit загруженных данных
+        db.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": SEED_LOCK_KEY})
+        try:
+            yield
+        finally:
+            db.rollback()
+        return
+
+    if fcntl is None:
+        yield
+        return
+
+    with open(SEED_LOCK_FILE, "a") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def seed_initial_data(db: Session, data_file: str = None):
+    """Создать начальные данные ровно один раз, даже если стартуют несколько процессов"""
+    with seeding_lock(db):
+        create_initial_data(db, data_file)
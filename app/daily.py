@@ -0,0 +1,180 @@
+from fastapi import HTTPException
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+from datetime import datetime, date, time as dt_time, timedelta, timezone
+from . import catalog, models, seeded
+from .cache import get_cache
+from .http_cache import make_etag
+import asyncio
+import json
+import threading
+import os
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Часовой пояс по умолчанию для «задания дня»
+DAILY_TIMEZONE = os.getenv("DAILY_TIMEZONE", "UTC")
+# За сколько секунд до полуночи заранее вычислять задание следующего дня
+DAILY_PRECOMPUTE_AHEAD = int(os.getenv("DAILY_PRECOMPUTE_AHEAD", "900"))
+# Как часто фоновая задача проверяет, не пора ли вычислять, секунд
+DAILY_PRECOMPUTE_INTERVAL = int(os.getenv("DAILY_PRECOMPUTE_INTERVAL", "60"))
+# Сколько разных часовых поясов запоминать для предвычисления
+DAILY_MAX_TIMEZONES = int(os.getenv("DAILY_MAX_TIMEZONES", "64"))
+
+# Сколько хранить задание дня в общем кэше, секунд
+DAILY_CACHE_TTL = int(os.getenv("DAILY_CACHE_TTL", str(2 * 24 * 3600)))
+
+# Номер поколения ключей кэша; reset_cache переходит на новые ключи
+_generation = 0
+_known_timezones = {DAILY_TIMEZONE}
+_lock = threading.Lock()
+
+
+def resolve_timezone(name: str = None):
+    """Проверить название часового пояса"""
+    name = name or DAILY_TIMEZONE
+    try:
+        return ZoneInfo(name)
+    except (ZoneInfoNotFoundError, ValueError):
+        raise HTTPException(status_code=400, detail=f"Неизвестный часовой пояс: {name}")
+
+
+def _now(now=None):
+    return now or datetime.now(timezone.utc)
+
+
+def local_day(tz: ZoneInfo, now: datetime = None):
+    """Текущая дата в часовом поясе"""
+    return _now(now).astimezone(tz).date()
+
+
+def next_rollover(tz: ZoneInfo, now: datetime = None):
+    """Момент следующей полуночи в часовом поясе"""
+    tomorrow = local_day(tz, now) + timedelta(days=1)
+    return datetime.combine(tomorrow, dt_time.min, tzinfo=tz)
+
+
+def seconds_until_rollover(tz: ZoneInfo, now: datetime = None):
+    return max(int((next_rollover(tz, now) - _now(now)).total_seconds()), 0)
+
+
+def _daily_seed(day: date):
+    return f"daily:{day.isoformat()}"
+
+
+def _build_payload(db: Session, day: date, tz_name: str):
+    triple = seeded.seeded_triple(db, _daily_seed(day))
+    return {
+        'date': day.isoformat(),
+        'timezone': tz_name,
+        **triple
+    }
+
+
+def _load_or_create(db: Session, day: date, tz_name: str):
+    """Прочитать сохраненное задание дня или вычислить и сохранить его"""
+    row = db.query(models.DailyTriple).filter_by(day=day, timezone=tz_name).first()
+    if row is not None:
+        return json.loads(row.payload)
+
+    payload = _build_payload(db, day, tz_name)
+    if payload['challenge'] == catalog.FALLBACK_CHALLENGE:
+        # Каталог пуст — не закрепляем за днем базовое задание
+        return payload
+    db.add(models.DailyTriple(
+        day=day,
+        timezone=tz_name,
+        payload=json.dumps(payload, ensure_ascii=False)
+    ))
+    try:
+        db.commit()
+    except IntegrityError:
+        # Другой процесс успел сохранить задание раньше — берем его версию
+        db.rollback()
+        row = db.query(models.DailyTriple).filter_by(day=day, timezone=tz_name).one()
+        return json.loads(row.payload)
+
+    return payload
+
+
+def _challenge_id(db: Session, day: date, payload):
+    """id усложнения из задания дня, если оно все еще есть в каталоге"""
+    try:
+        entry = seeded.seeded_challenge_entry(db, _daily_seed(day))
+    except HTTPException:
+        return None
+    # Сохраненное задание могло быть выбрано из прежней версии каталога
+    return entry['id'] if catalog.challenge_fields(entry) == payload['challenge'] else None
+
+
+def _cache_key(day: date, tz_name: str):
+    return f"daily:{_generation}:{day.isoformat()}:{tz_name}"
+
+
+def get_daily_entry(db: Session, tz_name: str, day: date):
+    """Задание дня из общего кэша; при промахе — из БД или вычисленное заново"""
+    def load():
+        payload = _load_or_create(db, day, tz_name)
+        return {
+            'payload': payload,
+            'etag': make_etag(payload),
+            'challenge_id': _challenge_id(db, day, payload)
+        }
+
+    return get_cache().get_or_set(_cache_key(day, tz_name), load, DAILY_CACHE_TTL)
+
+
+def get_daily_triple(db: Session, tz_name: str = None, now: datetime = None):
+    """Задание дня для часового пояса и сколько секунд оно еще актуально"""
+    tz = resolve_timezone(tz_name)
+    tz_name = tz.key
+
+    with _lock:
+        if tz_name not in _known_timezones and len(_known_timezones) < DAILY_MAX_TIMEZONES:
+            _known_timezones.add(tz_name)
+
+    entry = get_daily_entry(db, tz_name, local_day(tz, now))
+    return entry, seconds_until_rollover(tz, now)
+
+
+def precompute(db: Session, now: datetime = None):
+    """Заранее вычислить задание следующего дня для поясов, где скоро полночь"""
+    with _lock:
+        timezones = list(_known_timezones)
+
+    computed = []
+    for tz_name in timezones:
+        tz = ZoneInfo(tz_name)
+        if seconds_until_rollover(tz, now) > DAILY_PRECOMPUTE_AHEAD:
+            continue
+        tomorrow = local_day(tz, now) + timedelta(days=1)
+        get_daily_entry(db, tz_name, tomorrow)
+        computed.append((tz_name, tomorrow))
+    return computed
+
+
+def reset_cache():
+    """Забыть закэшированные задания; старые ключи истекут по TTL"""
+    global _generation
+    with _lock:
+        _generation += 1
+
+
+async def precompute_loop(session_factory):
+    """Фоновая задача: вычисляет задание дня до наступления полуночи"""
+    def run_once():
+        db = session_factory()
+        try:
+            precompute(db)
+        finally:
+            db.close()
+
+    while True:
+        try:
+            await run_in_threadpool(run_once)
+        except Exception as e:
+            print(f"Ошибка при предвычислении задания дня: {e}")
+        await asyncio.sleep(DAILY_PRECOMPUTE_INTERVAL)
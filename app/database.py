@@ -1,16 +1,109 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
+from sqlalchemy.pool import QueuePool
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from .replicas import ReplicaRouter
+from contextlib import contextmanager
 import os
 from dotenv import load_dotenv
 
 load_dotenv()
 
 DATABASE_URL = os.getenv("DATABASE_URL")
+# Реплики только для чтения, через запятую
+DATABASE_REPLICA_URLS = [
+    url.strip() for url in os.getenv("DATABASE_REPLICA_URLS", "").split(",") if url.strip()
+]
+# round_robin или least_connections
+DATABASE_REPLICA_BALANCING = os.getenv("DATABASE_REPLICA_BALANCING", "round_robin")
+# Как часто проверять исправность реплик, секунд
+DATABASE_REPLICA_HEALTH_INTERVAL = float(os.getenv("DATABASE_REPLICA_HEALTH_INTERVAL", "5"))
 
-engine = create_engine(DATABASE_URL)
+# Число процессов приложения (gunicorn выставляет его из gunicorn.conf.py)
+WEB_CONCURRENCY = max(int(os.getenv("WEB_CONCURRENCY", "1")), 1)
+# Размеры пула соединений на все процессы вместе; каждый процесс получает свою долю
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+
+# Сколько ждать снятия блокировки записи в SQLite, миллисекунд
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+
+SQLITE_PRAGMAS = (
+    # Читатели не блокируют писателя и друг друга, в том числе в других процессах
+    ("journal_mode", "WAL"),
+    # В режиме WAL не теряет данные при падении процесса, fsync только при checkpoint
+    ("synchronous", "NORMAL"),
+    ("busy_timeout", SQLITE_BUSY_TIMEOUT_MS),
+    ("foreign_keys", "ON"),
+    ("temp_store", "MEMORY"),
+    # Кэш страниц 16 МБ на соединение
+    ("cache_size", -16000),
+    ("mmap_size", 128 * 1024 * 1024),
+)
+
+
+def is_sqlite_file(url):
+    """SQLite с файлом на диске (не :memory:)"""
+    if url is None or not url.startswith("sqlite"):
+        return False
+    database = make_url(url).database
+    return bool(database) and database != ":memory:" and not database.startswith("file::memory:")
+
+
+def pool_options(url=DATABASE_URL, workers=WEB_CONCURRENCY):
+    """Параметры пула одного процесса"""
+    if url is None or (url.startswith("sqlite") and not is_sqlite_file(url)):
+        return {}
+    return {
+        "pool_size": max(DB_POOL_SIZE // workers, 1),
+        "max_overflow": DB_MAX_OVERFLOW // workers,
+    }
+
+
+def set_sqlite_pragmas(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    for name, value in SQLITE_PRAGMAS:
+        cursor.execute(f"PRAGMA {name}={value}")
+    cursor.close()
+
+
+def make_engine(url, **options):
+    """Движок с настройками пула для PostgreSQL или SQLite"""
+    if not is_sqlite_file(url):
+        return create_engine(url, **pool_options(url), **options)
+
+    # Как и для PostgreSQL, соединение выдается сессии целиком и возвращается
+    # в пул после нее, поэтому одновременные запросы не делят одну транзакцию.
+    # Pragma выставляются один раз при открытии соединения
+    engine = create_engine(
+        url,
+        poolclass=QueuePool,
+        **pool_options(url),
+        connect_args={"check_same_thread": False},
+        **options
+    )
+    event.listen(engine, "connect", set_sqlite_pragmas)
+    return engine
+
+
+def create_replica_engine(url):
+    if url.startswith("postgresql"):
+        # Недоступная реплика не должна надолго задерживать запрос
+        return make_engine(url, connect_args={"connect_timeout": 2})
+    return make_engine(url)
+
+
+engine = make_engine(DATABASE_URL)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+replica_router = ReplicaRouter(
+    DATABASE_REPLICA_URLS,
+    create_replica_engine,
+    balancing=DATABASE_REPLICA_BALANCING,
+    health_interval=DATABASE_REPLICA_HEALTH_INTERVAL
+) if DATABASE_REPLICA_URLS else None
+
 Base = declarative_base()
 
 def get_db():
@@ -18,4 +111,25 @@ def get_db():
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+
+def get_read_db():
+    """Сессия только для чтения: реплика, если она есть и исправна, иначе основная БД"""
+    replica = replica_router.acquire() if replica_router else None
+    db = replica.session_factory() if replica else SessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+        if replica:
+            replica_router.release(replica)
+
+
+def get_read_sessions():
+    """Фабрика читающих сессий для долгих соединений (WebSocket)
+
+    Каждая сессия берет реплику заново, поэтому соединение не остается
+    привязанным к одной реплике на все время работы.
+    """
+    return contextmanager(get_read_db)
@@ -0,0 +1,176 @@
+"""Выдача усложнений без повторов для каждого клиента.
+
+Вместо хранения перетасованного списка для клиента хранится одно целое число:
+версия каталога, seed колоды и по курсору на категорию. Перестановка внутри
+категории вычисляется на лету сетью Фейстеля, поэтому на клиента тратится
+несколько десятков байт независимо от размера каталога.
+"""
+from collections import OrderedDict
+import random
+import threading
+import os
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Сколько клиентов помнить; самые старые вытесняются
+DECK_MAX_CLIENTS = int(os.getenv("DECK_MAX_CLIENTS", "1000000"))
+
+_MASK64 = (1 << 64) - 1
+_ROUNDS = 4
+_VERSION_BITS = 32
+_SEED_BITS = 32
+
+
+def _mix(value):
+    """Финализатор splitmix64"""
+    value = (value + 0x9E3779B97F4A7C15) & _MASK64
+    value = ((value ^ (value >> 30)) * 0xBF58476D1CE4E5B9) & _MASK64
+    value = ((value ^ (value >> 27)) * 0x94D049BB133111EB) & _MASK64
+    return value ^ (value >> 31)
+
+
+class Permutation:
+    """Псевдослучайная перестановка чисел 0..size-1, заданная seed"""
+
+    def __init__(self, size, seed):
+        self.size = size
+        self.seed = seed
+        bits = max((size - 1).bit_length(), 2)
+        self.half_bits = (bits + 1) // 2
+        self.half_mask = (1 << self.half_bits) - 1
+
+    def _encrypt(self, value):
+        left = value >> self.half_bits
+        right = value & self.half_mask
+        for round_index in range(_ROUNDS):
+            key = _mix(self.seed * _ROUNDS + round_index)
+            left, right = right, left ^ (_mix(key ^ right) & self.half_mask)
+        return (left << self.half_bits) | right
+
+    def __getitem__(self, index):
+        if not 0 <= index < self.size:
+            raise IndexError(index)
+        # Обход цикла: домен сети — ближайшая степень двойки, лишние значения пропускаем
+        value = self._encrypt(index)
+        while value >= self.size:
+            value = self._encrypt(value)
+        return value
+
+
+def _version_key(snapshot):
+    return int(snapshot.version[:_VERSION_BITS // 4], 16)
+
+
+def _cursor_bits(snapshot):
+    largest = max((len(items) for items in snapshot.by_category.values()), default=0)
+    return max(largest.bit_length(), 1)
+
+
+def pack_state(snapshot, seed, cursors):
+    """Упаковать состояние клиента в одно целое число"""
+    width = _cursor_bits(snapshot)
+    state = 0
+    for cursor in reversed(cursors):
+        state = (state << width) | cursor
+    state = (state << _SEED_BITS) | seed
+    return (state << _VERSION_BITS) | _version_key(snapshot)
+
+
+def unpack_state(snapshot, state):
+    """Распаковать состояние; None, если оно относится к другой версии каталога"""
+    if state is None or state & ((1 << _VERSION_BITS) - 1) != _version_key(snapshot):
+        return None
+    state >>= _VERSION_BITS
+    seed = state & ((1 << _SEED_BITS) - 1)
+    state >>= _SEED_BITS
+
+    width = _cursor_bits(snapshot)
+    cursors = []
+    for _ in snapshot.categories:
+        cursors.append(state & ((1 << width) - 1))
+        state >>= width
+    return seed, cursors
+
+
+def _category_seed(seed, index):
+    # seed занимает младшие _SEED_BITS бит, поэтому разные пары (seed, номер
+    # категории) не совпадают при любом числе категорий
+    return _mix((index << _SEED_BITS) | seed)
+
+
+class DeckStore:
+    """Состояния колод всех клиентов одного процесса"""
+
+    def __init__(self, max_clients=DECK_MAX_CLIENTS):
+        self.max_clients = max_clients
+        self._states = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._states)
+
+    def draw(self, client_id, snapshot, weights=None):
+        """Следующее усложнение из колоды клиента
+
+        weights — необязательные веса категорий {название: вес}. Без весов
+        каждое еще не выданное усложнение равновероятно. Категории с нулевым
+        весом не выдаются.
+        """
+        if not snapshot.challenges:
+            return None
+
+        with self._lock:
+            unpacked = unpack_state(snapshot, self._states.get(client_id))
+            if unpacked is None:
+                seed, cursors = random.getrandbits(_SEED_BITS), [0] * len(snapshot.categories)
+            else:
+                seed, cursors = unpacked
+
+            index = self._choose_category(snapshot, cursors, weights)
+            if index is None:
+                # Колода пройдена целиком — начинаем новую перестановку
+                seed = (seed + 1) & ((1 << _SEED_BITS) - 1)
+                cursors = [0] * len(snapshot.categories)
+                index = self._choose_category(snapshot, cursors, weights)
+                if index is None:
+                    return None
+
+            bucket = snapshot.by_category[snapshot.categories[index]]
+            position = Permutation(len(bucket), _category_seed(seed, index))[cursors[index]]
+            cursors[index] += 1
+
+            self._states[client_id] = pack_state(snapshot, seed, cursors)
+            self._states.move_to_end(client_id)
+            while len(self._states) > self.max_clients:
+                # Вытесняем клиента, который дольше всех не обращался
+                self._states.popitem(last=False)
+
+        return bucket[position]
+
+    @staticmethod
+    def _choose_category(snapshot, cursors, weights):
+        candidates = []
+        candidate_weights = []
+        for index, name in enumerate(snapshot.categories):
+            remaining = len(snapshot.by_category[name]) - cursors[index]
+            if remaining <= 0:
+                continue
+            weight = remaining if weights is None else weights.get(name, 1)
+            if weight > 0:
+                candidates.append(index)
+                candidate_weights.append(weight)
+
+        if not candidates:
+            return None
+        return random.choices(candidates, weights=candidate_weights)[0]
+
+    def reset(self, client_id=None):
+        with self._lock:
+            if client_id is None:
+                self._states.clear()
+            else:
+                self._states.pop(client_id, None)
+
+
+decks = DeckStore()
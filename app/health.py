@@ -0,0 +1,242 @@
+"""Проверки готовности: БД, сервис цветов, снимок каталога и пул соединений.
+
+Зависимости проверяет фоновый поток раз в интервал, а /api/health/ready
+отдает последний готовый результат и сам ничего не проверяет. Для каждой
+проверки задан бюджет задержки: уложилась — "ok", не уложилась — "slow",
+ошибка — "fail". Экземпляр не готов, если не прошла обязательная проверка
+или результаты давно не обновлялись.
+"""
+from sqlalchemy import text
+from .catalog import get_catalog
+from .database import SessionLocal, engine, pool_options, replica_router
+import json
+import threading
+import time
+import os
+from datetime import datetime
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Как часто перепроверять зависимости, секунд
+HEALTH_CHECK_INTERVAL = float(os.getenv("HEALTH_CHECK_INTERVAL", "15"))
+# Через сколько секунд без обновления результаты считаются устаревшими
+HEALTH_STALE_AFTER = float(os.getenv("HEALTH_STALE_AFTER", str(HEALTH_CHECK_INTERVAL * 3)))
+# Бюджеты задержки проверок, мс
+HEALTH_BUDGET_DB_MS = float(os.getenv("HEALTH_BUDGET_DB_MS", "100"))
+HEALTH_BUDGET_COLOR_MS = float(os.getenv("HEALTH_BUDGET_COLOR_MS", "1000"))
+HEALTH_BUDGET_CATALOG_MS = float(os.getenv("HEALTH_BUDGET_CATALOG_MS", "100"))
+HEALTH_BUDGET_POOL_MS = float(os.getenv("HEALTH_BUDGET_POOL_MS", "10"))
+# Проверять ли внешний сервис цветов; каждый процесс обращается к нему раз в
+# интервал, поэтому по умолчанию выключено
+HEALTH_CHECK_COLOR = os.getenv("HEALTH_CHECK_COLOR", "false").lower() in ("1", "true", "yes")
+# Запускать ли фоновый поток проверок; без него результаты обновляет только run_once()
+HEALTH_CHECK_BACKGROUND = os.getenv("HEALTH_CHECK_BACKGROUND", "true").lower() in ("1", "true", "yes")
+
+STARTED_AT = time.monotonic()
+
+
+class Check:
+    """Одна зависимость: функция проверки, бюджет и обязательность
+
+    Функция возвращает словарь подробностей или бросает исключение. Ключ
+    'failed' в подробностях означает, что зависимость отвечает, но непригодна.
+    """
+
+    def __init__(self, name, func, budget_ms, critical=True):
+        self.name = name
+        self.func = func
+        self.budget_ms = budget_ms
+        self.critical = critical
+
+    def run(self):
+        started = time.perf_counter()
+        try:
+            details = self.func() or {}
+            error = details.pop('failed', None)
+        except Exception as e:
+            details = {}
+            error = getattr(e, 'detail', None) or str(e) or type(e).__name__
+        latency_ms = (time.perf_counter() - started) * 1000
+
+        if error:
+            status = "fail"
+        elif latency_ms > self.budget_ms:
+            status = "slow"
+        else:
+            status = "ok"
+        result = {
+            "status": status,
+            "critical": self.critical,
+            "latency_ms": round(latency_ms, 3),
+            "budget_ms": self.budget_ms,
+            **details,
+        }
+        if error:
+            result["error"] = str(error)
+        return result
+
+
+class HealthChecker:
+    """Фоновая проверка зависимостей с готовым ответом для проб"""
+
+    def __init__(self, checks, interval=HEALTH_CHECK_INTERVAL, stale_after=HEALTH_STALE_AFTER):
+        self.checks = checks
+        self.interval = interval
+        self.stale_after = stale_after
+        self.runs = 0
+        self._stop = threading.Event()
+        self._thread = None
+        # (готов ли, тело ответа, время проверки) — заменяется целиком
+        self._state = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="health-checker", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=5.0):
+        """Остановить поток и дождаться его, но не дольше timeout секунд"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.run_once()
+            except Exception as e:
+                print(f"Ошибка при проверке зависимостей: {e}")
+            self._stop.wait(self.interval)
+
+    def run_once(self):
+        """Проверить все зависимости и подготовить ответ"""
+        results = {check.name: check.run() for check in self.checks}
+        ready = all(r["status"] != "fail" for r in results.values() if r["critical"])
+        degraded = any(r["status"] != "ok" for r in results.values())
+        body = {
+            "status": "degraded" if ready and degraded else "ready" if ready else "not_ready",
+            "checked_at": datetime.now().isoformat(),
+            "checks": results,
+        }
+        data = json.dumps(body, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        self._state = (ready, data, time.monotonic())
+        self.runs += 1
+        return body
+
+    def readiness(self):
+        """(готов ли, тело ответа) по последней проверке"""
+        state = self._state
+        if state is None:
+            return False, b'{"status":"starting"}'
+        ready, data, checked_at = state
+        if time.monotonic() - checked_at > self.stale_after:
+            # Поток проверок завис или остановлен — результатам верить нельзя
+            return False, json.dumps({
+                "status": "stale",
+                "age_s": round(time.monotonic() - checked_at, 3),
+            }).encode("utf-8")
+        return ready, data
+
+
+def check_database(session_factory=SessionLocal):
+    """SELECT 1 в основной БД через отдельную сессию"""
+    db = session_factory()
+    try:
+        db.execute(text("SELECT 1"))
+        return {"dialect": db.get_bind().dialect.name}
+    finally:
+        db.close()
+
+
+def check_catalog(session_factory=SessionLocal):
+    """Снимок каталога загружен и не пуст"""
+    db = session_factory()
+    try:
+        snapshot = get_catalog(db)
+    finally:
+        db.close()
+    details = {
+        "version": snapshot.version,
+        "challenges": len(snapshot),
+        "age_s": round(time.monotonic() - snapshot.loaded_at, 3),
+    }
+    if not len(snapshot):
+        details["failed"] = "Каталог усложнений пуст"
+    return details
+
+
+def check_pool():
+    """Свободные соединения в пуле основной БД"""
+    pool = engine.pool
+    options = pool_options()
+    details = {"pool": type(pool).__name__, "state": pool.status()}
+    if options and hasattr(pool, "checkedout"):
+        # Предел берется из тех же настроек, с которыми создан пул
+        limit = options["pool_size"] + options["max_overflow"]
+        details.update(checked_out=pool.checkedout(), limit=limit)
+        if pool.checkedout() >= limit:
+            details["failed"] = "Все соединения пула заняты"
+    return details
+
+
+def check_replicas():
+    """Хотя бы одна реплика исправна (иначе чтение идет в основную БД)"""
+    replicas = replica_router.metrics()["replicas"]
+    healthy = sum(1 for replica in replicas if replica["healthy"])
+    details = {"healthy": healthy, "total": len(replicas)}
+    if not healthy:
+        details["failed"] = "Нет исправных реплик"
+    return details
+
+
+def default_checks(color_source=None, session_factory=SessionLocal):
+    """Проверки приложения
+
+    color_source — функция получения случайного цвета, session_factory —
+    фабрика сессий основной БД.
+    """
+    checks = [
+        Check("database", lambda: check_database(session_factory), HEALTH_BUDGET_DB_MS),
+        Check("catalog", lambda: check_catalog(session_factory), HEALTH_BUDGET_CATALOG_MS),
+        # Пул бывает занят кратковременно под нагрузкой, а внешний сервис
+        # недоступен сразу всем экземплярам — это не повод выводить экземпляр
+        # из балансировки
+        Check("pool", check_pool, HEALTH_BUDGET_POOL_MS, critical=False),
+    ]
+    if color_source is not None and HEALTH_CHECK_COLOR:
+        checks.append(Check("color_source", lambda: {"color": color_source()["hex"]},
+                            HEALTH_BUDGET_COLOR_MS, critical=False))
+    if replica_router:
+        checks.append(Check("replicas", check_replicas, HEALTH_BUDGET_DB_MS, critical=False))
+    return checks
+
+
+checker = None
+
+
+def start(color_source=None, session_factory=SessionLocal):
+    """Запустить фоновую проверку зависимостей"""
+    global checker
+    if checker is None:
+        checker = HealthChecker(default_checks(color_source, session_factory))
+        if HEALTH_CHECK_BACKGROUND:
+            checker.start()
+    return checker
+
+
+def stop():
+    global checker
+    if checker is not None:
+        checker.stop()
+        checker = None
+
+
+def readiness():
+    if checker is None:
+        return False, b'{"status":"starting"}'
+    return checker.readiness()
+
+
+def uptime():
+    return time.monotonic() - STARTED_AT
@@ -0,0 +1,258 @@
+"""История сгенерированных цветов, слов и усложнений.
+
+Запись идет через очередь в памяти: обработчик запроса только кладет строку в
+очередь, а фоновый поток вставляет строки пачками — по размеру пачки или по
+истечении интервала. В PostgreSQL таблица секционирована по месяцам, и
+устаревшие данные удаляются целыми секциями.
+"""
+from sqlalchemy import insert, delete, text
+from datetime import datetime, timedelta
+from . import models
+import queue
+import re
+import threading
+import time
+import os
+from dotenv import load_dotenv
+
+load_dotenv()
+
+HISTORY_ENABLED = os.getenv("HISTORY_ENABLED", "true").lower() in ("1", "true", "yes")
+# Сколько строк вставлять за раз
+HISTORY_BATCH_SIZE = int(os.getenv("HISTORY_BATCH_SIZE", "500"))
+# Максимальная задержка записи, секунд
+HISTORY_FLUSH_INTERVAL = float(os.getenv("HISTORY_FLUSH_INTERVAL", "1.0"))
+# Размер очереди; при переполнении новые записи отбрасываются
+HISTORY_QUEUE_SIZE = int(os.getenv("HISTORY_QUEUE_SIZE", "10000"))
+# Срок хранения истории, дней (по умолчанию больше 5 лет)
+HISTORY_RETENTION_DAYS = int(os.getenv("HISTORY_RETENTION_DAYS", "1830"))
+# На сколько месяцев вперед создавать секции
+HISTORY_PARTITIONS_AHEAD = int(os.getenv("HISTORY_PARTITIONS_AHEAD", "2"))
+# Как часто обслуживать секции и срок хранения, секунд
+HISTORY_MAINTENANCE_INTERVAL = float(os.getenv("HISTORY_MAINTENANCE_INTERVAL", "3600"))
+
+TABLE_NAME = models.GenerationHistory.__tablename__
+_PARTITION_RE = re.compile(rf"^{TABLE_NAME}_y(\d{{4}})m(\d{{2}})$")
+_STOP = object()
+
+
+def _month_start(moment):
+    return datetime(moment.year, moment.month, 1)
+
+
+def _next_month(moment):
+    return datetime(moment.year + moment.month // 12, moment.month % 12 + 1, 1)
+
+
+def partition_name(month):
+    return f"{TABLE_NAME}_y{month.year:04d}m{month.month:02d}"
+
+
+def ensure_partitions(engine, now=None, months_ahead=HISTORY_PARTITIONS_AHEAD):
+    """Создать месячные секции с текущего месяца на months_ahead вперед"""
+    if engine.dialect.name != "postgresql":
+        return []
+
+    month = _month_start(now or datetime.utcnow())
+    created = []
+    with engine.begin() as conn:
+        conn.execute(text(
+            f"CREATE TABLE IF NOT EXISTS {TABLE_NAME}_default PARTITION OF {TABLE_NAME} DEFAULT"
+        ))
+        for _ in range(months_ahead + 1):
+            upper = _next_month(month)
+            conn.execute(text(
+                f"CREATE TABLE IF NOT EXISTS {partition_name(month)} PARTITION OF {TABLE_NAME} "
+                f"FOR VALUES FROM ('{month:%Y-%m-%d}') TO ('{upper:%Y-%m-%d}')"
+            ))
+            created.append(partition_name(month))
+            month = upper
+    return created
+
+
+def apply_retention(engine, now=None, retention_days=HISTORY_RETENTION_DAYS):
+    """Удалить историю старше срока хранения
+
+    В PostgreSQL целиком удаляются секции, полностью вышедшие за срок, что
+    не оставляет «мертвых» строк; в остальных СУБД строки удаляются по дате.
+    """
+    cutoff = (now or datetime.utcnow()) - timedelta(days=retention_days)
+    table = models.GenerationHistory.__table__
+
+    with engine.begin() as conn:
+        if engine.dialect.name != "postgresql":
+            # БД, созданная до появления индекса по дате, получает его здесь
+            for index in table.indexes:
+                index.create(conn, checkfirst=True)
+            conn.execute(delete(table).where(table.c.created_at < cutoff))
+            return []
+
+        partitions = conn.execute(text(
+            "SELECT child.relname FROM pg_inherits "
+            "JOIN pg_class parent ON pg_inherits.inhparent = parent.oid "
+            "JOIN pg_class child ON pg_inherits.inhrelid = child.oid "
+            "WHERE parent.relname = :table"
+        ), {"table": TABLE_NAME}).scalars().all()
+
+        dropped = []
+        for name in partitions:
+            match = _PARTITION_RE.match(name)
+            if match and _next_month(datetime(int(match[1]), int(match[2]), 1)) <= cutoff:
+                conn.execute(text(f"DROP TABLE IF EXISTS {name}"))
+                dropped.append(name)
+
+        conn.execute(text(
+            f"DELETE FROM {TABLE_NAME}_default WHERE created_at < :cutoff"
+        ), {"cutoff": cutoff})
+        return dropped
+
+
+class HistoryWriter:
+    """Фоновая пакетная запись истории"""
+
+    def __init__(self, session_factory, batch_size=HISTORY_BATCH_SIZE,
+                 flush_interval=HISTORY_FLUSH_INTERVAL, max_queue=HISTORY_QUEUE_SIZE,
+                 maintenance_interval=HISTORY_MAINTENANCE_INTERVAL):
+        self.session_factory = session_factory
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.maintenance_interval = maintenance_interval
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._thread = None
+        self._last_maintenance = None
+
+        self.written = 0
+        self.dropped = 0
+        self.failed = 0
+        self.batches = 0
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="history-writer", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=10.0):
+        """Дописать все накопленное и остановить поток"""
+        if self._thread is None:
+            return
+        self._queue.put(_STOP)
+        self._thread.join(timeout)
+        self._thread = None
+
+    def record(self, kind, color=None, word=None, challenge=None, challenge_id=None):
+        """Поставить запись в очередь; никогда не блокирует запрос"""
+        challenge = challenge or {}
+        row = {
+            "created_at": datetime.utcnow(),
+            "kind": kind,
+            "color_name": color["name"] if color else None,
+            "color_hex": color["hex"] if color else None,
+            "word": word,
+            "challenge_id": challenge_id if challenge_id is not None else challenge.get("id"),
+            "challenge_name": challenge.get("name"),
+            "category": challenge.get("category"),
+        }
+        try:
+            self._queue.put_nowait(row)
+        except queue.Full:
+            self.dropped += 1
+
+    def _run(self):
+        # Секции должны существовать до первой вставки
+        self._maybe_maintain()
+        batch = []
+        deadline = None
+        while True:
+            timeout = None if deadline is None else max(deadline - time.monotonic(), 0)
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                item = None
+
+            if item is _STOP:
+                self._drain(batch)
+                self._flush(batch)
+                return
+
+            if item is not None:
+                batch.append(item)
+                if deadline is None:
+                    deadline = time.monotonic() + self.flush_interval
+
+            if len(batch) >= self.batch_size or (deadline is not None and time.monotonic() >= deadline):
+                self._flush(batch)
+                batch = []
+                deadline = None
+                self._maybe_maintain()
+
+    def _drain(self, batch):
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                return
+            if item is not _STOP:
+                batch.append(item)
+
+    def _flush(self, batch):
+        for start in range(0, len(batch), self.batch_size):
+            rows = batch[start:start + self.batch_size]
+            db = self.session_factory()
+            try:
+                db.execute(insert(models.GenerationHistory), rows)
+                db.commit()
+                self.written += len(rows)
+                self.batches += 1
+            except Exception as e:
+                db.rollback()
+                self.failed += len(rows)
+                print(f"Ошибка при записи истории: {e}")
+            finally:
+                db.close()
+
+    def _maybe_maintain(self):
+        now = time.monotonic()
+        if self._last_maintenance is not None and now - self._last_maintenance < self.maintenance_interval:
+            return
+        self._last_maintenance = now
+        db = self.session_factory()
+        try:
+            engine = db.get_bind()
+            ensure_partitions(engine)
+            apply_retention(engine)
+        except Exception as e:
+            print(f"Ошибка при обслуживании истории: {e}")
+        finally:
+            db.close()
+
+    def metrics(self):
+        return {
+            "queued": self._queue.qsize(),
+            "written": self.written,
+            "dropped": self.dropped,
+            "failed": self.failed,
+            "batches": self.batches,
+        }
+
+
+writer = None
+
+
+def start(session_factory):
+    """Запустить фоновую запись истории, если она включена"""
+    global writer
+    if HISTORY_ENABLED and writer is None:
+        writer = HistoryWriter(session_factory)
+        writer.start()
+    return writer
+
+
+def stop():
+    global writer
+    if writer is not None:
+        writer.stop()
+        writer = None
+
+
+def record(kind, **fields):
+    if writer is not None:
+        writer.record(kind, **fields)
@@ -0,0 +1,41 @@
+from fastapi import Request
+from fastapi.responses import JSONResponse, Response
+import hashlib
+import json
+
+
+def make_etag(payload):
+    """Сильный ETag, вычисленный по содержимому ответа"""
+    content = json.dumps(payload, ensure_ascii=False, sort_keys=True, separators=(',', ':'))
+    return '"' + hashlib.sha256(content.encode('utf-8')).hexdigest()[:32] + '"'
+
+
+def etag_matches(request: Request, etag: str):
+    """Проверить заголовок If-None-Match"""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    candidates = [value.strip() for value in header.split(",")]
+    return etag in candidates
+
+
+def cached_json_response(request: Request, payload, max_age: int, etag: str = None):
+    """JSON-ответ с ETag и Cache-Control; 304, если у клиента актуальная версия
+
+    payload может быть уже сериализованным JSON (bytes) — тогда etag обязателен.
+    """
+    etag = etag or make_etag(payload)
+    headers = {
+        "ETag": etag,
+        "Cache-Control": f"public, max-age={max(int(max_age), 0)}",
+    }
+
+    if etag_matches(request, etag):
+        return Response(status_code=304, headers=headers)
+
+    if isinstance(payload, bytes):
+        return Response(content=payload, media_type="application/json", headers=headers)
+
+    return JSONResponse(content=payload, headers=headers)
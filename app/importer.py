@@ -0,0 +1,291 @@
+"""Потоковый импорт усложнений через /api/admin/import.
+
+Тело запроса разбирается по строкам по мере поступления, в одном из форматов:
+    text   — как data.txt: «Категория: имя» и строки «- название: описание»;
+    ndjson — по объекту {"category", "name", "description"} на строке.
+Корректные строки пишутся в БД пачками внутри одной транзакции, ошибочные
+попадают в отчет с номером строки. После commit снимок каталога заменяется
+целиком, поэтому запросы видят либо прежний каталог, либо новый. Остальные
+процессы переходят на него по версии в общем кэше (см. app/catalog.py).
+"""
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+from . import models
+from .catalog import refresh_catalog
+import json
+import queue
+import os
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Сколько усложнений вставлять одним запросом
+IMPORT_BATCH_SIZE = int(os.getenv("IMPORT_BATCH_SIZE", "1000"))
+# Сколько ошибок перечислять в отчете (считаются все)
+IMPORT_MAX_ERRORS = int(os.getenv("IMPORT_MAX_ERRORS", "100"))
+# Максимальная длина строки, байт; более длинные строки отбрасываются целиком
+IMPORT_MAX_LINE_BYTES = int(os.getenv("IMPORT_MAX_LINE_BYTES", "65536"))
+# Сколько принятых кусков тела может ждать разбора; дальше чтение тела приостанавливается
+IMPORT_QUEUE_CHUNKS = int(os.getenv("IMPORT_QUEUE_CHUNKS", "64"))
+
+IMPORT_FORMATS = ("text", "ndjson")
+# Ограничения колонок models.Challenge и models.ChallengeCategory
+MAX_NAME_LENGTH = 100
+
+CATEGORY_PREFIX = "Категория:"
+
+
+class ImportAborted(Exception):
+    """Тело запроса не дочитано до конца (клиент отключился)"""
+
+
+_ABORT = object()
+
+
+class ChunkQueue:
+    """Куски тела от event loop к потоку импорта с ограниченной очередью"""
+
+    def __init__(self, maxsize=IMPORT_QUEUE_CHUNKS):
+        self._queue = queue.Queue(maxsize=maxsize)
+
+    async def put(self, chunk):
+        try:
+            self._queue.put_nowait(chunk)
+        except queue.Full:
+            # Импорт не успевает за клиентом — ждем, не блокируя event loop
+            await run_in_threadpool(self._queue.put, chunk)
+
+    async def close(self):
+        await self.put(None)
+
+    async def abort(self):
+        await self.put(_ABORT)
+
+    def __iter__(self):
+        while True:
+            chunk = self._queue.get()
+            if chunk is None:
+                return
+            if chunk is _ABORT:
+                raise ImportAborted()
+            yield chunk
+
+
+def iter_lines(chunks, max_line_bytes=IMPORT_MAX_LINE_BYTES):
+    """Строки из последовательности кусков байт: (номер строки, текст или None)
+
+    None означает слишком длинную строку или строку не в UTF-8. В памяти
+    держится не больше одной строки.
+    """
+    pending = b""
+    skipping = False
+    line_no = 0
+
+    def decode(raw):
+        # Перевод строки в UTF-8 не встречается внутри многобайтных символов,
+        # поэтому каждую строку можно декодировать отдельно
+        try:
+            return raw.decode("utf-8")
+        except UnicodeDecodeError:
+            return None
+
+    for chunk in chunks:
+        start = 0
+        while True:
+            end = chunk.find(b"\n", start)
+            if end < 0:
+                break
+            line_no += 1
+            raw = None if skipping else pending + chunk[start:end]
+            skipping = False
+            yield line_no, decode(raw) if raw is not None and len(raw) <= max_line_bytes else None
+            pending = b""
+            start = end + 1
+
+        if not skipping:
+            pending += chunk[start:]
+            if len(pending) > max_line_bytes:
+                pending = b""
+                skipping = True
+
+    if skipping or pending:
+        yield line_no + 1, None if skipping else decode(pending)
+
+
+class ChallengeImporter:
+    """Разбор строк, проверка и пакетная вставка в одной транзакции"""
+
+    def __init__(self, db: Session, fmt="text", replace=False,
+                 batch_size=None, max_errors=None):
+        if fmt not in IMPORT_FORMATS:
+            raise ValueError(f"Неизвестный формат импорта: {fmt}")
+        self.db = db
+        self.fmt = fmt
+        self.replace = replace
+        # Значения по умолчанию читаются при создании, а не при импорте модуля
+        self.batch_size = batch_size or IMPORT_BATCH_SIZE
+        self.max_errors = IMPORT_MAX_ERRORS if max_errors is None else max_errors
+
+        self.lines = 0
+        self.imported = 0
+        self.categories_created = 0
+        self.error_count = 0
+        self.errors = []
+
+        self._batch = []
+        self._current_category = None
+
+        if replace:
+            # Старый каталог удаляется в той же транзакции, что и вставка нового
+            db.query(models.Challenge).delete(synchronize_session=False)
+            db.query(models.ChallengeCategory).delete(synchronize_session=False)
+            # Удаленные объекты, уже загруженные в сессию, иначе конфликтуют
+            # с новыми категориями, получившими те же id
+            db.expunge_all()
+            self._category_ids = {}
+        else:
+            self._category_ids = {
+                name: category_id
+                for category_id, name in db.query(models.ChallengeCategory.id, models.ChallengeCategory.name)
+            }
+
+    def error(self, line_no, message):
+        self.error_count += 1
+        if len(self.errors) < self.max_errors:
+            self.errors.append({"line": line_no, "error": message})
+
+    def feed(self, line_no, line):
+        """Обработать одну строку тела запроса"""
+        self.lines = line_no
+        if line is None:
+            self.error(line_no, f"Строка длиннее {IMPORT_MAX_LINE_BYTES} байт или не в UTF-8")
+            return
+
+        line = line.strip()
+        if not line:
+            return
+        if self.fmt == "ndjson":
+            self._feed_ndjson(line_no, line)
+        else:
+            self._feed_text(line_no, line)
+
+    def _feed_text(self, line_no, line):
+        if line.startswith(CATEGORY_PREFIX):
+            name = line[len(CATEGORY_PREFIX):].strip()
+            self._current_category = name or None
+            if not name:
+                self.error(line_no, "Пустое название категории")
+            return
+
+        if not line.startswith("-"):
+            self.error(line_no, "Ожидается «Категория: ...» или «- название: описание»")
+            return
+        if self._current_category is None:
+            self.error(line_no, "Усложнение вне категории")
+            return
+
+        name, sep, description = line[1:].partition(":")
+        if not sep:
+            self.error(line_no, "Нет описания: ожидается «- название: описание»")
+            return
+        self._add(line_no, self._current_category, name.strip(), description.strip())
+
+    def _feed_ndjson(self, line_no, line):
+        try:
+            record = json.loads(line)
+        except ValueError as e:
+            self.error(line_no, f"Некорректный JSON: {e}")
+            return
+        if not isinstance(record, dict):
+            self.error(line_no, "Ожидается объект JSON")
+            return
+
+        category = record.get("category")
+        name = record.get("name")
+        description = record.get("description")
+        if not isinstance(category, str) or not isinstance(name, str) or \
+                not isinstance(description, (str, type(None))):
+            self.error(line_no, "Поля category и name — строки, description — строка или null")
+            return
+        self._add(line_no, category.strip(), name.strip(), description.strip() if description is not None else None)
+
+    def _add(self, line_no, category, name, description):
+        if not category:
+            self.error(line_no, "Пустое название категории")
+            return
+        if not name:
+            self.error(line_no, "Пустое название усложнения")
+            return
+        if len(category) > MAX_NAME_LENGTH or len(name) > MAX_NAME_LENGTH:
+            self.error(line_no, f"Название длиннее {MAX_NAME_LENGTH} символов")
+            return
+
+        self._batch.append({
+            "name": name,
+            "description": description,
+            "category_id": self._category_id(category),
+        })
+        if len(self._batch) >= self.batch_size:
+            self.flush()
+
+    def _category_id(self, name):
+        category_id = self._category_ids.get(name)
+        if category_id is None:
+            category = models.ChallengeCategory(name=name)
+            self.db.add(category)
+            self.db.flush()
+            category_id = self._category_ids[name] = category.id
+            self.categories_created += 1
+        return category_id
+
+    def flush(self):
+        """Вставить накопленную пачку (без commit)"""
+        if self._batch:
+            self.db.execute(insert(models.Challenge), self._batch)
+            self.imported += len(self._batch)
+            self._batch = []
+
+    def finish(self, strict=False):
+        """Зафиксировать импорт и заменить каталог; при strict любая ошибка отменяет импорт"""
+        self.flush()
+        committed = not (strict and self.error_count) and not (self.replace and not self.imported)
+        catalog_version = None
+        if committed:
+            self.db.commit()
+            # Каталог читается из той же основной БД, куда только что записан импорт
+            catalog_version = refresh_catalog(self.db).version
+        else:
+            self.db.rollback()
+        return self.report(committed, catalog_version)
+
+    def report(self, committed, catalog_version=None):
+        return {
+            "format": self.fmt,
+            "replace": self.replace,
+            "committed": committed,
+            "lines": self.lines,
+            "imported": self.imported if committed else 0,
+            "categories_created": self.categories_created if committed else 0,
+            "error_count": self.error_count,
+            "errors": self.errors,
+            "catalog_version": catalog_version,
+        }
+
+
+def import_stream(db: Session, chunks, fmt="text", replace=False, strict=False):
+    """Импортировать усложнения из последовательности кусков тела запроса"""
+    try:
+        importer = ChallengeImporter(db, fmt, replace)
+        for line_no, line in iter_lines(chunks):
+            importer.feed(line_no, line)
+        return importer.finish(strict)
+    except ImportAborted:
+        db.rollback()
+        raise
+    except Exception:
+        db.rollback()
+        # Дочитываем тело, чтобы не оставить отправителя ждать
+        for _ in chunks:
+            pass
+        raise
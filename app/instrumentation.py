@@ -0,0 +1,194 @@
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from contextlib import contextmanager
+from contextvars import ContextVar
+import threading
+import time
+import os
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Отдавать ли статистику запросов к БД в заголовках ответа
+DEBUG = os.getenv("DEBUG", "").lower() in ("1", "true", "yes")
+
+# Допустимое число SQL-запросов на один HTTP-запрос по эндпоинтам
+QUERY_BUDGETS = {
+    "/": 1,
+    "/api/random-color": 0,
+    "/api/random-word": 0,
+    "/api/palette": 0,
+    "/api/random-challenge": 1,
+    "/api/random-all": 1,
+    "/api/catalog": 1,
+    "/api/health": 0,
+    "/api/health/live": 0,
+    "/api/health/ready": 0,
+    "/api/metrics": 0,
+}
+
+
+class QueryStats:
+    """Статистика SQL-запросов в рамках одного HTTP-запроса"""
+
+    def __init__(self):
+        self.count = 0
+        self.total_time = 0.0
+        self.slowest_time = 0.0
+        self.slowest_statement = None
+        self.statements = []
+
+    def add(self, statement, duration):
+        self.count += 1
+        self.total_time += duration
+        self.statements.append(statement)
+        if duration >= self.slowest_time:
+            self.slowest_time = duration
+            self.slowest_statement = statement
+
+    def as_dict(self):
+        return {
+            "queries": self.count,
+            "db_time_ms": round(self.total_time * 1000, 3),
+            "slowest_ms": round(self.slowest_time * 1000, 3),
+            "slowest_statement": self.slowest_statement,
+        }
+
+
+class QueryBudgetExceeded(AssertionError):
+    """Эндпоинт выполнил больше SQL-запросов, чем допускает бюджет"""
+
+
+_current_stats = ContextVar("query_stats", default=None)
+
+# Сборщики, активные вне контекста запроса (например, в тестах): (статистика, поток)
+_collectors = []
+_collectors_lock = threading.Lock()
+
+# Накопленные метрики по эндпоинтам
+_endpoint_metrics = {}
+_metrics_lock = threading.Lock()
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    start_times = conn.info.get("query_start_time")
+    if not start_times:
+        return
+    duration = time.perf_counter() - start_times.pop()
+
+    stats = _current_stats.get()
+    if stats is not None:
+        stats.add(statement, duration)
+
+    if _collectors:
+        # Фоновые задачи (история, счетчики, проверки) выполняются вне
+        # контекста HTTP-запроса и в других потоках — их запросы не считаются
+        thread_id = threading.get_ident()
+        with _collectors_lock:
+            for collector, owner in _collectors:
+                if stats is not None or owner == thread_id:
+                    collector.add(statement, duration)
+
+
+def start_request():
+    """Начать сбор статистики для текущего запроса"""
+    stats = QueryStats()
+    token = _current_stats.set(stats)
+    return stats, token
+
+
+def finish_request(path, stats, token):
+    """Завершить сбор статистики и учесть её в метриках эндпоинта
+
+    path — шаблон маршрута; None (маршрут не найден) в метриках не учитывается.
+    """
+    _current_stats.reset(token)
+    if path is None:
+        return
+
+    with _metrics_lock:
+        metrics = _endpoint_metrics.setdefault(path, {
+            "requests": 0,
+            "queries": 0,
+            "max_queries": 0,
+            "db_time_ms": 0.0,
+            "slowest_ms": 0.0,
+            "slowest_statement": None,
+        })
+        metrics["requests"] += 1
+        metrics["queries"] += stats.count
+        metrics["max_queries"] = max(metrics["max_queries"], stats.count)
+        metrics["db_time_ms"] += stats.total_time * 1000
+        if stats.slowest_time * 1000 >= metrics["slowest_ms"] and stats.slowest_statement:
+            metrics["slowest_ms"] = stats.slowest_time * 1000
+            metrics["slowest_statement"] = stats.slowest_statement
+
+    budget = QUERY_BUDGETS.get(path)
+    if DEBUG and budget is not None and stats.count > budget:
+        print(f"Превышен бюджет SQL-запросов для {path}: {stats.count} > {budget}")
+
+
+def response_headers(stats):
+    """Заголовки со статистикой запросов к БД (только в режиме отладки)"""
+    if not DEBUG:
+        return {}
+    db_time = stats.total_time * 1000
+    return {
+        "X-DB-Query-Count": str(stats.count),
+        "X-DB-Time-Ms": f"{db_time:.3f}",
+        "X-DB-Slowest-Ms": f"{stats.slowest_time * 1000:.3f}",
+        "Server-Timing": f'db;dur={db_time:.3f};desc="{stats.count} queries"',
+    }
+
+
+def get_metrics():
+    """Метрики SQL-запросов по эндпоинтам"""
+    with _metrics_lock:
+        result = {}
+        for path, metrics in _endpoint_metrics.items():
+            requests_count = metrics["requests"]
+            result[path] = {
+                **metrics,
+                "db_time_ms": round(metrics["db_time_ms"], 3),
+                "slowest_ms": round(metrics["slowest_ms"], 3),
+                "avg_queries": round(metrics["queries"] / requests_count, 3),
+                "budget": QUERY_BUDGETS.get(path),
+            }
+        return result
+
+
+def reset_metrics():
+    with _metrics_lock:
+        _endpoint_metrics.clear()
+
+
+@contextmanager
+def capture_queries():
+    """Собрать SQL-запросы, выполненные внутри блока в текущем потоке и в HTTP-запросах"""
+    stats = QueryStats()
+    entry = (stats, threading.get_ident())
+    with _collectors_lock:
+        _collectors.append(entry)
+    try:
+        yield stats
+    finally:
+        with _collectors_lock:
+            _collectors.remove(entry)
+
+
+@contextmanager
+def query_budget(limit):
+    """Упасть, если внутри блока выполнено больше limit SQL-запросов"""
+    with capture_queries() as stats:
+        yield stats
+    if stats.count > limit:
+        statements = "\n".join(stats.statements)
+        raise QueryBudgetExceeded(
+            f"Выполнено {stats.count} SQL-запросов при бюджете {limit}:\n{statements}"
+        )
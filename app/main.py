@@ -1,17 +1,38 @@
-from fastapi import FastAPI, Request, Depends, HTTPException
-from fastapi.responses import HTMLResponse
+from fastapi import FastAPI, Request, Depends, HTTPException, Query, Header, WebSocket, WebSocketDisconnect
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import HTMLResponse, JSONResponse, Response
 from fastapi.templating import Jinja2Templates
 from fastapi.staticfiles import StaticFiles
 from sqlalchemy.orm import Session
 from app import crud
-from app.database import engine, get_db, SessionLocal
+from app.database import engine, get_db, get_read_db, get_read_sessions, SessionLocal, replica_router
 from app import models
+from app import instrumentation
+from app import seeded
+from app import daily
+from app import search
+from app import history
+from app import stats
+from app import words
+from app import workers
+from app import health
+from app import importer
+from app.colors import random_color
+from app.palette import build_palette
+from app.catalog import get_catalog, challenge_fields, CATALOG_MAX_AGE, FALLBACK_CHALLENGE
+from app.cache import get_cache
+from app.http_cache import cached_json_response
+import asyncio
+import json
+import math
+import secrets
+import uuid
 from pydantic import BaseModel
+from typing import Optional, List, Dict
 import requests
 import random
 import os
-from mimesis import Text
-from datetime import datetime
+from datetime import datetime, timedelta
 import sys
 import pathlib
 
@@ -20,6 +41,7 @@ sys.path.append(str(pathlib.Path(__file__).parent.parent))
 
 # Создаем таблицы
 models.Base.metadata.create_all(bind=engine)
+models.create_missing_indexes(engine)
 
 app = FastAPI(title="Triple Generator: Цвет + Слово + Усложнение")
 
@@ -28,6 +50,22 @@ templates = Jinja2Templates(directory="templates")
 app.mount("/static", StaticFiles(directory="static"), name="static")
 
 
+@app.middleware("http")
+async def db_query_stats_middleware(request: Request, call_next):
+    """Подсчет SQL-запросов, времени БД и самого медленного запроса"""
+    stats, token = instrumentation.start_request()
+    try:
+        response = await call_next(request)
+    finally:
+        # Метрики ведутся по шаблону маршрута; статика и несуществующие пути
+        # маршрута не находят и в метрики не попадают
+        route = request.scope.get("route")
+        instrumentation.finish_request(getattr(route, "path", None), stats, token)
+
+    response.headers.update(instrumentation.response_headers(stats))
+    return response
+
+
 # Модели для ответа
 class ChallengeResponse(BaseModel):
     category: str
@@ -40,10 +78,116 @@ class ColorResponse(BaseModel):
     hex: str
 
 
+class PaletteResponse(BaseModel):
+    base: ColorResponse
+    palettes: Dict[str, List[ColorResponse]]
+
+
 class WordResponse(BaseModel):
     word: str
 
 
+class ChallengeSearchResult(BaseModel):
+    id: int
+    category: str
+    name: str
+    description: Optional[str] = None
+    score: float
+
+
+class ChallengeSearchResponse(BaseModel):
+    query: str
+    results: List[ChallengeSearchResult]
+
+
+# seed делает результат детерминированным и кэшируемым
+SEED_MAX_LENGTH = 128
+SeedQuery = Query(None, min_length=1, max_length=SEED_MAX_LENGTH)
+
+CLIENT_ID_COOKIE = "client_id"
+
+# Токен для /api/admin/*; если не задан, администрирование отключено
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN")
+
+
+def record_generation(kind, color=None, word=None, challenge=None, challenge_id=None):
+    """Учесть генерацию в истории и в счетчиках популярности"""
+    history.record(kind, color=color, word=word, challenge=challenge, challenge_id=challenge_id)
+    stats.record(color=color, word=word, challenge=challenge, challenge_id=challenge_id)
+
+
+def record_triple(color, word, challenge, challenge_id):
+    """Учесть тройку; базовое задание (без id) в счетчики усложнений не попадает"""
+    record_generation('all', color=color, word=word,
+                      challenge=challenge if challenge_id is not None else None, challenge_id=challenge_id)
+
+
+def challenge_response(result):
+    """Усложнение из результата crud.get_random_challenge в виде ответа API"""
+    return {
+        'category': result["category"].name,
+        'name': result["challenge"].name,
+        'description': result["challenge"].description
+    }
+
+
+def challenge_or_fallback(db: Session, client_id: str = None, categories: list = None):
+    """Усложнение для тройки и его id; при пустом каталоге — базовое задание и None
+
+    Если выбраны категории, в которых ничего нет, остается ответ 404.
+    """
+    try:
+        result = crud.get_random_challenge(db, client_id=client_id, categories=categories)
+    except HTTPException as e:
+        if categories or e.status_code != 404:
+            raise
+        result = None
+    if not result:
+        return dict(FALLBACK_CHALLENGE), None
+    return challenge_response(result), result["challenge"].id
+
+
+def get_client_id(request: Request, response: Response):
+    """Идентификатор клиента из заголовка или cookie; новый выдается в cookie"""
+    client_id = request.headers.get("X-Client-Id") or request.cookies.get(CLIENT_ID_COOKIE)
+    if not client_id:
+        client_id = uuid.uuid4().hex
+        response.set_cookie(CLIENT_ID_COOKIE, client_id, max_age=365 * 24 * 3600,
+                            httponly=True, samesite="lax")
+    return client_id[:64]
+
+
+def require_admin(authorization: Optional[str] = Header(None)):
+    """Проверка токена администратора из заголовка Authorization: Bearer"""
+    if not ADMIN_TOKEN:
+        raise HTTPException(status_code=403, detail="Администрирование отключено: ADMIN_TOKEN не задан")
+    scheme, _, token = (authorization or "").partition(" ")
+    if scheme.lower() != "bearer" or not secrets.compare_digest(token.strip().encode(), ADMIN_TOKEN.encode()):
+        raise HTTPException(status_code=401, detail="Неверный токен администратора",
+                            headers={"WWW-Authenticate": "Bearer"})
+
+
+def parse_category_weights(values):
+    """Разобрать веса категорий вида «Категория:вес»"""
+    if not values:
+        return None
+
+    weights = {}
+    for value in values:
+        name, sep, weight = value.rpartition(':')
+        name = name.strip()
+        try:
+            weight = float(weight)
+        except ValueError:
+            weight = -1
+        if not sep or not name or weight < 0:
+            raise HTTPException(status_code=400, detail=f"Некорректный вес категории: {value}")
+        if not math.isfinite(weight):
+            raise HTTPException(status_code=422, detail=f"Вес категории должен быть конечным числом: {value}")
+        weights[name] = weight
+    return weights
+
+
 def get_random_color():
     """Получаем случайный цвет с обработкой ошибок"""
     try:
@@ -68,18 +212,28 @@ def get_random_color():
         )
 
 
-def get_random_word():
-    """Случайное русское слово"""
-    text_gen = Text('ru')
-    return text_gen.word()
+def get_random_word(locale: str = None):
+    """Случайное слово из словаря локали (по умолчанию русского)"""
+    return words.random_word(locale=locale)
+
+
+def get_word_locale(locale: Optional[str] = Query(None, max_length=16)):
+    """Локаль слов из параметра запроса"""
+    try:
+        return words.normalize_locale(locale)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
 
 """Инициализация данных при запуске"""
 @app.on_event("startup")
 async def startup_event():
+    if workers.preloaded:
+        # Воркер gunicorn: мастер-процесс уже заполнил БД до fork
+        return
     db = SessionLocal()
     try:
-        crud.create_initial_data(db)
+        crud.seed_initial_data(db)
         print("Данные успешно загружены")
     except Exception as e:
         print(f"Ошибка при загрузке данных: {e}")
@@ -87,26 +241,76 @@ async def startup_event():
         db.close()
 
 
+"""Фоновое предвычисление задания дня"""
+@app.on_event("startup")
+async def start_daily_precompute():
+    app.state.daily_task = asyncio.create_task(daily.precompute_loop(SessionLocal))
+
+
+@app.on_event("shutdown")
+async def stop_daily_precompute():
+    app.state.daily_task.cancel()
+
+
+"""Фоновая запись истории генераций"""
+@app.on_event("startup")
+async def start_history_writer():
+    history.start(SessionLocal)
+
+
+@app.on_event("shutdown")
+async def stop_history_writer():
+    # Дописываем накопленную очередь до завершения процесса
+    history.stop()
+
+
+"""Периодическое сохранение счетчиков популярности"""
+@app.on_event("startup")
+async def start_stats_merge():
+    app.state.stats_task = asyncio.create_task(stats.merge_loop(SessionLocal))
+
+
+@app.on_event("shutdown")
+async def stop_stats_merge():
+    app.state.stats_task.cancel()
+    try:
+        stats.merge_once(SessionLocal)
+    except Exception as e:
+        print(f"Ошибка при сохранении счетчиков: {e}")
+
+
+"""Фоновая проверка реплик БД"""
+@app.on_event("startup")
+async def start_replica_health():
+    if replica_router:
+        replica_router.start()
+
+
+@app.on_event("shutdown")
+async def stop_replica_health():
+    if replica_router:
+        replica_router.stop()
+
+
+"""Фоновая проверка зависимостей для /api/health/ready"""
+@app.on_event("startup")
+async def start_health_checker():
+    health.start(color_source=get_random_color)
+
+
+@app.on_event("shutdown")
+async def stop_health_checker():
+    health.stop()
+
+
 @app.get("/", response_class=HTMLResponse)
-async def get_main_page(request: Request, db: Session = Depends(get_db)):
+async def get_main_page(request: Request, db: Session = Depends(get_read_db)):
     """Главная страница с тремя генерациями"""
     # Получаем начальные данные
     color = get_random_color()
     word = get_random_word()
-    challenge_result = crud.get_random_challenge(db)
-
-    if challenge_result:
-        challenge = {
-            'category': challenge_result['category'].name,
-            'name': challenge_result['challenge'].name,
-            'description': challenge_result['challenge'].description
-        }
-    else:
-        challenge = {
-            'category': 'Усложнение',
-            'name': 'Базовое задание',
-            'description': 'Создайте рисунок на свободную тему'
-        }
+    challenge, challenge_id = challenge_or_fallback(db)
+    record_triple(color, word, challenge, challenge_id)
 
     return templates.TemplateResponse("index.html", {
         "request": request,
@@ -118,53 +322,146 @@ async def get_main_page(request: Request, db: Session = Depends(get_db)):
 
 # API эндпоинты
 @app.get("/api/random-color", response_model=ColorResponse)
-async def api_random_color():
+async def api_random_color(request: Request, seed: Optional[str] = SeedQuery):
     """API для получения случайного цвета"""
+    if seed is not None:
+        color = seeded.seeded_color(seed)
+        record_generation('color', color=color)
+        return cached_json_response(request, color, seeded.SEED_CACHE_MAX_AGE)
+
     color = get_random_color()
+    record_generation('color', color=color)
     return ColorResponse(**color)
 
 
+@app.get("/api/palette", response_model=PaletteResponse)
+async def api_palette(request: Request,
+                      base: Optional[str] = Query(None, alias="hex",
+                                                  pattern=r"^#?([0-9a-fA-F]{3}|[0-9a-fA-F]{6})$"),
+                      scheme: List[str] = Query(None),
+                      seed: Optional[str] = SeedQuery):
+    """Гармоничные цвета вокруг базового; считаются локально, без сервиса цветов"""
+    if base is not None and seed is not None:
+        raise HTTPException(status_code=400, detail="Укажите либо hex, либо seed")
+
+    # Палитра однозначно определяется базовым цветом или seed
+    deterministic = base is not None or seed is not None
+    if base is None:
+        base = (seeded.seeded_color(seed) if seed is not None else random_color())['hex']
+
+    try:
+        palette = build_palette(base, scheme)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    if deterministic:
+        return cached_json_response(request, palette, seeded.SEED_CACHE_MAX_AGE)
+    return palette
+
+
 @app.get("/api/random-word", response_model=WordResponse)
-async def api_random_word():
+async def api_random_word(request: Request, seed: Optional[str] = SeedQuery,
+                          locale: str = Depends(get_word_locale)):
     """API для получения случайного слова"""
-    return WordResponse(word=get_random_word())
+    word = seeded.seeded_word(seed, locale) if seed is not None else get_random_word(locale)
+    record_generation('word', word=word)
+
+    if seed is not None:
+        return cached_json_response(request, {'word': word}, seeded.SEED_CACHE_MAX_AGE)
+
+    return WordResponse(word=word)
 
 
 @app.get("/api/random-challenge", response_model=ChallengeResponse)
-async def api_random_challenge(db: Session = Depends(get_db)):
+async def api_random_challenge(request: Request, response: Response,
+                               seed: Optional[str] = SeedQuery,
+                               no_repeat: bool = False,
+                               weight: List[str] = Query(None),
+                               category: List[str] = Query(None),
+                               db: Session = Depends(get_read_db)):
     """API для получения случайного усложнения"""
-    result = crud.get_random_challenge(db)
+    if seed is not None:
+        entry = seeded.seeded_challenge_entry(db, seed, category)
+        challenge = challenge_fields(entry)
+        record_generation('challenge', challenge=challenge, challenge_id=entry['id'])
+        return cached_json_response(request, challenge, seeded.SEED_CACHE_MAX_AGE)
+
+    if no_repeat:
+        result = crud.get_random_challenge(
+            db,
+            client_id=get_client_id(request, response),
+            weights=parse_category_weights(weight),
+            categories=category
+        )
+    else:
+        result = crud.get_random_challenge(db, categories=category)
 
     if not result:
         raise HTTPException(status_code=404, detail="No challenges available")
 
-    return ChallengeResponse(
-        category=result["category"].name,
-        name=result["challenge"].name,
-        description=result["challenge"].description
-    )
+    challenge = challenge_response(result)
+    record_generation('challenge', challenge=challenge, challenge_id=result["challenge"].id)
+    return ChallengeResponse(**challenge)
 
 
 @app.get("/api/random-all")
-async def api_random_all(db: Session = Depends(get_db)):
+async def api_random_all(request: Request, seed: Optional[str] = SeedQuery,
+                         category: List[str] = Query(None),
+                         locale: str = Depends(get_word_locale),
+                         db: Session = Depends(get_read_db)):
     """API для получения всех трех случайных значений"""
+    if seed is not None:
+        triple, challenge_id = seeded.seeded_triple_with_id(db, seed, category, locale)
+        record_triple(triple['color'], triple['word'], triple['challenge'], challenge_id)
+        return cached_json_response(request, triple, seeded.SEED_CACHE_MAX_AGE)
+
     color = get_random_color()
-    word = get_random_word()
+    word = get_random_word(locale)
 
-    result = crud.get_random_challenge(db)
-    if result:
-        challenge = {
-            'category': result["category"].name,
-            'name': result["challenge"].name,
-            'description': result["challenge"].description
-        }
+    challenge, challenge_id = challenge_or_fallback(db, categories=category)
+    record_triple(color, word, challenge, challenge_id)
+
+    return {
+        'color': color,
+        'word': word,
+        'challenge': challenge
+    }
+
+
+REROLL_ACTIONS = ("color", "word", "challenge", "all")
+
+
+def reroll(db: Session, action: str, seed: str = None, categories: list = None,
+           client_id: str = None, locale: str = None):
+    """Перегенерировать цвет, слово, усложнение или все сразу"""
+    if action == "color":
+        color = seeded.seeded_color(seed) if seed else get_random_color()
+        record_generation('color', color=color)
+        return color
+
+    if action == "word":
+        word = seeded.seeded_word(seed, locale) if seed else get_random_word(locale)
+        record_generation('word', word=word)
+        return {'word': word}
+
+    if action == "challenge" and seed:
+        entry = seeded.seeded_challenge_entry(db, seed, categories)
+        challenge, challenge_id = challenge_fields(entry), entry['id']
+    elif action == "challenge":
+        result = crud.get_random_challenge(db, client_id=client_id, categories=categories)
+        challenge, challenge_id = challenge_response(result), result["challenge"].id
+    elif seed:
+        challenge, challenge_id = seeded.seeded_challenge_or_fallback(db, seed, categories)
     else:
-        challenge = {
-            'category': 'Усложнение',
-            'name': 'Базовое задание',
-            'description': 'Создайте рисунок на свободную тему'
-        }
+        challenge, challenge_id = challenge_or_fallback(db, client_id, categories)
 
+    if action == "challenge":
+        record_generation('challenge', challenge=challenge, challenge_id=challenge_id)
+        return challenge
+
+    color = seeded.seeded_color(seed) if seed else get_random_color()
+    word = seeded.seeded_word(seed, locale) if seed else get_random_word(locale)
+    record_triple(color, word, challenge, challenge_id)
     return {
         'color': color,
         'word': word,
@@ -172,6 +469,197 @@ async def api_random_all(db: Session = Depends(get_db)):
     }
 
 
+def reroll_in_read_session(read_sessions, action: str, **options):
+    """Перегенерация в собственной читающей сессии: реплика выбирается на каждое сообщение"""
+    with read_sessions() as db:
+        return reroll(db, action, **options)
+
+
+def parse_reroll_message(message):
+    """Действие и параметры перегенерации из сообщения WebSocket
+
+    Ограничения те же, что у параметров HTTP-эндпоинтов; при нарушении — ValueError.
+    """
+    action = message.get("action")
+    if action not in REROLL_ACTIONS:
+        raise ValueError(f"Неизвестное действие: {action}")
+
+    seed = message.get("seed") or None
+    if seed is not None and (not isinstance(seed, str) or len(seed) > SEED_MAX_LENGTH):
+        raise ValueError(f"seed должен быть строкой не длиннее {SEED_MAX_LENGTH} символов")
+
+    categories = message.get("category")
+    if isinstance(categories, str):
+        categories = [categories]
+    if categories is not None and (
+            not isinstance(categories, list) or not all(isinstance(c, str) for c in categories)):
+        raise ValueError("category должен быть строкой или списком строк")
+
+    locale = message.get("locale")
+    if locale is not None and not isinstance(locale, str):
+        raise ValueError("locale должен быть строкой")
+    locale = words.normalize_locale(locale)
+
+    return action, {"seed": seed, "categories": categories or None, "locale": locale}
+
+
+@app.websocket("/ws/reroll")
+async def ws_reroll(websocket: WebSocket, read_sessions=Depends(get_read_sessions)):
+    """Канал перегенерации: одно соединение на страницу, сессия БД на сообщение
+
+    Запрос:  {"id": 1, "action": "color|word|challenge|all",
+              "seed": "...", "category": [...], "no_repeat": true}
+    Ответ:   {"id": 1, "action": "...", "data": {...}}
+    Ошибка:  {"id": 1, "error": {"status": 404, "detail": "..."}}
+    """
+    await websocket.accept()
+    client_id = websocket.cookies.get(CLIENT_ID_COOKIE) or uuid.uuid4().hex
+
+    try:
+        while True:
+            raw = await websocket.receive_text()
+            try:
+                message = json.loads(raw)
+                if not isinstance(message, dict):
+                    raise ValueError("Ожидался JSON-объект")
+            except ValueError as e:
+                await websocket.send_json({"id": None, "error": {"status": 400, "detail": str(e)}})
+                continue
+
+            message_id = message.get("id")
+            try:
+                action, options = parse_reroll_message(message)
+            except ValueError as e:
+                await websocket.send_json({"id": message_id, "error": {"status": 400, "detail": str(e)}})
+                continue
+
+            try:
+                data = await run_in_threadpool(
+                    reroll_in_read_session, read_sessions, action,
+                    client_id=client_id if message.get("no_repeat") else None,
+                    **options
+                )
+            except HTTPException as e:
+                await websocket.send_json({
+                    "id": message_id,
+                    "error": {"status": e.status_code, "detail": e.detail}
+                })
+                continue
+            except Exception as e:
+                # Ошибка одного сообщения не должна закрывать канал
+                print(f"Ошибка при перегенерации через WebSocket: {e}")
+                await websocket.send_json({
+                    "id": message_id,
+                    "error": {"status": 500, "detail": "Внутренняя ошибка сервера"}
+                })
+                continue
+
+            await websocket.send_json({"id": message_id, "action": action, "data": data})
+    except WebSocketDisconnect:
+        pass
+
+
+@app.get("/api/catalog")
+async def api_catalog(request: Request, db: Session = Depends(get_read_db)):
+    """Весь каталог усложнений для выбора на клиенте; версия меняется вместе с содержимым"""
+    snapshot = get_catalog(db)
+    return cached_json_response(request, snapshot.compact(), CATALOG_MAX_AGE, etag=snapshot.etag)
+
+
+@app.get("/api/challenges/search", response_model=ChallengeSearchResponse)
+async def api_search_challenges(q: str = Query(..., min_length=1, max_length=200),
+                                limit: int = Query(10, ge=1, le=100),
+                                db: Session = Depends(get_read_db)):
+    """Поиск усложнений по названию, описанию и категории с учетом опечаток"""
+    snapshot = get_catalog(db)
+    index = search.cached_search_index(snapshot)
+    if index is None:
+        # Построение индекса большого каталога занимает секунды — не в event loop
+        index = await run_in_threadpool(search.get_search_index, snapshot)
+    return ChallengeSearchResponse(query=q, results=index.search(q, limit))
+
+
+@app.get("/api/daily")
+async def api_daily(request: Request, tz: Optional[str] = Query(None, max_length=64),
+                    db: Session = Depends(get_db)):
+    """Задание дня: одно на всех до следующей полуночи в часовом поясе"""
+    entry, max_age = daily.get_daily_triple(db, tz)
+    payload = entry['payload']
+    record_generation('daily', color=payload['color'], word=payload['word'],
+                      challenge=payload['challenge'], challenge_id=entry.get('challenge_id'))
+    return cached_json_response(request, entry['payload'], max_age, etag=entry['etag'])
+
+
+@app.get("/api/stats/popular")
+async def api_stats_popular(kind: str = Query("challenge", pattern="^(challenge|category|word|color)$"),
+                            days: int = Query(7, ge=1, le=3660),
+                            limit: int = Query(10, ge=1, le=100),
+                            db: Session = Depends(get_read_db)):
+    """Самые популярные усложнения, категории, слова или цвета за период"""
+    since = datetime.utcnow() - timedelta(days=days - 1)
+    items = stats.top_items(db, kind, since, limit)
+
+    if kind == "challenge":
+        # Названия берем из снимка каталога, а не из истории
+        snapshot = get_catalog(db)
+        for item in items:
+            challenge = snapshot.get(int(item["item"])) if item["item"].isdigit() else None
+            if challenge:
+                item["name"] = challenge["name"]
+                item["category"] = challenge["category"]
+
+    return {"kind": kind, "days": days, "items": items}
+
+
+@app.get("/api/stats/usage")
+async def api_stats_usage(kind: str = Query("category", pattern="^(challenge|category|word|color)$"),
+                          granularity: str = Query("day", pattern="^(hour|day)$"),
+                          days: int = Query(7, ge=1, le=3660),
+                          db: Session = Depends(get_read_db)):
+    """Использование по часам или дням, например по категориям"""
+    since = datetime.utcnow() - timedelta(days=days - 1)
+    return {
+        "kind": kind,
+        "granularity": granularity,
+        "series": stats.usage_series(db, kind, granularity, since)
+    }
+
+
+@app.post("/api/admin/import", dependencies=[Depends(require_admin)])
+async def admin_import(request: Request,
+                       format: Optional[str] = Query(None, pattern="^(text|ndjson)$"),
+                       replace: bool = False,
+                       strict: bool = False,
+                       db: Session = Depends(get_db)):
+    """Потоковый импорт усложнений в формате data.txt или NDJSON
+
+    replace заменяет весь каталог, strict отменяет импорт при любой ошибке.
+    """
+    if format is None:
+        content_type = request.headers.get("content-type", "")
+        format = "ndjson" if "ndjson" in content_type or "jsonl" in content_type else "text"
+
+    # Тело читается здесь, а разбор и запись в БД идут в отдельном потоке
+    chunks = importer.ChunkQueue()
+    job = asyncio.ensure_future(
+        run_in_threadpool(importer.import_stream, db, chunks, format, replace, strict)
+    )
+    try:
+        async for chunk in request.stream():
+            if chunk:
+                await chunks.put(chunk)
+    except BaseException:
+        await chunks.abort()
+        await asyncio.gather(job, return_exceptions=True)
+        raise
+    await chunks.close()
+
+    report = await job
+    if not report["committed"]:
+        return JSONResponse(status_code=422, content=report)
+    return report
+
+
 @app.get("/api/health")
 async def health_check():
     """Проверка работоспособности API"""
@@ -182,6 +670,32 @@ async def health_check():
     }
 
 
+@app.get("/api/health/live")
+async def health_live():
+    """Процесс жив и обслуживает запросы; зависимости не проверяются"""
+    return {"status": "alive", "uptime": round(health.uptime(), 3)}
+
+
+@app.get("/api/health/ready")
+async def health_ready():
+    """Готовность принимать трафик по последней фоновой проверке зависимостей"""
+    ready, body = health.readiness()
+    return Response(content=body, status_code=200 if ready else 503, media_type="application/json")
+
+
+@app.get("/api/metrics")
+async def metrics():
+    """Метрики приложения"""
+    return {
+        "db": instrumentation.get_metrics(),
+        "history": history.writer.metrics() if history.writer else None,
+        "stats": stats.counters.metrics(),
+        "words": words.pool_metrics(),
+        "cache": get_cache().metrics(),
+        "replicas": replica_router.metrics() if replica_router else None
+    }
+
+
 if __name__ == "__main__":
     import uvicorn
 
@@ -1,6 +1,7 @@
-from sqlalchemy import Column, Integer, String, Text, ForeignKey
+from sqlalchemy import Column, Integer, String, Text, Date, DateTime, ForeignKey, UniqueConstraint, Index
 from sqlalchemy.orm import relationship
 from .database import Base
+import uuid
 
 class ChallengeCategory(Base):
     __tablename__ = "challenge_categories"
@@ -12,10 +13,68 @@ class ChallengeCategory(Base):
 
 class Challenge(Base):
     __tablename__ = "challenges"
+    # Выбор по категории: фильтр по category_id и диапазон id внутри нее
+    __table_args__ = (Index("ix_challenges_category_id_id", "category_id", "id"),)
 
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String(100), nullable=False)
     description = Column(Text)
     category_id = Column(Integer, ForeignKey("challenge_categories.id"), nullable=False)
 
-    category = relationship("ChallengeCategory", back_populates="challenges")
\ No newline at end of file
+    category = relationship("ChallengeCategory", back_populates="challenges")
+
+def create_missing_indexes(engine):
+    """Создать индексы усложнений в уже существующей БД
+
+    create_all не трогает существующие таблицы, поэтому индексы, добавленные
+    позже, в развернутых БД нужно создать отдельно.
+    """
+    with engine.begin() as conn:
+        for index in Challenge.__table__.indexes:
+            index.create(conn, checkfirst=True)
+
+class DailyTriple(Base):
+    __tablename__ = "daily_triples"
+    __table_args__ = (UniqueConstraint("day", "timezone"),)
+
+    id = Column(Integer, primary_key=True, index=True)
+    day = Column(Date, nullable=False)
+    timezone = Column(String(64), nullable=False)
+    payload = Column(Text, nullable=False)
+
+
+class GenerationHistory(Base):
+    __tablename__ = "generation_history"
+    # В PostgreSQL таблица секционируется по месяцам (см. app/history.py)
+    __table_args__ = (
+        # Срок хранения в остальных СУБД удаляет строки по дате; в PostgreSQL
+        # вместо этого удаляются секции целиком
+        Index("ix_generation_history_created_at", "created_at").ddl_if(
+            callable_=lambda ddl, target, bind, dialect, **kw: dialect.name != "postgresql"
+        ),
+        {"postgresql_partition_by": "RANGE (created_at)"},
+    )
+
+    # Ключ секционирования обязан входить в первичный ключ
+    id = Column(String(32), primary_key=True, default=lambda: uuid.uuid4().hex)
+    created_at = Column(DateTime, primary_key=True, nullable=False)
+    kind = Column(String(16), nullable=False)
+    color_name = Column(String(100))
+    color_hex = Column(String(7))
+    word = Column(String(100))
+    challenge_id = Column(Integer)
+    challenge_name = Column(String(100))
+    category = Column(String(100))
+
+
+class UsageRollup(Base):
+    __tablename__ = "usage_rollups"
+    # Каждый процесс пишет свои строки абсолютными значениями счетчиков
+    __table_args__ = (Index("ix_usage_rollups_lookup", "granularity", "kind", "bucket_start"),)
+
+    worker_id = Column(String(64), primary_key=True)
+    granularity = Column(String(8), primary_key=True)
+    bucket_start = Column(DateTime, primary_key=True)
+    kind = Column(String(16), primary_key=True)
+    item = Column(String(100), primary_key=True)
+    count = Column(Integer, nullable=False)
@@ -0,0 +1,50 @@
+"""Цветовые гармонии вокруг базового цвета.
+
+Все считается локально: оттенок поворачивается в пространстве HLS, а
+название каждого различного цвета палитры подбирается по таблице
+app/colors.py один раз, без обращения к внешнему сервису.
+"""
+import colorsys
+from .colors import hex_to_rgb, rgb_to_hex, nearest_color_names
+
+# Сдвиги оттенка в градусах; 0 — сам базовый цвет
+HARMONIES = {
+    'complementary': (0, 180),
+    'triadic': (0, 120, 240),
+    'analogous': (-30, 0, 30),
+}
+
+
+def rotate_hue(hls, degrees):
+    """HEX-код цвета с оттенком, повернутым на degrees"""
+    hue, lightness, saturation = hls
+    rgb = colorsys.hls_to_rgb((hue + degrees / 360) % 1.0, lightness, saturation)
+    return rgb_to_hex(c * 255 for c in rgb)
+
+
+def build_palette(hex_value, schemes=None):
+    """Палитры выбранных гармоний; ValueError для неизвестной гармонии или HEX-кода"""
+    schemes = list(dict.fromkeys(schemes or HARMONIES))
+    unknown = [scheme for scheme in schemes if scheme not in HARMONIES]
+    if unknown:
+        raise ValueError(f"Неизвестная гармония: {', '.join(unknown)}")
+
+    base_hex = rgb_to_hex(hex_to_rgb(hex_value))
+    hls = colorsys.rgb_to_hls(*(c / 255 for c in hex_to_rgb(base_hex)))
+
+    palettes = {
+        scheme: [base_hex if offset == 0 else rotate_hue(hls, offset) for offset in HARMONIES[scheme]]
+        for scheme in schemes
+    }
+
+    # Повторяющиеся цвета (базовый есть в каждой палитре) называем один раз
+    unique = list(dict.fromkeys([base_hex, *(h for hexes in palettes.values() for h in hexes)]))
+    names = dict(zip(unique, nearest_color_names(unique)))
+
+    return {
+        'base': {'name': names[base_hex], 'hex': base_hex},
+        'palettes': {
+            scheme: [{'name': names[h], 'hex': h} for h in hexes]
+            for scheme, hexes in palettes.items()
+        }
+    }
@@ -0,0 +1,134 @@
+"""Распределение читающих запросов по репликам БД.
+
+Реплика выбирается по кругу или по наименьшему числу открытых сессий среди
+исправных. Исправность проверяет фоновый поток запросом SELECT 1 раз в
+интервал, а выбор реплики только читает ее результат; пока исправных реплик
+нет, чтение идет в основную БД.
+"""
+from sqlalchemy import event, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.orm import sessionmaker
+import itertools
+import threading
+
+BALANCING_STRATEGIES = ("round_robin", "least_connections")
+
+
+class Replica:
+    """Одна реплика: движок, фабрика сессий и состояние"""
+
+    def __init__(self, url, engine):
+        self.url = make_url(url).render_as_string(hide_password=True)
+        self.engine = engine
+        self.session_factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+        self.healthy = True
+        self.active = 0
+        self.sessions = 0
+        self.failures = 0
+
+        # Обрыв соединения во время запроса сразу выводит реплику из работы
+        @event.listens_for(engine, "handle_error")
+        def on_error(context):
+            if context.is_disconnect:
+                self.healthy = False
+
+    def metrics(self):
+        return {
+            "url": self.url,
+            "healthy": self.healthy,
+            "active": self.active,
+            "sessions": self.sessions,
+            "failures": self.failures,
+        }
+
+
+class ReplicaRouter:
+    """Выбор реплики для читающей сессии"""
+
+    def __init__(self, urls, engine_factory, balancing="round_robin", health_interval=5.0):
+        if balancing not in BALANCING_STRATEGIES:
+            raise ValueError(f"Неизвестная стратегия балансировки: {balancing}")
+        self.replicas = [Replica(url, engine_factory(url)) for url in urls]
+        self.balancing = balancing
+        self.health_interval = health_interval
+        self.fallbacks = 0
+        self._counter = itertools.count()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def check_health(self):
+        """Проверить все реплики запросом SELECT 1"""
+        for replica in self.replicas:
+            try:
+                with replica.engine.connect() as conn:
+                    conn.execute(text("SELECT 1"))
+                healthy = True
+            except Exception as e:
+                healthy = False
+                replica.failures += 1
+                if replica.healthy:
+                    print(f"Реплика {replica.url} недоступна: {e}")
+            if healthy and not replica.healthy:
+                print(f"Реплика {replica.url} снова доступна")
+            replica.healthy = healthy
+
+    def start(self):
+        """Запустить фоновую проверку реплик"""
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="replica-health", daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout=5.0):
+        """Остановить проверку и дождаться потока, но не дольше timeout секунд"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.check_health()
+            except Exception as e:
+                print(f"Ошибка при проверке реплик: {e}")
+            self._stop.wait(self.health_interval)
+
+    def acquire(self):
+        """Реплика для новой сессии или None, если читать нужно из основной БД
+
+        Сами реплики здесь не проверяются: запрос не ждет их таймаутов.
+        """
+        with self._lock:
+            healthy = [replica for replica in self.replicas if replica.healthy]
+            if not healthy:
+                self.fallbacks += 1
+                return None
+            if self.balancing == "least_connections":
+                replica = min(healthy, key=lambda r: r.active)
+            else:
+                replica = healthy[next(self._counter) % len(healthy)]
+            replica.active += 1
+            replica.sessions += 1
+            return replica
+
+    def release(self, replica):
+        with self._lock:
+            replica.active -= 1
+
+    def is_replica(self, bind):
+        """Движок bind принадлежит одной из реплик"""
+        return any(replica.engine is bind for replica in self.replicas)
+
+    def dispose(self, close=True):
+        for replica in self.replicas:
+            replica.engine.dispose(close=close)
+
+    def metrics(self):
+        with self._lock:
+            return {
+                "balancing": self.balancing,
+                "fallbacks": self.fallbacks,
+                "replicas": [replica.metrics() for replica in self.replicas],
+            }
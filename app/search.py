@@ -0,0 +1,217 @@
+"""Полнотекстовый поиск по каталогу усложнений.
+
+Инвертированный индекс строится в памяти из снимка каталога и пересобирается
+только при смене его версии. Слово запроса сопоставляется с термами индекса
+точно, по префиксу («минут» → «минуты») или с опечаткой (расстояние
+Левенштейна до 1–2), найденное по общим триграммам.
+"""
+from bisect import bisect_left
+from itertools import islice
+import heapq
+import math
+import re
+import threading
+import os
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Сколько лучших записей каждого терма просматривать при ранжировании
+SEARCH_MAX_POSTINGS = int(os.getenv("SEARCH_MAX_POSTINGS", "1000"))
+
+# Вес совпадения в каждом поле
+FIELD_WEIGHTS = {
+    'name': 3.0,
+    'category': 2.0,
+    'description': 1.0,
+}
+
+# Множитель оценки в зависимости от вида совпадения
+EXACT_MATCH = 1.0
+PREFIX_MATCH = 0.8
+FUZZY_MATCH = 0.6
+
+_MAX_PREFIX_TERMS = 20
+_MAX_FUZZY_TERMS = 10
+_MAX_FUZZY_CANDIDATES = 50
+_EXPAND_CACHE_SIZE = 4096
+_TOKEN_RE = re.compile(r"\w+")
+
+
+def tokenize(text):
+    """Разбить текст на нормализованные слова"""
+    if not text:
+        return []
+    return _TOKEN_RE.findall(text.lower().replace('ё', 'е'))
+
+
+def trigrams(term):
+    padded = f"  {term} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def max_typos(term):
+    """Допустимое число опечаток для слова запроса"""
+    if len(term) <= 3:
+        return 0
+    if len(term) <= 6:
+        return 1
+    return 2
+
+
+def bounded_levenshtein(a, b, limit):
+    """Расстояние Левенштейна или limit + 1, если оно больше limit"""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        current = [i]
+        row_min = i
+        for j, char_b in enumerate(b, 1):
+            value = min(
+                previous[j] + 1,
+                current[j - 1] + 1,
+                previous[j - 1] + (char_a != char_b)
+            )
+            current.append(value)
+            row_min = min(row_min, value)
+        if row_min > limit:
+            return limit + 1
+        previous = current
+    return previous[-1]
+
+
+class SearchIndex:
+    """Инвертированный индекс по названиям, описаниям и категориям"""
+
+    def __init__(self, snapshot):
+        self.version = snapshot.version
+        self.documents = snapshot.challenges
+
+        weights = {}
+        for doc_index, challenge in enumerate(self.documents):
+            for field, field_weight in FIELD_WEIGHTS.items():
+                for term in tokenize(challenge[field]):
+                    postings = weights.setdefault(term, {})
+                    postings[doc_index] = postings.get(doc_index, 0.0) + field_weight
+
+        total = max(len(self.documents), 1)
+        # term -> (idf, [(вес, номер документа), ...] по убыванию веса)
+        self.postings = {}
+        for term, postings in weights.items():
+            idf = math.log(1 + total / len(postings))
+            ordered = sorted(((weight, doc) for doc, weight in postings.items()), reverse=True)
+            self.postings[term] = (idf, ordered)
+
+        self.terms = sorted(self.postings)
+
+        # Разобранные слова запросов: слово -> [(терм, множитель), ...]
+        self._expand_cache = {}
+
+        self.trigram_terms = {}
+        for term in self.terms:
+            for gram in trigrams(term):
+                self.trigram_terms.setdefault(gram, []).append(term)
+
+    def _prefix_terms(self, prefix):
+        start = bisect_left(self.terms, prefix)
+        matches = []
+        for term in self.terms[start:start + _MAX_PREFIX_TERMS + 1]:
+            if not term.startswith(prefix):
+                break
+            if term != prefix:
+                matches.append(term)
+        return matches[:_MAX_PREFIX_TERMS]
+
+    def _fuzzy_terms(self, token):
+        limit = max_typos(token)
+        if limit == 0:
+            return []
+
+        grams = trigrams(token)
+        shared = {}
+        for gram in grams:
+            for term in self.trigram_terms.get(gram, ()):
+                shared[term] = shared.get(term, 0) + 1
+
+        # Каждая опечатка портит не больше трех триграмм
+        required = max(len(grams) - 3 * limit, 1)
+        candidates = sorted(
+            (term for term, count in shared.items()
+             if count >= required and abs(len(term) - len(token)) <= limit),
+            key=lambda term: -shared[term]
+        )[:_MAX_FUZZY_CANDIDATES]
+
+        matches = []
+        for term in candidates:
+            if bounded_levenshtein(token, term, limit) <= limit:
+                matches.append(term)
+                if len(matches) >= _MAX_FUZZY_TERMS:
+                    break
+        return matches
+
+    def expand(self, token):
+        """Термы индекса, соответствующие слову запроса, с множителем оценки"""
+        expanded = self._expand_cache.get(token)
+        if expanded is not None:
+            return expanded
+
+        expanded = []
+        if token in self.postings:
+            expanded.append((token, EXACT_MATCH))
+        expanded.extend((term, PREFIX_MATCH) for term in self._prefix_terms(token))
+        if not expanded:
+            expanded.extend((term, FUZZY_MATCH) for term in self._fuzzy_terms(token))
+
+        if len(self._expand_cache) >= _EXPAND_CACHE_SIZE:
+            self._expand_cache.pop(next(iter(self._expand_cache)))
+        self._expand_cache[token] = expanded
+        return expanded
+
+    def search(self, query, limit=10):
+        """Найти усложнения по запросу, лучшие первыми"""
+        scores = {}
+        for token in set(tokenize(query)):
+            token_scores = {}
+            for term, factor in self.expand(token):
+                idf, postings = self.postings[term]
+                for weight, doc in islice(postings, SEARCH_MAX_POSTINGS):
+                    score = weight * idf * factor
+                    # Для одного слова запроса учитываем лучший из подходящих термов
+                    if score > token_scores.get(doc, 0.0):
+                        token_scores[doc] = score
+            for doc, score in token_scores.items():
+                scores[doc] = scores.get(doc, 0.0) + score
+
+        best = heapq.nsmallest(limit, scores.items(), key=lambda item: (-item[1], item[0]))
+        return [
+            {**self.documents[doc], 'score': round(score, 4)}
+            for doc, score in best
+        ]
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def cached_search_index(snapshot):
+    """Готовый индекс для снимка или None, если его еще нужно построить"""
+    index = _index
+    if index is not None and index.version == snapshot.version:
+        return index
+    return None
+
+
+def get_search_index(snapshot):
+    """Индекс для снимка каталога; пересобирается при смене версии"""
+    global _index
+
+    index = _index
+    if index is not None and index.version == snapshot.version:
+        return index
+
+    with _index_lock:
+        if _index is None or _index.version != snapshot.version:
+            _index = SearchIndex(snapshot)
+        return _index
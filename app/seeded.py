@@ -0,0 +1,65 @@
+from sqlalchemy.orm import Session
+from fastapi import HTTPException
+from . import catalog, colors, words
+import random
+import os
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Время жизни ответа с seed в HTTP-кэшах, секунд
+SEED_CACHE_MAX_AGE = int(os.getenv("SEED_CACHE_MAX_AGE", "86400"))
+
+
+def seeded_rng(seed: str, part: str):
+    """Отдельный детерминированный генератор для каждой части тройки"""
+    return random.Random(f"{seed}:{part}")
+
+
+def seeded_color(seed: str):
+    return colors.random_color(seeded_rng(seed, 'color'))
+
+
+def seeded_word(seed: str, locale: str = None):
+    return words.random_word(seeded_rng(seed, 'word'), locale)
+
+
+def seeded_challenge_entry(db: Session, seed: str, categories=None):
+    """Запись каталога (вместе с id), однозначно определяемая seed"""
+    snapshot = catalog.get_catalog(db)
+    return catalog.pick_challenge_entry(snapshot, seeded_rng(seed, 'challenge'), categories)
+
+
+def seeded_challenge(db: Session, seed: str, categories=None):
+    return catalog.challenge_fields(seeded_challenge_entry(db, seed, categories))
+
+
+def seeded_challenge_or_fallback(db: Session, seed: str, categories=None):
+    """Усложнение для тройки по seed и его id; при пустом каталоге — базовое задание и None
+
+    Как и без seed, пустой каталог не делает запрос ошибочным; 404 остается
+    только для выбранных категорий, в которых ничего нет.
+    """
+    try:
+        entry = seeded_challenge_entry(db, seed, categories)
+    except HTTPException:
+        if categories:
+            raise
+        return dict(catalog.FALLBACK_CHALLENGE), None
+    return catalog.challenge_fields(entry), entry['id']
+
+
+def seeded_triple_with_id(db: Session, seed: str, categories=None, locale: str = None):
+    """Тройка по seed и id ее усложнения (для счетчиков популярности)"""
+    challenge, challenge_id = seeded_challenge_or_fallback(db, seed, categories)
+    triple = {
+        'color': seeded_color(seed),
+        'word': seeded_word(seed, locale),
+        'challenge': challenge
+    }
+    return triple, challenge_id
+
+
+def seeded_triple(db: Session, seed: str, categories=None, locale: str = None):
+    """Цвет, слово и усложнение, однозначно определяемые seed"""
+    return seeded_triple_with_id(db, seed, categories, locale)[0]
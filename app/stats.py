@@ -0,0 +1,276 @@
+"""Счетчики популярности усложнений, категорий, слов и цветов.
+
+Каждый процесс считает в памяти и периодически сохраняет свои счетчики в
+usage_rollups — почасовые и посуточные агрегаты. В таблицу пишется не
+приращение, а текущее абсолютное значение счетчика процесса, поэтому
+повторное слияние ничего не меняет. Статистика читается только из агрегатов.
+"""
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import and_, delete, func, select, text
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+from datetime import datetime, timedelta
+from . import models
+import asyncio
+import socket
+import threading
+import uuid
+import os
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Как часто сохранять счетчики в БД, секунд
+STATS_MERGE_INTERVAL = float(os.getenv("STATS_MERGE_INTERVAL", "5"))
+# Сколько дней хранить почасовые агрегаты
+STATS_HOURLY_RETENTION_DAYS = int(os.getenv("STATS_HOURLY_RETENTION_DAYS", "30"))
+
+GRANULARITIES = ("hour", "day")
+STEPS = {"hour": timedelta(hours=1), "day": timedelta(days=1)}
+
+# Строки закрытых интервалов всех процессов сводятся в одну с этим worker_id
+COMPACTED_WORKER_ID = "compacted"
+# Ключ advisory-блокировки PostgreSQL на время сведения
+COMPACT_LOCK_KEY = 0x77546F45
+
+def new_worker_id():
+    """Уникален для каждого процесса, чтобы перезапуск или соседний процесс не затер счетчики"""
+    return f"{socket.gethostname()[:32]}-{os.getpid()}-{uuid.uuid4().hex[:8]}"
+
+
+WORKER_ID = new_worker_id()
+
+
+def bucket_start(moment, granularity):
+    if granularity == "hour":
+        return moment.replace(minute=0, second=0, microsecond=0)
+    return moment.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def _upsert(dialect_name, rows, add=False):
+    """INSERT ... ON CONFLICT DO UPDATE для PostgreSQL и SQLite
+
+    add=True прибавляет значение к сохраненному вместо замены.
+    """
+    dialect = postgresql if dialect_name == "postgresql" else sqlite
+    stmt = dialect.insert(models.UsageRollup).values(rows)
+    count = models.UsageRollup.count + stmt.excluded.count if add else stmt.excluded.count
+    return stmt.on_conflict_do_update(
+        index_elements=["worker_id", "granularity", "bucket_start", "kind", "item"],
+        set_={"count": count}
+    )
+
+
+class UsageCounters:
+    """Счетчики одного процесса"""
+
+    def __init__(self, worker_id=WORKER_ID):
+        self.worker_id = worker_id
+        # (гранулярность, начало интервала, вид, значение) -> счетчик
+        self._counts = {}
+        self._dirty = set()
+        self._lock = threading.Lock()
+        self.merges = 0
+
+    def increment(self, kind, item, now=None):
+        if item is None:
+            return
+        now = now or datetime.utcnow()
+        item = str(item)[:100]
+        with self._lock:
+            for granularity in GRANULARITIES:
+                key = (granularity, bucket_start(now, granularity), kind, item)
+                self._counts[key] = self._counts.get(key, 0) + 1
+                self._dirty.add(key)
+
+    def record(self, color=None, word=None, challenge=None, challenge_id=None, now=None):
+        """Учесть одну генерацию"""
+        challenge = challenge or {}
+        challenge_id = challenge_id if challenge_id is not None else challenge.get("id")
+        self.increment("challenge", challenge_id, now)
+        self.increment("category", challenge.get("category"), now)
+        self.increment("word", word, now)
+        self.increment("color", color["name"] if color else None, now)
+
+    def merge(self, db: Session, now=None):
+        """Сохранить изменившиеся счетчики; повторный вызов идемпотентен"""
+        with self._lock:
+            dirty = self._dirty
+            self._dirty = set()
+            rows = [
+                {
+                    "worker_id": self.worker_id,
+                    "granularity": granularity,
+                    "bucket_start": bucket,
+                    "kind": kind,
+                    "item": item,
+                    "count": self._counts[(granularity, bucket, kind, item)],
+                }
+                for granularity, bucket, kind, item in dirty
+            ]
+
+        if not rows:
+            return 0
+
+        try:
+            dialect_name = db.get_bind().dialect.name
+            for start in range(0, len(rows), 500):
+                db.execute(_upsert(dialect_name, rows[start:start + 500]))
+            db.commit()
+        except Exception:
+            db.rollback()
+            with self._lock:
+                self._dirty |= dirty
+            raise
+
+        with self._lock:
+            self.merges += 1
+            self._forget_old(now or datetime.utcnow())
+        return len(rows)
+
+    def _forget_old(self, now):
+        """Убрать из памяти сохраненные счетчики давно закрытых интервалов
+
+        Предыдущий интервал остается в памяти: запоздавшее увеличение
+        счетчика иначе начало бы отсчет с нуля и затерло сохраненное значение.
+        """
+        oldest = {granularity: bucket_start(now, granularity) - STEPS[granularity] for granularity in GRANULARITIES}
+        for key in list(self._counts):
+            granularity, bucket = key[0], key[1]
+            if bucket < oldest[granularity] and key not in self._dirty:
+                del self._counts[key]
+
+    def metrics(self):
+        with self._lock:
+            return {
+                "worker_id": self.worker_id,
+                "counters": len(self._counts),
+                "pending": len(self._dirty),
+                "merges": self.merges,
+            }
+
+
+counters = UsageCounters()
+
+
+def record(color=None, word=None, challenge=None, challenge_id=None):
+    counters.record(color=color, word=word, challenge=challenge, challenge_id=challenge_id)
+
+
+def prune(db: Session, now=None):
+    """Удалить устаревшие почасовые агрегаты"""
+    cutoff = (now or datetime.utcnow()) - timedelta(days=STATS_HOURLY_RETENTION_DAYS)
+    table = models.UsageRollup.__table__
+    db.execute(delete(table).where(table.c.granularity == "hour", table.c.bucket_start < cutoff))
+    db.commit()
+
+
+def compact(db: Session, now=None):
+    """Свести строки закрытых интервалов всех процессов в одну строку на значение
+
+    Процесс переписывает только текущий и предыдущий интервал (см.
+    UsageCounters._forget_old), более старые строки уже не меняются. Без
+    сведения строки перезапущенных процессов копились бы в таблице.
+    """
+    now = now or datetime.utcnow()
+    table = models.UsageRollup.__table__
+    dialect_name = db.get_bind().dialect.name
+    try:
+        if dialect_name == "postgresql":
+            # Два процесса не должны свести одни и те же строки дважды
+            db.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": COMPACT_LOCK_KEY})
+
+        compacted = 0
+        for granularity in GRANULARITIES:
+            closed = and_(
+                table.c.granularity == granularity,
+                table.c.bucket_start < bucket_start(now, granularity) - STEPS[granularity],
+                table.c.worker_id != COMPACTED_WORKER_ID
+            )
+            rows = [
+                {
+                    "worker_id": COMPACTED_WORKER_ID,
+                    "granularity": granularity,
+                    "bucket_start": bucket,
+                    "kind": kind,
+                    "item": item,
+                    "count": int(count),
+                }
+                for bucket, kind, item, count in db.execute(
+                    select(table.c.bucket_start, table.c.kind, table.c.item, func.sum(table.c.count))
+                    .where(closed)
+                    .group_by(table.c.bucket_start, table.c.kind, table.c.item)
+                )
+            ]
+            for start in range(0, len(rows), 500):
+                db.execute(_upsert(dialect_name, rows[start:start + 500], add=True))
+            compacted += db.execute(delete(table).where(closed)).rowcount
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    return compacted
+
+
+def top_items(db: Session, kind, since, limit=10):
+    """Самые частые значения за период по суточным агрегатам"""
+    total = func.sum(models.UsageRollup.count).label("total")
+    rows = (
+        db.query(models.UsageRollup.item, total)
+        .filter(
+            models.UsageRollup.granularity == "day",
+            models.UsageRollup.kind == kind,
+            models.UsageRollup.bucket_start >= bucket_start(since, "day")
+        )
+        .group_by(models.UsageRollup.item)
+        .order_by(total.desc(), models.UsageRollup.item)
+        .limit(limit)
+        .all()
+    )
+    return [{"item": item, "count": int(count)} for item, count in rows]
+
+
+def usage_series(db: Session, kind, granularity, since):
+    """Использование по интервалам, суммированное по всем процессам"""
+    total = func.sum(models.UsageRollup.count).label("total")
+    rows = (
+        db.query(models.UsageRollup.bucket_start, models.UsageRollup.item, total)
+        .filter(
+            models.UsageRollup.granularity == granularity,
+            models.UsageRollup.kind == kind,
+            models.UsageRollup.bucket_start >= bucket_start(since, granularity)
+        )
+        .group_by(models.UsageRollup.bucket_start, models.UsageRollup.item)
+        .order_by(models.UsageRollup.bucket_start, models.UsageRollup.item)
+        .all()
+    )
+    return [
+        {"bucket": bucket.isoformat(), "item": item, "count": int(count)}
+        for bucket, item, count in rows
+    ]
+
+
+def merge_once(session_factory, prune_old=False):
+    db = session_factory()
+    try:
+        counters.merge(db)
+        if prune_old:
+            prune(db)
+            compact(db)
+    finally:
+        db.close()
+
+
+async def merge_loop(session_factory):
+    """Фоновая задача: периодически сохраняет счетчики процесса"""
+    last_prune = None
+    while True:
+        await asyncio.sleep(STATS_MERGE_INTERVAL)
+        now = datetime.utcnow()
+        prune_old = last_prune is None or now - last_prune > timedelta(hours=1)
+        try:
+            await run_in_threadpool(merge_once, session_factory, prune_old)
+            if prune_old:
+                last_prune = now
+        except Exception as e:
+            print(f"Ошибка при сохранении счетчиков: {e}")
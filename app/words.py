@@ -0,0 +1,100 @@
+"""Словари слов по локалям.
+
+Словарь локали загружается из данных Mimesis при первом обращении и
+хранится в памяти. Число одновременно загруженных локалей ограничено:
+при превышении выгружается та, к которой дольше всего не обращались.
+"""
+from collections import OrderedDict
+from mimesis import Text
+from mimesis.locales import Locale
+import random
+import sys
+import threading
+import time
+import os
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Локаль слов по умолчанию
+DEFAULT_WORD_LOCALE = os.getenv("WORD_LOCALE", "ru")
+# Сколько словарей держать в памяти одновременно
+WORD_POOL_MAX_LOCALES = int(os.getenv("WORD_POOL_MAX_LOCALES", "8"))
+
+SUPPORTED_LOCALES = tuple(sorted(locale.value for locale in Locale))
+
+_pools = OrderedDict()
+_pools_lock = threading.Lock()
+# Локаль -> {'words', 'bytes', 'load_ms', 'loads'}; переживает выгрузку словаря
+_pool_info = {}
+_evictions = 0
+
+
+def normalize_locale(locale: str = None):
+    """Проверить код локали: 'EN_gb' -> 'en-gb'; ValueError для неизвестной"""
+    if locale is None:
+        return DEFAULT_WORD_LOCALE
+    normalized = locale.strip().lower().replace('_', '-')
+    if normalized not in SUPPORTED_LOCALES:
+        raise ValueError(f"Неподдерживаемая локаль: {locale}")
+    return normalized
+
+
+def _load_pool(locale):
+    started = time.perf_counter()
+    # Сортируем, чтобы порядок не зависел от версии файла данных
+    pool = tuple(sorted(Text(locale)._extract(["words"])))
+    load_ms = (time.perf_counter() - started) * 1000
+
+    info = _pool_info.setdefault(locale, {'loads': 0})
+    info.update({
+        'words': len(pool),
+        'bytes': sys.getsizeof(pool) + sum(sys.getsizeof(word) for word in pool),
+        'load_ms': round(load_ms, 3),
+    })
+    info['loads'] += 1
+    return pool
+
+
+def get_word_pool(locale: str = None):
+    """Получить словарь слов для локали (загружается при первом обращении)"""
+    global _evictions
+    locale = normalize_locale(locale)
+
+    with _pools_lock:
+        pool = _pools.get(locale)
+        if pool is not None:
+            _pools.move_to_end(locale)
+            return pool
+
+        pool = _load_pool(locale)
+        _pools[locale] = pool
+        while len(_pools) > max(WORD_POOL_MAX_LOCALES, 1):
+            _pools.popitem(last=False)
+            _evictions += 1
+    return pool
+
+
+def random_word(rng=None, locale: str = None):
+    """Случайное слово из локального словаря"""
+    rng = rng or random
+    return rng.choice(get_word_pool(locale))
+
+
+def pool_metrics():
+    """Загруженные словари: размер, память и время первой загрузки"""
+    with _pools_lock:
+        return {
+            'resident': list(_pools),
+            'max_locales': WORD_POOL_MAX_LOCALES,
+            'evictions': _evictions,
+            'locales': {locale: dict(info) for locale, info in _pool_info.items()},
+        }
+
+
+def reset_pools():
+    global _evictions
+    with _pools_lock:
+        _pools.clear()
+        _pool_info.clear()
+        _evictions = 0
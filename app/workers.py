@@ -0,0 +1,61 @@
+"""Запуск в несколько процессов (gunicorn с preload_app, см. gunicorn.conf.py).
+
+Мастер-процесс один раз заполняет БД и загружает каталог, поисковый индекс
+и словари до fork. Воркеры получают их готовыми и делят страницы памяти
+с мастером, пока данные не меняются (copy-on-write).
+"""
+from .catalog import get_catalog
+from .database import SessionLocal, engine, replica_router
+from . import crud, search, stats, words
+import gc
+import os
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Словари каких локалей загрузить до fork, через запятую
+WORD_PRELOAD_LOCALES = [
+    locale.strip() for locale in os.getenv("WORD_PRELOAD_LOCALES", words.DEFAULT_WORD_LOCALE).split(",")
+    if locale.strip()
+]
+
+# БД заполнена мастер-процессом; воркеры наследуют флаг при fork
+preloaded = False
+
+
+def preload():
+    """Подготовить общие данные в мастер-процессе"""
+    global preloaded
+    db = SessionLocal()
+    try:
+        crud.seed_initial_data(db)
+        preloaded = True
+        snapshot = get_catalog(db)
+        search.get_search_index(snapshot)
+        print(f"Каталог загружен до запуска воркеров: {len(snapshot)} усложнений")
+    except Exception as e:
+        print(f"Ошибка при предзагрузке каталога: {e}")
+    finally:
+        db.close()
+
+    for locale in WORD_PRELOAD_LOCALES:
+        try:
+            words.get_word_pool(locale)
+        except ValueError as e:
+            print(f"Ошибка при предзагрузке словаря: {e}")
+
+    # Соединения мастера не должны достаться воркерам
+    engine.dispose()
+    if replica_router:
+        replica_router.dispose()
+    # Загруженные объекты больше не просматриваются сборщиком мусора, и он не
+    # трогает их страницы памяти в воркерах
+    gc.freeze()
+
+
+def after_fork():
+    """Инициализация воркера сразу после fork"""
+    engine.dispose(close=False)
+    if replica_router:
+        replica_router.dispose(close=False)
+    stats.counters.worker_id = stats.new_worker_id()
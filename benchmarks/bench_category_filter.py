@@ -0,0 +1,105 @@
+"""Бенчмарк выбора случайного усложнения по категории.
+
+Запуск:
+    python benchmarks/bench_category_filter.py --rows 1000000
+    BENCH_DATABASE_URL=postgresql://... python benchmarks/bench_category_filter.py
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+BENCH_DATABASE_URL = os.getenv(
+    "BENCH_DATABASE_URL",
+    f"sqlite:///{os.path.join(tempfile.gettempdir(), 'whattodraw_bench.db')}"
+)
+os.environ.setdefault("DATABASE_URL", BENCH_DATABASE_URL)
+
+from sqlalchemy import create_engine, func, insert  # noqa: E402
+from sqlalchemy.orm import sessionmaker, joinedload  # noqa: E402
+
+from app import crud, models  # noqa: E402
+from app.catalog import get_catalog, invalidate_catalog  # noqa: E402
+from app.database import Base  # noqa: E402
+
+CATEGORIES = 10
+BATCH_SIZE = 10_000
+
+
+def populate(engine, rows):
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+
+    with engine.begin() as conn:
+        conn.execute(insert(models.ChallengeCategory),
+                     [{"id": i + 1, "name": f"Категория {i}"} for i in range(CATEGORIES)])
+        for start in range(0, rows, BATCH_SIZE):
+            conn.execute(insert(models.Challenge), [
+                {
+                    "name": f"Усложнение {n}",
+                    "description": f"Описание усложнения {n}",
+                    # Неравномерные категории: от крупных к мелким
+                    "category_id": (n * n) % CATEGORIES + 1,
+                }
+                for n in range(start, min(start + BATCH_SIZE, rows))
+            ])
+
+
+def measure(label, fn, repeats):
+    timings = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - started) * 1000)
+    print(f"{label:<48} медиана {statistics.median(timings):9.3f} мс   "
+          f"макс {max(timings):9.3f} мс")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--repeats", type=int, default=20)
+    parser.add_argument("--skip-populate", action="store_true")
+    args = parser.parse_args()
+
+    engine = create_engine(BENCH_DATABASE_URL)
+    if not args.skip_populate:
+        started = time.perf_counter()
+        populate(engine, args.rows)
+        print(f"Загружено {args.rows} строк за {time.perf_counter() - started:.1f} с")
+
+    db = sessionmaker(bind=engine)()
+    # n² mod 10 == 5 — около 10% строк
+    category = ["Категория 5"]
+
+    measure("ORDER BY random(), весь каталог", lambda: (
+        db.query(models.Challenge).order_by(func.random()).first()
+    ), args.repeats)
+
+    measure("ORDER BY random() + фильтр по категории", lambda: (
+        db.query(models.Challenge)
+        .join(models.Challenge.category)
+        .options(joinedload(models.Challenge.category))
+        .filter(models.ChallengeCategory.name.in_(category))
+        .order_by(func.random())
+        .first()
+    ), args.repeats)
+
+    invalidate_catalog()
+    started = time.perf_counter()
+    snapshot = get_catalog(db)
+    print(f"Снимок каталога: {len(snapshot)} записей за {time.perf_counter() - started:.2f} с (один раз)")
+
+    measure("Корзины категорий + выборка по первичному ключу", lambda: (
+        crud.get_random_challenge(db, categories=category)
+    ), args.repeats)
+
+    db.close()
+
+
+if __name__ == "__main__":
+    main()
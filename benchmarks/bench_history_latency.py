@@ -0,0 +1,74 @@
+"""Нагрузочный тест: влияние записи истории на задержку /api/random-all.
+
+Сервис цветов подменяется локальным генератором, чтобы измерять только
+собственную задержку приложения.
+
+Запуск:
+    python benchmarks/bench_history_latency.py --requests 3000
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+os.environ.setdefault(
+    "DATABASE_URL",
+    f"sqlite:///{os.path.join(tempfile.gettempdir(), 'whattodraw_bench_history.db')}"
+)
+os.environ.setdefault("DATA_FILE", "data.txt")
+
+from fastapi.testclient import TestClient  # noqa: E402
+
+from app import history  # noqa: E402
+from app.colors import random_color  # noqa: E402
+from app.database import SessionLocal  # noqa: E402
+from app.main import app  # noqa: E402
+
+
+def run(client, requests_count):
+    timings = []
+    for _ in range(requests_count):
+        started = time.perf_counter()
+        response = client.get("/api/random-all")
+        timings.append((time.perf_counter() - started) * 1000)
+        assert response.status_code == 200
+    timings.sort()
+    return {
+        "p50": statistics.median(timings),
+        "p99": timings[int(len(timings) * 0.99) - 1],
+        "max": timings[-1],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=3000)
+    args = parser.parse_args()
+
+    with patch("app.main.get_random_color", random_color), TestClient(app) as client:
+        # Прогрев: снимок каталога, словарь слов, соединения с БД
+        history.stop()
+        run(client, 200)
+
+        without_history = run(client, args.requests)
+
+        writer = history.HistoryWriter(SessionLocal)
+        history.writer = writer
+        writer.start()
+        with_history = run(client, args.requests)
+        history.stop()
+
+    for label, result in (("без истории", without_history), ("с историей", with_history)):
+        print(f"{label:<12} p50 {result['p50']:6.3f} мс   p99 {result['p99']:6.3f} мс   "
+              f"макс {result['max']:7.3f} мс")
+    print(f"Записано строк истории: {writer.written}, отброшено: {writer.dropped}, "
+          f"пачек: {writer.batches}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+"""Нагрузочный тест: потоковый импорт /api/admin/import.
+
+Запускает uvicorn с временной SQLite-базой и передает в него N усложнений
+одним запросом с chunked-телом, не держа их в памяти ни на клиенте, ни на
+сервере. Во время передачи раз в 50 мс снимается RSS сервера: пока тело
+передается, память не должна расти с числом строк. После commit сервер
+строит новый снимок каталога — его размер уже пропорционален каталогу.
+
+Запуск:
+    python benchmarks/bench_import.py --rows 1000000 --format text
+"""
+import argparse
+import http.client
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+TOKEN = "bench-token"
+CATEGORIES = 20
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def rss_mb(pid):
+    with open(f"/proc/{pid}/status") as status:
+        for line in status:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+    return 0.0
+
+
+def generate(rows, fmt, chunk_lines=1000):
+    """Тело запроса кусками по chunk_lines строк"""
+    per_category = -(-rows // CATEGORIES)
+    lines = []
+    for i in range(rows):
+        category = f"Категория {i // per_category}"
+        name = f"Усложнение {i}"
+        description = f"Описание усложнения номер {i} для проверки импорта"
+        if fmt == "ndjson":
+            lines.append(json.dumps({"category": category, "name": name, "description": description},
+                                    ensure_ascii=False))
+        else:
+            if i % per_category == 0:
+                lines.append(f"Категория: {category}")
+            lines.append(f"- {name}: {description}")
+        if len(lines) >= chunk_lines:
+            yield ("\n".join(lines) + "\n").encode("utf-8")
+            lines = []
+    if lines:
+        yield ("\n".join(lines) + "\n").encode("utf-8")
+
+
+def wait_ready(port, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            conn = http.client.HTTPConnection("127.0.0.1", port, timeout=1)
+            conn.request("GET", "/api/health/live")
+            if conn.getresponse().status == 200:
+                return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError("Сервер не запустился")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--format", choices=("text", "ndjson"), default="text")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args()
+
+    db_path = os.path.join(tempfile.gettempdir(), "whattodraw_bench_import.db")
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(db_path + suffix):
+            os.remove(db_path + suffix)
+
+    port = free_port()
+    env = dict(
+        os.environ, DATABASE_URL=f"sqlite:///{db_path}", DATA_FILE="data.txt", HISTORY_ENABLED="false",
+        HEALTH_CHECK_COLOR="false", ADMIN_TOKEN=TOKEN, IMPORT_BATCH_SIZE=str(args.batch_size)
+    )
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=ROOT, env=env, stdout=subprocess.DEVNULL
+    )
+    try:
+        wait_ready(port)
+        baseline = rss_mb(server.pid)
+
+        samples = {"sending": baseline, "after": baseline}
+        phase = ["sending"]
+        done = threading.Event()
+
+        def sample():
+            while not done.is_set():
+                samples[phase[0]] = max(samples[phase[0]], rss_mb(server.pid))
+                time.sleep(0.05)
+
+        sampler = threading.Thread(target=sample, daemon=True)
+        sampler.start()
+
+        def body():
+            yield from generate(args.rows, args.format)
+            phase[0] = "after"
+
+        content_type = "application/x-ndjson" if args.format == "ndjson" else "text/plain; charset=utf-8"
+        started = time.perf_counter()
+        conn = http.client.HTTPConnection("127.0.0.1", port, timeout=3600)
+        conn.request("POST", "/api/admin/import", body=body(), encode_chunked=True,
+                     headers={"Authorization": f"Bearer {TOKEN}", "Content-Type": content_type})
+        response = conn.getresponse()
+        report = json.loads(response.read())
+        elapsed = time.perf_counter() - started
+        done.set()
+        sampler.join()
+    finally:
+        server.terminate()
+        server.wait()
+
+    print(f"статус {response.status}, импортировано {report['imported']}, ошибок {report['error_count']}")
+    print(f"время {elapsed:.1f} с, {report['imported'] / elapsed:,.0f} строк/с")
+    print(f"RSS сервера: до импорта {baseline:.0f} МБ, "
+          f"пик во время передачи {samples['sending']:.0f} МБ, "
+          f"пик после (commit и новый снимок каталога) {samples['after']:.0f} МБ")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,39 @@
+"""Нагрузочный тест: время построения одной палитры из трех гармоний.
+
+Запуск:
+    python benchmarks/bench_palette.py --palettes 20000
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.colors import rgb_to_hex  # noqa: E402
+from app.palette import build_palette  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--palettes", type=int, default=20000)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    bases = [rgb_to_hex(tuple(rng.randrange(256) for _ in range(3))) for _ in range(args.palettes)]
+
+    timings = []
+    for base in bases:
+        started = time.perf_counter()
+        build_palette(base)
+        timings.append((time.perf_counter() - started) * 1000)
+
+    timings.sort()
+    print(f"палитр: {len(timings)}   p50 {statistics.median(timings):.3f} мс   "
+          f"p99 {timings[int(len(timings) * 0.99) - 1]:.3f} мс   макс {timings[-1]:.3f} мс")
+
+
+if __name__ == "__main__":
+    main()
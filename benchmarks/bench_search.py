@@ -0,0 +1,82 @@
+"""Бенчмарк поиска по каталогу усложнений в памяти.
+
+Запуск:
+    python benchmarks/bench_search.py --sizes 1000 10000 100000 1000000
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# Модули приложения создают движок БД при импорте; сам бенчмарк БД не использует
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+from app.catalog import CatalogSnapshot  # noqa: E402
+from app.search import SearchIndex  # noqa: E402
+from app.words import get_word_pool  # noqa: E402
+
+CATEGORIES = ["Временное ограничение", "Художественный стиль", "Композиция рисунка",
+              "Материал", "Настроение", "Перспектива", "Освещение", "Формат"]
+
+
+def make_catalog(size, rng):
+    words = get_word_pool('ru')
+    return CatalogSnapshot(
+        {
+            'id': i + 1,
+            'category': CATEGORIES[i % len(CATEGORIES)],
+            'name': " ".join(rng.choices(words, k=rng.randint(1, 3))),
+            'description': " ".join(rng.choices(words, k=rng.randint(6, 15))),
+        }
+        for i in range(size)
+    )
+
+
+def typo(word, rng):
+    position = rng.randrange(1, len(word) - 1)
+    return word[:position] + rng.choice("аеиоу") + word[position + 1:]
+
+
+def measure(index, queries):
+    timings = []
+    for query in queries:
+        started = time.perf_counter()
+        index.search(query)
+        timings.append((time.perf_counter() - started) * 1000)
+    timings.sort()
+    return statistics.median(timings), timings[int(len(timings) * 0.99) - 1]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000, 1000000])
+    parser.add_argument("--queries", type=int, default=200)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    words = [w for w in get_word_pool('ru') if len(w) >= 6]
+
+    for size in args.sizes:
+        snapshot = make_catalog(size, rng)
+        started = time.perf_counter()
+        index = SearchIndex(snapshot)
+        build = time.perf_counter() - started
+
+        print(f"Каталог {size}: индекс построен за {build:.2f} с, термов {len(index.terms)}")
+        query_sets = {
+            "точное слово": [rng.choice(words) for _ in range(args.queries)],
+            "префикс": [rng.choice(words)[:5] for _ in range(args.queries)],
+            "опечатка": [typo(rng.choice(words), rng) for _ in range(args.queries)],
+            "два слова": [f"{rng.choice(words)} {rng.choice(words)}" for _ in range(args.queries)],
+        }
+        for label, queries in query_sets.items():
+            median, p99 = measure(index, queries)
+            print(f"  {label:<14} медиана {median:7.3f} мс   p99 {p99:7.3f} мс")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""Нагрузочный тест: перегенерация через WebSocket против отдельных HTTP-запросов.
+
+Сервис цветов подменяется локальным генератором. Клиент работает в том же
+процессе, поэтому сетевая задержка не учитывается — сравнивается только
+стоимость обработки одного запроса против одного сообщения.
+
+Запуск:
+    python benchmarks/bench_websocket.py --messages 3000
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+os.environ.setdefault(
+    "DATABASE_URL",
+    f"sqlite:///{os.path.join(tempfile.gettempdir(), 'whattodraw_bench_websocket.db')}"
+)
+os.environ.setdefault("DATA_FILE", "data.txt")
+os.environ.setdefault("HISTORY_ENABLED", "false")
+
+from fastapi.testclient import TestClient  # noqa: E402
+
+from app.colors import random_color  # noqa: E402
+from app.main import app  # noqa: E402
+
+HTTP_ENDPOINTS = {
+    "color": "/api/random-color",
+    "word": "/api/random-word",
+    "challenge": "/api/random-challenge?no_repeat=true",
+    "all": "/api/random-all",
+}
+
+
+def run_http(client, action, count):
+    started = time.perf_counter()
+    for _ in range(count):
+        assert client.get(HTTP_ENDPOINTS[action]).status_code == 200
+    return count / (time.perf_counter() - started)
+
+
+def run_websocket(client, action, count):
+    with client.websocket_connect("/ws/reroll") as ws:
+        started = time.perf_counter()
+        for message_id in range(count):
+            ws.send_json({"id": message_id, "action": action, "no_repeat": action == "challenge"})
+            assert "data" in ws.receive_json()
+        return count / (time.perf_counter() - started)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--messages", type=int, default=3000)
+    args = parser.parse_args()
+
+    with patch("app.main.get_random_color", random_color), TestClient(app) as client:
+        # Прогрев: снимок каталога, словарь слов, соединения с БД
+        run_http(client, "all", 200)
+        run_websocket(client, "all", 200)
+
+        print(f"{'действие':<10} {'HTTP, 1/с':>10} {'WS, 1/с':>10} {'выигрыш':>8}")
+        for action in HTTP_ENDPOINTS:
+            http_rate = run_http(client, action, args.messages)
+            ws_rate = run_websocket(client, action, args.messages)
+            print(f"{action:<10} {http_rate:>10.0f} {ws_rate:>10.0f} {ws_rate / http_rate:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
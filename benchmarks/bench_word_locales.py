@@ -0,0 +1,55 @@
+"""Нагрузочный тест: первая загрузка словаря каждой локали и выбор слова после нее.
+
+Для сравнения измеряется прежний способ — новый Text(locale) на каждый вызов.
+
+Запуск:
+    python benchmarks/bench_word_locales.py --locales ru en de fr ja zh
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from mimesis import Text  # noqa: E402
+
+from app import words  # noqa: E402
+
+
+def per_call_us(func, count):
+    timings = []
+    for _ in range(count):
+        started = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - started) * 1_000_000)
+    return statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--locales", nargs="+", default=["ru", "en", "de", "fr", "ja", "zh"])
+    parser.add_argument("--calls", type=int, default=2000)
+    args = parser.parse_args()
+
+    print(f"{'локаль':<7} {'слов':>6} {'первый, мс':>11} {'память, КБ':>11} "
+          f"{'из словаря, мкс':>16} {'Text() на вызов, мкс':>21}")
+    for locale in args.locales:
+        tracemalloc.start()
+        started = time.perf_counter()
+        words.get_word_pool(locale)
+        first_ms = (time.perf_counter() - started) * 1000
+        traced, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        info = words.pool_metrics()["locales"][locale]
+        pooled = per_call_us(lambda: words.random_word(locale=locale), args.calls)
+        naive = per_call_us(lambda: Text(locale).word(), min(args.calls, 200))
+        print(f"{locale:<7} {info['words']:>6} {first_ms:>11.2f} {traced / 1024:>11.0f} "
+              f"{pooled:>16.2f} {naive:>21.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+"""Нагрузочный тест: пропускная способность и память gunicorn с 1..N воркерами.
+
+Каждый вариант запускается отдельным процессом gunicorn с gunicorn.conf.py,
+нагрузку дают несколько клиентских процессов с keep-alive соединениями.
+Память считается по /proc (Linux): PSS учитывает общие с мастером страницы
+пропорционально, поэтому показывает выигрыш от предзагрузки до fork.
+
+Запуск:
+    python benchmarks/bench_workers.py --workers 1 2 4 --seconds 10
+"""
+import argparse
+import http.client
+import multiprocessing
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+PATHS = ("/api/random-challenge", "/api/random-word", "/api/palette")
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def wait_ready(port, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            conn = http.client.HTTPConnection("127.0.0.1", port, timeout=1)
+            conn.request("GET", "/api/health")
+            if conn.getresponse().status == 200:
+                return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError("gunicorn не запустился")
+
+
+def client(port, seconds, counter):
+    conn = http.client.HTTPConnection("127.0.0.1", port)
+    deadline = time.monotonic() + seconds
+    done = 0
+    while time.monotonic() < deadline:
+        conn.request("GET", PATHS[done % len(PATHS)])
+        response = conn.getresponse()
+        response.read()
+        assert response.status == 200, response.status
+        done += 1
+    with counter.get_lock():
+        counter.value += done
+
+
+def memory_kb(pid):
+    """RSS и PSS процесса из /proc/<pid>/smaps_rollup"""
+    values = {}
+    try:
+        with open(f"/proc/{pid}/smaps_rollup") as f:
+            for line in f:
+                key, _, rest = line.partition(":")
+                if key in ("Rss", "Pss"):
+                    values[key] = int(rest.split()[0])
+    except OSError:
+        pass
+    return values.get("Rss", 0), values.get("Pss", 0)
+
+
+def children(pid):
+    try:
+        with open(f"/proc/{pid}/task/{pid}/children") as f:
+            return [int(child) for child in f.read().split()]
+    except OSError:
+        return []
+
+
+def run(workers, clients, seconds, database_url):
+    port = free_port()
+    env = dict(os.environ, WEB_CONCURRENCY=str(workers), PORT=str(port),
+               DATABASE_URL=database_url, DATA_FILE="data.txt", HISTORY_ENABLED="false")
+    server = subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py", "app.main:app"],
+        cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        wait_ready(port)
+        counter = multiprocessing.Value("l", 0)
+        processes = [
+            multiprocessing.Process(target=client, args=(port, seconds, counter))
+            for _ in range(clients)
+        ]
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join()
+
+        pids = [server.pid, *children(server.pid)]
+        rss = sum(memory_kb(pid)[0] for pid in pids)
+        pss = sum(memory_kb(pid)[1] for pid in pids)
+        return counter.value / seconds, rss, pss
+    finally:
+        server.terminate()
+        server.wait(30)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--clients", type=int, default=0, help="по умолчанию 2 на воркер")
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--database-url", default=os.getenv(
+        "BENCH_DATABASE_URL",
+        f"sqlite:///{os.path.join(tempfile.gettempdir(), 'whattodraw_bench_workers.db')}"
+    ))
+    args = parser.parse_args()
+
+    print(f"ядер: {os.cpu_count()}")
+    print(f"{'воркеров':>8} {'запросов/с':>11} {'RSS, МБ':>9} {'PSS, МБ':>9}")
+    for workers in args.workers:
+        rate, rss, pss = run(workers, args.clients or 2 * workers, args.seconds, args.database_url)
+        print(f"{workers:>8} {rate:>11.0f} {rss / 1024:>9.1f} {pss / 1024:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
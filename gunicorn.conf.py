@@ -0,0 +1,40 @@
+"""Настройки gunicorn: несколько процессов uvicorn с общими предзагруженными данными.
+
+Запуск:
+    gunicorn -c gunicorn.conf.py app.main:app
+"""
+import os
+
+# Не больше стольких воркеров по умолчанию: каждый занимает ~70 МБ и запускает
+# свои фоновые задачи, а в контейнере видны все ядра машины, а не его квота
+MAX_DEFAULT_WORKERS = 4
+
+
+def default_workers():
+    """Число доступных процессу ядер, но не больше MAX_DEFAULT_WORKERS"""
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:  # нет sched_getaffinity (macOS, Windows)
+        cpus = os.cpu_count() or 1
+    return max(min(cpus, MAX_DEFAULT_WORKERS), 1)
+
+
+workers = int(os.getenv("WEB_CONCURRENCY") or default_workers())
+# Приложение читает число процессов, чтобы разделить между ними пул соединений с БД
+os.environ["WEB_CONCURRENCY"] = str(workers)
+
+bind = f"0.0.0.0:{os.getenv('PORT', '8000')}"
+worker_class = "uvicorn.workers.UvicornWorker"
+# Приложение импортируется в мастер-процессе до fork
+preload_app = True
+graceful_timeout = 15
+
+
+def on_starting(server):
+    from app import workers as app_workers
+    app_workers.preload()
+
+
+def post_fork(server, worker):
+    from app import workers as app_workers
+    app_workers.after_fork()
@@ -209,16 +209,176 @@ document.addEventListener('DOMContentLoaded', function() {
         });
     }
 
+    // Канал перегенерации: одно WebSocket-соединение на страницу, при его
+    // недоступности запросы уходят по HTTP
+    const HTTP_ENDPOINTS = {
+        color: '/api/random-color',
+        word: '/api/random-word',
+        challenge: '/api/random-challenge?no_repeat=true',
+        all: '/api/random-all'
+    };
+    const WS_TIMEOUT_MS = 5000;
+    const WS_RETRY_MS = 30000;
+
+    let socketReady = null;
+    let socketFailedAt = 0;
+    let nextRequestId = 1;
+    const pendingRequests = new Map();
+
+    function openSocket() {
+        if (!('WebSocket' in window)) return Promise.resolve(null);
+        if (socketReady) return socketReady;
+        // После обрыва не пытаемся переподключаться на каждый клик
+        if (Date.now() - socketFailedAt < WS_RETRY_MS) return Promise.resolve(null);
+
+        socketReady = new Promise(resolve => {
+            const protocol = window.location.protocol === 'https:' ? 'wss:' : 'ws:';
+            let ws;
+            try {
+                ws = new WebSocket(`${protocol}//${window.location.host}/ws/reroll`);
+            } catch (error) {
+                socketFailedAt = Date.now();
+                socketReady = null;
+                resolve(null);
+                return;
+            }
+
+            ws.addEventListener('open', () => resolve(ws));
+            ws.addEventListener('message', event => {
+                const message = JSON.parse(event.data);
+                const pending = pendingRequests.get(message.id);
+                if (!pending) return;
+                pendingRequests.delete(message.id);
+                clearTimeout(pending.timer);
+                if (message.error) {
+                    const error = new Error(message.error.detail);
+                    error.fromServer = true;
+                    pending.reject(error);
+                } else {
+                    pending.resolve(message.data);
+                }
+            });
+            ws.addEventListener('close', () => {
+                socketFailedAt = Date.now();
+                socketReady = null;
+                resolve(null);
+                pendingRequests.forEach(pending => {
+                    clearTimeout(pending.timer);
+                    pending.reject(new Error('WebSocket closed'));
+                });
+                pendingRequests.clear();
+            });
+        });
+        return socketReady;
+    }
+
+    function sendOverSocket(ws, action) {
+        return new Promise((resolve, reject) => {
+            const id = nextRequestId++;
+            const timer = setTimeout(() => {
+                pendingRequests.delete(id);
+                reject(new Error('WebSocket timeout'));
+            }, WS_TIMEOUT_MS);
+            pendingRequests.set(id, { resolve, reject, timer });
+            // Усложнения без повторов, пока не будет пройден весь каталог
+            ws.send(JSON.stringify({ id, action, no_repeat: action === 'challenge' }));
+        });
+    }
+
+    async function reroll(action) {
+        const ws = await openSocket();
+        if (ws && ws.readyState === WebSocket.OPEN) {
+            try {
+                return await sendOverSocket(ws, action);
+            } catch (error) {
+                // Ошибку сервера повторять по HTTP бессмысленно
+                if (error.fromServer) throw error;
+            }
+        }
+
+        const response = await fetch(HTTP_ENDPOINTS[action]);
+        if (!response.ok) throw new Error('Network error');
+        return response.json();
+    }
+
+    // Соединяемся заранее, чтобы первый клик не ждал рукопожатия
+    openSocket();
+
+    // Каталог усложнений хранится в браузере, и усложнение выбирается локально;
+    // сервер только подтверждает, что версия каталога не изменилась
+    const CATALOG_STORAGE_KEY = 'whatToDraw.catalog';
+    const CATALOG_REVALIDATE_MS = 5 * 60 * 1000;
+
+    let catalog = null;
+    let catalogCheckedAt = 0;
+    let deck = [];
+
+    function loadStoredCatalog() {
+        try {
+            const stored = JSON.parse(localStorage.getItem(CATALOG_STORAGE_KEY));
+            if (stored && stored.version && Array.isArray(stored.challenges)) catalog = stored;
+        } catch (error) {
+            // localStorage недоступен — каталог будет загружен с сервера
+        }
+    }
+
+    async function refreshCatalog() {
+        const headers = catalog ? { 'If-None-Match': `"${catalog.version}"` } : {};
+        const response = await fetch('/api/catalog', { headers });
+        if (response.status === 304) {
+            catalogCheckedAt = Date.now();
+            return;
+        }
+        if (!response.ok) throw new Error('Network error');
+
+        const fresh = await response.json();
+        if (!catalog || fresh.version !== catalog.version) deck = [];
+        catalog = fresh;
+        catalogCheckedAt = Date.now();
+        try {
+            localStorage.setItem(CATALOG_STORAGE_KEY, JSON.stringify(fresh));
+        } catch (error) {
+            // Не удалось сохранить — при следующей загрузке страницы скачаем заново
+        }
+    }
+
+    // Перетасованные номера усложнений (Фишер — Йетс)
+    function shuffledIndexes(size) {
+        const indexes = Array.from({ length: size }, (_, i) => i);
+        for (let i = size - 1; i > 0; i--) {
+            const j = Math.floor(Math.random() * (i + 1));
+            [indexes[i], indexes[j]] = [indexes[j], indexes[i]];
+        }
+        return indexes;
+    }
+
+    async function pickLocalChallenge() {
+        if (!catalog || Date.now() - catalogCheckedAt > CATALOG_REVALIDATE_MS) {
+            try {
+                await refreshCatalog();
+            } catch (error) {
+                // Без сети продолжаем выбирать из сохраненного каталога
+                if (!catalog) throw error;
+            }
+        }
+        if (!catalog.challenges.length) throw new Error('Empty catalog');
+
+        // Без повторов, пока не будет пройден весь каталог
+        if (!deck.length) deck = shuffledIndexes(catalog.challenges.length);
+        const [, categoryIndex, name, description] = catalog.challenges[deck.pop()];
+        return { category: catalog.categories[categoryIndex], name, description };
+    }
+
+    loadStoredCatalog();
+    refreshCatalog().catch(() => {});
+
     // Получить новый цвет
     async function fetchNewColor() {
         try {
             newColorBtn.disabled = true;
             newColorBtn.innerHTML = '<i class="bi bi-hourglass-split me-1"></i>Загрузка...';
 
-            const response = await fetch('/api/random-color');
-            if (!response.ok) throw new Error('Network error');
-
-            const color = await response.json();
+            const color = await reroll('color');
 
             // Анимация
             colorDisplay.classList.add('pulse');
@@ -246,10 +406,7 @@ document.addEventListener('DOMContentLoaded', function() {
             newWordBtn.disabled = true;
             newWordBtn.innerHTML = '<i class="bi bi-hourglass-split me-1"></i>Загрузка...';
 
-            const response = await fetch('/api/random-word');
-            if (!response.ok) throw new Error('Network error');
-
-            const data = await response.json();
+            const data = await reroll('word');
 
             // Анимация
             randomWord.classList.add('pulse');
@@ -275,10 +432,7 @@ document.addEventListener('DOMContentLoaded', function() {
             newChallengeBtn.disabled = true;
             newChallengeBtn.innerHTML = '<i class="bi bi-hourglass-split me-1"></i>Загрузка...';
 
-            const response = await fetch('/api/random-challenge');
-            if (!response.ok) throw new Error('Network error');
-
-            const challenge = await response.json();
+            const challenge = await pickLocalChallenge().catch(() => reroll('challenge'));
 
             // Останавливаем таймер, если он был запущен
             stopTimer();
@@ -358,10 +512,7 @@ document.addEventListener('DOMContentLoaded', function() {
             newAllBtn.disabled = true;
             newAllBtn.innerHTML = '<i class="bi bi-hourglass-split me-2"></i>Генерация...';
 
-            const response = await fetch('/api/random-all');
-            if (!response.ok) throw new Error('Network error');
-
-            const data = await response.json();
+            const data = await reroll('all');
 
             // Останавливаем таймер, если он был запущен
             stopTimer();
@@ -65,4 +65,62 @@ def test_api_random_all(client, mock_requests, db_session, sample_challenge_data
     assert data["color"]["name"] == "Test Color"
     assert data["color"]["hex"] == "#FF0000"
     assert data["word"] == "тестовое_слово"
-    assert data["challenge"]["category"] == "Test Category"
\ No newline at end of file
+    assert data["challenge"]["category"] == "Test Category"
+
+
+def test_api_random_challenge_by_category(client, db_session, clean_db):
+    """Тест API для получения усложнения из выбранной категории"""
+    from app.models import Challenge, ChallengeCategory
+
+    category1 = ChallengeCategory(name="Временное ограничение")
+    category2 = ChallengeCategory(name="Композиция рисунка")
+    category3 = ChallengeCategory(name="Художественный стиль")
+    db_session.add_all([category1, category2, category3])
+    db_session.flush()
+    db_session.add_all([
+        Challenge(name="1 минута", description="1", category_id=category1.id),
+        Challenge(name="Золотое сечение", description="", category_id=category2.id),
+        Challenge(name="Реализм", description="", category_id=category3.id)
+    ])
+    db_session.commit()
+
+    for _ in range(5):
+        response = client.get("/api/random-challenge", params={"category": "Композиция рисунка"})
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()["name"] == "Золотое сечение"
+
+    with patch('app.main.get_random_color', return_value={'name': 'Red', 'hex': '#FF0000'}):
+        response = client.get("/api/random-all", params=[("category", "Временное ограничение"),
+                                                         ("category", "Художественный стиль")])
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()["challenge"]["category"] in ["Временное ограничение", "Художественный стиль"]
+
+
+def test_api_catalog(client, db_session, sample_challenge_data):
+    """Тест API каталога: компактный формат, ETag и смена версии"""
+    from app.catalog import invalidate_catalog
+    from app.models import Challenge
+
+    response = client.get("/api/catalog")
+
+    assert response.status_code == status.HTTP_200_OK
+    data = response.json()
+    assert data["categories"] == ["Test Category"]
+    assert data["challenges"] == [
+        [sample_challenge_data["challenge"].id, 0, "Test Challenge", "Test Description"]
+    ]
+    assert response.headers["ETag"] == f'"{data["version"]}"'
+
+    cached = client.get("/api/catalog", headers={"If-None-Match": response.headers["ETag"]})
+    assert cached.status_code == status.HTTP_304_NOT_MODIFIED
+
+    # Изменение каталога меняет версию
+    db_session.add(Challenge(name="Another", description="",
+                             category_id=sample_challenge_data["category"].id))
+    db_session.commit()
+    invalidate_catalog()
+
+    changed = client.get("/api/catalog", headers={"If-None-Match": response.headers["ETag"]})
+    assert changed.status_code == status.HTTP_200_OK
+    assert changed.json()["version"] != data["version"]
+    assert len(changed.json()["challenges"]) == 2
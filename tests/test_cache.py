@@ -0,0 +1,189 @@
+import socketserver
+import threading
+import time
+
+import pytest
+from fastapi import status
+
+from app import cache
+from app.cache import LocalCache, RedisCache, encode_command
+
+
+class FakeRedisHandler(socketserver.StreamRequestHandler):
+    """Минимальный сервер с протоколом Redis: GET, SET (NX, PX, EX), DEL, PING, AUTH, SELECT"""
+
+    def handle(self):
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            args = []
+            for _ in range(int(line[1:])):
+                length = int(self.rfile.readline()[1:])
+                args.append(self.rfile.read(length + 2)[:-2])
+            self.wfile.write(self.server.execute(args))
+
+
+class FakeRedisServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), FakeRedisHandler)
+        self.data = {}
+        self.commands = []
+        self.lock = threading.Lock()
+
+    @property
+    def url(self):
+        return f"redis://127.0.0.1:{self.server_address[1]}/0"
+
+    def _alive(self, key):
+        value, expires_at = self.data.get(key, (None, None))
+        if expires_at is not None and expires_at <= time.monotonic():
+            del self.data[key]
+            return None
+        return value
+
+    def execute(self, args):
+        command = args[0].decode().upper()
+        with self.lock:
+            self.commands.append(command)
+            if command in ("PING", "AUTH", "SELECT"):
+                return b"+OK\r\n"
+            if command == "GET":
+                value = self._alive(args[1])
+                return b"$-1\r\n" if value is None else b"$%d\r\n%s\r\n" % (len(value), value)
+            if command == "DEL":
+                existed = self._alive(args[1]) is not None
+                self.data.pop(args[1], None)
+                return b":%d\r\n" % existed
+            if command == "SET":
+                options = [arg.decode().upper() for arg in args[3:]]
+                if "NX" in options and self._alive(args[1]) is not None:
+                    return b"$-1\r\n"
+                expires_at = None
+                if "PX" in options:
+                    expires_at = time.monotonic() + int(options[options.index("PX") + 1]) / 1000
+                if "EX" in options:
+                    expires_at = time.monotonic() + int(options[options.index("EX") + 1])
+                self.data[args[1]] = (args[2], expires_at)
+                return b"+OK\r\n"
+            return b"-ERR unknown command\r\n"
+
+
+@pytest.fixture
+def fake_redis():
+    server = FakeRedisServer()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def shared_cache(fake_redis):
+    """Кэш приложения на время теста — в фейковом Redis"""
+    yield cache.configure(fake_redis.url)
+    cache.configure("memory://")
+
+
+def test_encode_command():
+    value = "значение".encode("utf-8")
+    assert encode_command("SET", "k", "значение") == \
+        b"*3\r\n$3\r\nSET\r\n$1\r\nk\r\n$%d\r\n%s\r\n" % (len(value), value)
+
+
+def test_local_cache_lru_and_ttl():
+    """Старые записи вытесняются, просроченные не возвращаются"""
+    local = LocalCache(max_entries=2)
+    local.set("a", 1, ttl=None)
+    local.set("b", 2, ttl=None)
+    local.get("a")
+    local.set("c", 3, ttl=None)
+
+    assert local.get("b") is None
+    assert local.get("a") == 1
+
+    local.set("short", 4, ttl=0.01)
+    time.sleep(0.02)
+    assert local.get("short") is None
+
+    metrics = local.metrics()
+    assert metrics["evictions"] == 2
+    assert metrics["hits"] == 2
+    assert metrics["misses"] == 2
+
+
+@pytest.mark.parametrize("backend", ["memory", "redis"])
+def test_get_or_set_coalesces_misses(backend, fake_redis):
+    """Одновременные промахи вычисляют значение один раз"""
+    if backend == "memory":
+        caches = [LocalCache()] * 2
+    else:
+        # Два экземпляра — как два процесса с общим сервером
+        caches = [RedisCache(fake_redis.url), RedisCache(fake_redis.url)]
+
+    calls = []
+
+    def loader():
+        calls.append(1)
+        time.sleep(0.1)
+        return {"value": 42}
+
+    results = []
+    threads = [
+        threading.Thread(target=lambda c=caches[i % 2]: results.append(c.get_or_set("key", loader, 60)))
+        for i in range(6)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(calls) == 1
+    assert results == [{"value": 42}] * 6
+    assert sum(c.coalesced for c in set(caches)) == 5
+
+
+def test_redis_cache_roundtrip_and_ttl(fake_redis):
+    redis = RedisCache(fake_redis.url, prefix="t:")
+    redis.set("k", {"слово": [1, 2]}, ttl=0.05)
+
+    assert redis.get("k") == {"слово": [1, 2]}
+    assert b"t:k" in fake_redis.data
+
+    time.sleep(0.06)
+    assert redis.get("k") is None
+
+    redis.set("k", 1, ttl=60)
+    redis.delete("k")
+    assert redis.get("k") is None
+    assert redis.metrics()["hits"] == 1
+
+
+def test_redis_cache_unavailable_fails_open():
+    """Без Redis значение просто вычисляется"""
+    redis = RedisCache("redis://127.0.0.1:1/0", timeout=0.1)
+
+    assert redis.get_or_set("k", lambda: "fresh", 60) == "fresh"
+    assert redis.metrics()["errors"] >= 1
+
+
+def test_catalog_in_shared_cache(client, sample_challenge_data, shared_cache, fake_redis):
+    """Каталог кладется в общий кэш и читается из него остальными процессами"""
+    from app import catalog
+
+    response = client.get("/api/catalog")
+    assert response.status_code == status.HTTP_200_OK
+    assert b"whattodraw:catalog" in fake_redis.data
+
+    # Другой процесс без своего снимка берет каталог из кэша, не из БД
+    catalog._snapshot = None
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr(catalog, "load_catalog", lambda db: pytest.fail("каталог прочитан из БД"))
+        assert client.get("/api/catalog").json()["version"] == response.json()["version"]
+
+    catalog.invalidate_catalog()
+    assert b"whattodraw:catalog" not in fake_redis.data
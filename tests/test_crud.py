@@ -1,11 +1,13 @@
 import pytest
 from unittest.mock import patch, mock_open, MagicMock
 from sqlalchemy.exc import SQLAlchemyError
+from fastapi import HTTPException
 
 from app.crud import (
     get_random_challenge,
     load_data_from_file,
     create_initial_data,
+    seed_initial_data,
     get_data_file_path
 )
 from app.models import Challenge, ChallengeCategory
@@ -191,4 +193,81 @@ def test_get_data_file_path_from_env():
 def test_get_data_file_path_no_env():
     """Тест получения пути к файлу данных без переменной окружения"""
     with pytest.raises(ValueError, match="Переменная окружения DATA_FILE не установлена"):
-        get_data_file_path()
\ No newline at end of file
+        get_data_file_path()
+
+
+def test_get_random_challenge_by_category(db_session, clean_db):
+    """Тест выбора усложнения только из указанных категорий"""
+    category1 = ChallengeCategory(name="Временное ограничение")
+    category2 = ChallengeCategory(name="Художественный стиль")
+    db_session.add_all([category1, category2])
+    db_session.flush()
+
+    db_session.add_all([
+        Challenge(name=f"Время {i}", description=str(i), category_id=category1.id)
+        for i in range(5)
+    ] + [
+        Challenge(name=f"Стиль {i}", description="", category_id=category2.id)
+        for i in range(5)
+    ])
+    db_session.commit()
+
+    for _ in range(10):
+        result = get_random_challenge(db_session, categories=["Художественный стиль"])
+        assert result["category"].name == "Художественный стиль"
+        assert result["challenge"].name.startswith("Стиль")
+
+
+def test_get_random_challenge_unknown_category(db_session, sample_challenge_data):
+    """Тест выбора из несуществующей категории"""
+    with pytest.raises(HTTPException) as exc_info:
+        get_random_challenge(db_session, categories=["Нет такой категории"])
+
+    assert exc_info.value.status_code == 404
+
+
+def test_seed_initial_data_once_concurrently(db_engine, db_session, clean_db, tmp_path):
+    """Одновременный запуск нескольких процессов загружает данные один раз"""
+    import threading
+    from sqlalchemy.orm import sessionmaker
+
+    Session = sessionmaker(bind=db_engine)
+    errors = []
+
+    def seed():
+        session = Session()
+        try:
+            seed_initial_data(session, "data.txt")
+        except Exception as e:
+            errors.append(e)
+        finally:
+            session.close()
+
+    with patch('app.crud.SEED_LOCK_FILE', str(tmp_path / "seed.lock")):
+        threads = [threading.Thread(target=seed) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    assert errors == []
+    categories = [c.name for c in db_session.query(ChallengeCategory).all()]
+    assert len(categories) == len(set(categories)) == len(load_data_from_file("data.txt"))
+
+
+def test_preloaded_worker_skips_seeding(db_session, sample_challenge_data):
+    """Воркер после fork не заполняет БД повторно, а снимок мастера не заменяется копией"""
+    from fastapi.testclient import TestClient
+    from app import catalog, workers
+    from app.main import app
+
+    snapshot = catalog.get_catalog(db_session)
+    snapshot.loaded_at -= catalog.CATALOG_TTL
+    catalog.get_cache().delete(catalog.CATALOG_CACHE_KEY)
+    assert catalog.get_catalog(db_session) is snapshot
+    assert snapshot.is_fresh()
+
+    with patch.object(workers, 'preloaded', True), patch('app.crud.seed_initial_data') as seed:
+        with TestClient(app):
+            pass
+    seed.assert_not_called()
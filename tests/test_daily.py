@@ -0,0 +1,104 @@
+import pytest
+from datetime import datetime, date, timezone
+from zoneinfo import ZoneInfo
+from fastapi import status
+
+from app import daily
+from app.models import DailyTriple
+
+
+@pytest.fixture(autouse=True)
+def reset_daily_cache():
+    daily.reset_cache()
+    yield
+    daily.reset_cache()
+
+
+@pytest.fixture
+def clean_daily(db_session):
+    db_session.query(DailyTriple).delete()
+    db_session.commit()
+    yield
+
+
+def test_seconds_until_rollover():
+    """Время до полуночи считается в нужном часовом поясе"""
+    now = datetime(2024, 3, 10, 20, 0, tzinfo=timezone.utc)
+
+    assert daily.seconds_until_rollover(ZoneInfo("UTC"), now) == 4 * 3600
+    # В Москве (UTC+3) уже 23:00
+    assert daily.seconds_until_rollover(ZoneInfo("Europe/Moscow"), now) == 3600
+    assert daily.local_day(ZoneInfo("Asia/Tokyo"), now) == date(2024, 3, 11)
+
+
+def test_get_daily_triple_persisted(db_session, sample_challenge_data, clean_daily):
+    """Задание дня вычисляется один раз и сохраняется в БД"""
+    now = datetime(2024, 3, 10, 12, 0, tzinfo=timezone.utc)
+
+    entry, max_age = daily.get_daily_triple(db_session, "UTC", now=now)
+
+    assert entry['payload']['date'] == "2024-03-10"
+    assert entry['payload']['challenge']['name'] == "Test Challenge"
+    assert max_age == 12 * 3600
+    assert db_session.query(DailyTriple).count() == 1
+
+    # Повторный вызов берется из памяти
+    again, _ = daily.get_daily_triple(db_session, "UTC", now=now)
+    assert again is entry
+
+    # После сброса памяти задание читается из БД, а не вычисляется заново
+    daily.reset_cache()
+    from_db, _ = daily.get_daily_triple(db_session, "UTC", now=now)
+    assert from_db['payload'] == entry['payload']
+    assert db_session.query(DailyTriple).count() == 1
+
+
+def test_precompute_before_midnight(db_session, sample_challenge_data, clean_daily):
+    """Задание следующего дня вычисляется заранее, перед полуночью"""
+    daily.get_daily_triple(db_session, "UTC", now=datetime(2024, 3, 10, 12, 0, tzinfo=timezone.utc))
+
+    assert daily.precompute(db_session, now=datetime(2024, 3, 10, 12, 0, tzinfo=timezone.utc)) == []
+
+    late = datetime(2024, 3, 10, 23, 55, tzinfo=timezone.utc)
+    computed = daily.precompute(db_session, now=late)
+
+    assert ("UTC", date(2024, 3, 11)) in computed
+    assert db_session.query(DailyTriple).filter_by(day=date(2024, 3, 11)).count() == 1
+
+
+def test_api_daily(client, mock_requests, sample_challenge_data, clean_daily):
+    """Эндпоинт отдает задание дня с заголовками кэширования"""
+    response = client.get("/api/daily", params={"tz": "Europe/Moscow"})
+
+    assert response.status_code == status.HTTP_200_OK
+    data = response.json()
+    assert data['timezone'] == "Europe/Moscow"
+    assert {'color', 'word', 'challenge'} <= set(data)
+    assert "max-age" in response.headers["Cache-Control"]
+    mock_requests.get.assert_not_called()
+
+    cached = client.get("/api/daily", params={"tz": "Europe/Moscow"},
+                        headers={"If-None-Match": response.headers["ETag"]})
+    assert cached.status_code == status.HTTP_304_NOT_MODIFIED
+
+
+def test_daily_entry_keeps_challenge_id(db_session, sample_challenge_data, clean_daily):
+    """Задание дня учитывается в счетчиках по id усложнения"""
+    entry, _ = daily.get_daily_triple(db_session, "UTC")
+    assert entry['challenge_id'] == sample_challenge_data['challenge'].id
+
+
+def test_api_daily_unknown_timezone(client):
+    response = client.get("/api/daily", params={"tz": "Mars/Olympus"})
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+def test_api_daily_empty_catalog(client, db_session, clean_db, clean_daily):
+    """При пустом каталоге задание дня отдается с базовым заданием и не сохраняется"""
+    from app.catalog import FALLBACK_CHALLENGE
+
+    response = client.get("/api/daily", params={"tz": "UTC"})
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()['challenge'] == FALLBACK_CHALLENGE
+    assert db_session.query(DailyTriple).count() == 0
@@ -0,0 +1,56 @@
+import threading
+from unittest.mock import patch
+
+from sqlalchemy import text
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import QueuePool
+
+from app.crud import create_initial_data, get_random_challenge
+from app.database import Base, make_engine, is_sqlite_file, pool_options, SQLITE_BUSY_TIMEOUT_MS
+from app.models import ChallengeCategory
+
+
+def test_pool_options_divided_per_worker():
+    """Пул соединений делится между процессами"""
+    assert pool_options("sqlite://", 4) == {}
+    with patch('app.database.DB_POOL_SIZE', 20), patch('app.database.DB_MAX_OVERFLOW', 8):
+        assert pool_options("postgresql://db/app", 4) == {"pool_size": 5, "max_overflow": 2}
+        assert pool_options("postgresql://db/app", 40) == {"pool_size": 1, "max_overflow": 0}
+        assert pool_options("sqlite:///app.db", 4) == {"pool_size": 5, "max_overflow": 2}
+
+
+def test_sqlite_file_engine(tmp_path):
+    """SQLite-файл: WAL, pragma на каждом соединении, отдельные соединения у одновременных сессий"""
+    assert not is_sqlite_file("sqlite://")
+    assert not is_sqlite_file("postgresql://db/app")
+
+    url = f"sqlite:///{tmp_path / 'app.db'}"
+    assert is_sqlite_file(url)
+    engine = make_engine(url)
+    assert isinstance(engine.pool, QueuePool)
+    Base.metadata.create_all(bind=engine)
+
+    other = []
+
+    def connect_in_thread():
+        with engine.connect() as conn:
+            other.append((conn.connection.dbapi_connection, conn.execute(text("PRAGMA busy_timeout")).scalar()))
+
+    with engine.connect() as conn:
+        assert conn.execute(text("PRAGMA journal_mode")).scalar() == "wal"
+        assert conn.execute(text("PRAGMA busy_timeout")).scalar() == SQLITE_BUSY_TIMEOUT_MS
+        assert conn.execute(text("PRAGMA foreign_keys")).scalar() == 1
+
+        # Пока соединение занято, другой поток получает свое, тоже настроенное
+        thread = threading.Thread(target=connect_in_thread)
+        thread.start()
+        thread.join()
+        assert other[0][0] is not conn.connection.dbapi_connection
+        assert other[0][1] == SQLITE_BUSY_TIMEOUT_MS
+
+    session = sessionmaker(bind=engine)()
+    create_initial_data(session, "data.txt")
+    assert session.query(ChallengeCategory).count() > 0
+    assert get_random_challenge(session)["challenge"].category is not None
+    session.close()
+    engine.dispose()
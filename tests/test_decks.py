@@ -0,0 +1,156 @@
+import pytest
+from collections import Counter
+from fastapi import status
+
+from app.catalog import CatalogSnapshot
+from app.decks import DeckStore, Permutation, pack_state, unpack_state, _category_seed
+from app.crud import get_random_challenge
+from app.models import Challenge, ChallengeCategory
+
+
+def make_snapshot(sizes):
+    challenges = []
+    next_id = 1
+    for category, size in sizes.items():
+        for i in range(size):
+            challenges.append({
+                'id': next_id,
+                'category': category,
+                'name': f"{category} {i}",
+                'description': ''
+            })
+            next_id += 1
+    return CatalogSnapshot(challenges)
+
+
+@pytest.mark.parametrize("size", [1, 2, 7, 100, 1000])
+def test_permutation_is_bijection(size):
+    """Перестановка проходит каждый индекс ровно один раз"""
+    permutation = Permutation(size, seed=12345)
+    assert sorted(permutation[i] for i in range(size)) == list(range(size))
+
+
+def test_permutation_depends_on_seed():
+    first = [Permutation(50, seed=1)[i] for i in range(50)]
+    second = [Permutation(50, seed=2)[i] for i in range(50)]
+    assert first != second
+
+
+def test_pack_unpack_state():
+    """Состояние клиента упаковывается в одно число и распаковывается обратно"""
+    snapshot = make_snapshot({'A': 5, 'B': 300})
+    state = pack_state(snapshot, 77, [3, 250])
+
+    assert isinstance(state, int)
+    assert unpack_state(snapshot, state) == (77, [3, 250])
+    # Состояние от другой версии каталога не принимается
+    assert unpack_state(make_snapshot({'A': 6}), state) is None
+
+
+def test_draw_no_repeats_until_exhausted():
+    """Клиент не видит повторов, пока не пройдет весь каталог"""
+    snapshot = make_snapshot({'A': 3, 'B': 4, 'C': 5})
+    store = DeckStore()
+
+    first_cycle = [store.draw("client", snapshot)['id'] for _ in range(12)]
+    assert sorted(first_cycle) == list(range(1, 13))
+
+    second_cycle = [store.draw("client", snapshot)['id'] for _ in range(12)]
+    assert sorted(second_cycle) == list(range(1, 13))
+
+
+def test_draw_weighted_categories():
+    """Веса категорий влияют на выбор, нулевой вес исключает категорию"""
+    snapshot = make_snapshot({'A': 50, 'B': 50})
+    store = DeckStore()
+
+    categories = Counter(
+        store.draw("client", snapshot, {'A': 1, 'B': 0})['category'] for _ in range(50)
+    )
+    assert categories == {'A': 50}
+
+
+def test_store_evicts_oldest_client():
+    snapshot = make_snapshot({'A': 3})
+    store = DeckStore(max_clients=2)
+
+    for client_id in ("a", "b", "c"):
+        store.draw(client_id, snapshot)
+
+    assert len(store) == 2
+
+
+def test_store_evicts_least_recently_used_client():
+    """Вытесняется клиент, который дольше всех не обращался, а не первый добавленный"""
+    snapshot = make_snapshot({'A': 3})
+    store = DeckStore(max_clients=2)
+
+    store.draw("active", snapshot)
+    store.draw("idle", snapshot)
+    store.draw("active", snapshot)
+    store.draw("new", snapshot)
+
+    assert set(store._states) == {"active", "new"}
+
+
+def test_category_seeds_do_not_collide():
+    seeds = {_category_seed(seed, index) for seed in (0, 1, 2) for index in range(300)}
+    assert len(seeds) == 900
+
+
+def test_get_random_challenge_for_client(db_session, clean_db):
+    """crud.get_random_challenge выдает усложнения без повторов для клиента"""
+    category = ChallengeCategory(name="Категория")
+    db_session.add(category)
+    db_session.flush()
+    db_session.add_all([
+        Challenge(name=f"Задание {i}", description="", category_id=category.id)
+        for i in range(6)
+    ])
+    db_session.commit()
+
+    names = [get_random_challenge(db_session, client_id="client-1")["challenge"].name
+             for _ in range(6)]
+
+    assert len(set(names)) == 6
+
+
+def test_api_random_challenge_no_repeat(client, db_session, clean_db):
+    """Эндпоинт выдает cookie клиента и не повторяет усложнения"""
+    category = ChallengeCategory(name="Категория")
+    db_session.add(category)
+    db_session.flush()
+    db_session.add_all([
+        Challenge(name=f"Задание {i}", description="", category_id=category.id)
+        for i in range(4)
+    ])
+    db_session.commit()
+
+    names = []
+    for _ in range(4):
+        response = client.get("/api/random-challenge", params={"no_repeat": "true"})
+        assert response.status_code == status.HTTP_200_OK
+        names.append(response.json()["name"])
+
+    assert "client_id" in client.cookies
+    assert len(set(names)) == 4
+
+
+def test_api_random_challenge_invalid_weight(client, sample_challenge_data):
+    response = client.get("/api/random-challenge",
+                          params={"no_repeat": "true", "weight": "Test Category:abc"})
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+@pytest.mark.parametrize("weight", ["inf", "nan"])
+def test_api_random_challenge_non_finite_weight(client, sample_challenge_data, weight):
+    response = client.get("/api/random-challenge",
+                          params={"no_repeat": "true", "weight": f"Test Category:{weight}"})
+    assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+
+def test_api_random_challenge_all_weights_zero(client, sample_challenge_data):
+    """Если все категории исключены весами, усложнение не выдается из других"""
+    response = client.get("/api/random-challenge",
+                          params={"no_repeat": "true", "weight": "Test Category:0"})
+    assert response.status_code == status.HTTP_404_NOT_FOUND
@@ -0,0 +1,102 @@
+import time
+
+from fastapi import status
+
+from app.health import Check, HealthChecker
+
+
+def failing():
+    raise RuntimeError("нет соединения")
+
+
+def slow():
+    time.sleep(0.02)
+    return {"detail": 1}
+
+
+def test_checker_starting_until_first_run():
+    checker = HealthChecker([Check("db", lambda: {}, 100)])
+    assert checker.readiness() == (False, b'{"status":"starting"}')
+
+
+def test_checker_statuses():
+    """Обязательная проверка решает готовность, остальные только отмечаются"""
+    checker = HealthChecker([
+        Check("db", lambda: {"dialect": "sqlite"}, 100),
+        Check("color_source", failing, 100, critical=False),
+        Check("catalog", slow, 1),
+    ])
+    body = checker.run_once()
+
+    assert body["status"] == "degraded"
+    assert body["checks"]["db"]["status"] == "ok"
+    assert body["checks"]["db"]["dialect"] == "sqlite"
+    assert body["checks"]["color_source"]["status"] == "fail"
+    assert body["checks"]["color_source"]["error"] == "нет соединения"
+    assert body["checks"]["catalog"]["status"] == "slow"
+    assert body["checks"]["catalog"]["latency_ms"] > body["checks"]["catalog"]["budget_ms"]
+    assert checker.readiness()[0] is True
+
+    checker.checks.append(Check("pool", lambda: {"failed": "Все соединения пула заняты"}, 100, critical=False))
+    pool = checker.run_once()["checks"]["pool"]
+    assert pool["status"] == "fail"
+    assert pool["error"] == "Все соединения пула заняты"
+    assert checker.readiness()[0] is True
+
+    checker.checks[0] = Check("db", failing, 100)
+    assert checker.run_once()["status"] == "not_ready"
+    assert checker.readiness()[0] is False
+
+
+def test_checker_stale_results():
+    """Результаты, которые давно не обновлялись, не считаются готовностью"""
+    checker = HealthChecker([Check("db", lambda: {}, 100)], stale_after=0.01)
+    checker.run_once()
+    assert checker.readiness()[0] is True
+
+    time.sleep(0.02)
+    ready, body = checker.readiness()
+    assert ready is False
+    assert b'"stale"' in body
+
+
+def test_checker_stop_waits_for_thread():
+    """После stop() поток больше не проверяет зависимости"""
+    checker = HealthChecker([Check("db", lambda: {}, 100)], interval=0.01)
+    checker.start()
+    time.sleep(0.05)
+    checker.stop()
+    runs = checker.runs
+
+    time.sleep(0.05)
+    assert runs > 0
+    assert checker.runs == runs
+
+
+def test_health_live(client):
+    response = client.get("/api/health/live")
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()["status"] == "alive"
+    assert response.json()["uptime"] >= 0
+
+
+def test_health_ready_served_from_cache(client, sample_challenge_data, health_checker, monkeypatch):
+    """Проба отдает результат фоновой проверки и сама зависимости не трогает"""
+    health_checker.run_once()
+
+    response = client.get("/api/health/ready")
+    assert response.status_code == status.HTTP_200_OK
+    checks = response.json()["checks"]
+    assert checks["database"]["status"] == "ok"
+    assert checks["catalog"]["challenges"] > 0
+    assert "pool" in checks
+
+    monkeypatch.setattr(health_checker.checks[0], "func", failing)
+    assert client.get("/api/health/ready").status_code == status.HTTP_200_OK
+
+    health_checker.run_once()
+    response = client.get("/api/health/ready")
+    assert response.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+    assert response.json()["status"] == "not_ready"
+    assert response.json()["checks"]["database"]["error"] == "нет соединения"
@@ -0,0 +1,148 @@
+import pytest
+import time
+from datetime import datetime, timedelta
+from sqlalchemy import inspect
+from sqlalchemy.orm import sessionmaker
+
+from app import history
+from app.history import HistoryWriter, apply_retention, ensure_partitions, partition_name
+from app.models import GenerationHistory
+
+
+@pytest.fixture
+def session_factory(db_engine):
+    ensure_partitions(db_engine)
+    factory = sessionmaker(autocommit=False, autoflush=False, bind=db_engine)
+    db = factory()
+    db.query(GenerationHistory).delete()
+    db.commit()
+    db.close()
+    return factory
+
+
+def count_rows(session_factory):
+    db = session_factory()
+    try:
+        return db.query(GenerationHistory).count()
+    finally:
+        db.close()
+
+
+def test_writer_flushes_by_batch_size(session_factory):
+    """Пачка записывается, как только набран batch_size"""
+    writer = HistoryWriter(session_factory, batch_size=5, flush_interval=60)
+    writer.start()
+    try:
+        for i in range(5):
+            writer.record('word', word=f"слово{i}")
+
+        deadline = time.monotonic() + 5
+        while writer.written < 5 and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+        assert writer.written == 5
+        assert writer.batches == 1
+    finally:
+        writer.stop()
+
+    assert count_rows(session_factory) == 5
+
+
+def test_writer_flushes_by_interval(session_factory):
+    """Неполная пачка записывается по истечении интервала"""
+    writer = HistoryWriter(session_factory, batch_size=100, flush_interval=0.05)
+    writer.start()
+    try:
+        writer.record('color', color={'name': 'Red', 'hex': '#FF0000'})
+
+        deadline = time.monotonic() + 5
+        while writer.written < 1 and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+        assert writer.written == 1
+    finally:
+        writer.stop()
+
+
+def test_writer_drains_on_stop(session_factory):
+    """При остановке вся очередь дописывается в БД"""
+    writer = HistoryWriter(session_factory, batch_size=10, flush_interval=60)
+    writer.start()
+    for i in range(25):
+        writer.record('all', color={'name': 'Red', 'hex': '#FF0000'}, word="слово",
+                      challenge={'category': 'Категория', 'name': f"Задание {i}"}, challenge_id=i)
+    writer.stop()
+
+    assert writer.written == 25
+    assert count_rows(session_factory) == 25
+
+
+def test_writer_drops_when_queue_full(session_factory):
+    """Переполнение очереди не блокирует запрос, запись отбрасывается"""
+    writer = HistoryWriter(session_factory, max_queue=2)
+
+    for _ in range(3):
+        writer.record('word', word="слово")
+
+    assert writer.dropped == 1
+
+
+def test_apply_retention(session_factory, db_engine):
+    """Записи старше срока хранения удаляются"""
+    now = datetime.utcnow()
+    db = session_factory()
+    db.add_all([
+        GenerationHistory(created_at=now - timedelta(days=10), kind='word', word="новое"),
+        GenerationHistory(created_at=now - timedelta(days=400), kind='word', word="старое"),
+    ])
+    db.commit()
+    db.close()
+
+    apply_retention(db_engine, now=now, retention_days=365)
+
+    db = session_factory()
+    assert [row.word for row in db.query(GenerationHistory).all()] == ["новое"]
+    db.close()
+
+
+def test_retention_creates_created_at_index(db_engine):
+    """Для удаления по дате есть индекс, даже если БД создана до его появления"""
+    if db_engine.dialect.name == "postgresql":
+        pytest.skip("в PostgreSQL удаляются секции")
+
+    # БД, созданная до появления индекса
+    index, = GenerationHistory.__table__.indexes
+    index.drop(db_engine)
+    apply_retention(db_engine, retention_days=365)
+
+    indexes = inspect(db_engine).get_indexes("generation_history")
+    assert [index["column_names"] for index in indexes] == [["created_at"]]
+
+
+def test_partition_name():
+    assert partition_name(datetime(2024, 1, 1)) == "generation_history_y2024m01"
+
+
+def test_api_records_history(client, mock_requests, sample_color_data):
+    """Эндпоинты ставят сгенерированные значения в очередь истории"""
+    from unittest.mock import Mock
+
+    mock_response = Mock()
+    mock_response.json.return_value = sample_color_data
+    mock_requests.get.return_value = mock_response
+
+    recorded = []
+    writer = Mock()
+    writer.record.side_effect = lambda kind, **fields: recorded.append((kind, fields))
+
+    original = history.writer
+    history.writer = writer
+    try:
+        client.get("/api/random-color")
+        client.get("/api/random-word", params={"seed": "1"})
+    finally:
+        history.writer = original
+
+    assert recorded[0][0] == 'color'
+    assert recorded[0][1]['color'] == {'name': 'Test Blue', 'hex': '#0000FF'}
+    assert recorded[1][0] == 'word'
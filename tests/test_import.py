@@ -0,0 +1,144 @@
+import json
+import warnings
+
+import pytest
+from fastapi import status
+from sqlalchemy.exc import SAWarning
+
+from app import catalog, importer
+from app.cache import get_cache
+from app.importer import iter_lines
+from app.models import Challenge, ChallengeCategory
+
+TOKEN = "секрет".encode("utf-8").hex()
+AUTH = {"Authorization": f"Bearer {TOKEN}"}
+
+TEXT_BODY = """Категория: Техника
+- Акварель: Только акварельные краски
+- Без описания
+просто строка
+
+Категория: Формат
+- Квадрат: Холст 1:1
+"""
+
+
+@pytest.fixture
+def admin(monkeypatch):
+    monkeypatch.setattr("app.main.ADMIN_TOKEN", TOKEN)
+
+
+def test_iter_lines_chunk_boundaries():
+    """Строки и многобайтные символы могут разрываться между кусками"""
+    data = "первая\nвторая\r\nтретья".encode("utf-8")
+    chunks = [data[i:i + 3] for i in range(0, len(data), 3)]
+
+    assert list(iter_lines(chunks)) == [(1, "первая"), (2, "вторая\r"), (3, "третья")]
+
+
+def test_iter_lines_too_long_and_invalid():
+    chunks = [b"ok\n", b"x" * 10, b"x" * 10 + b"\n", b"\xff\xfe\n", b"tail"]
+
+    assert list(iter_lines(chunks, max_line_bytes=15)) == [(1, "ok"), (2, None), (3, None), (4, "tail")]
+
+
+def test_import_requires_token(client, monkeypatch):
+    assert client.post("/api/admin/import", content=TEXT_BODY).status_code == status.HTTP_403_FORBIDDEN
+
+    monkeypatch.setattr("app.main.ADMIN_TOKEN", TOKEN)
+    response = client.post("/api/admin/import", content=TEXT_BODY, headers={"Authorization": "Bearer nope"})
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
+    assert client.post("/api/admin/import", content=TEXT_BODY).status_code == status.HTTP_401_UNAUTHORIZED
+
+
+def test_import_text_reports_line_errors(client, db_session, sample_challenge_data, admin):
+    """Корректные строки импортируются, ошибочные перечислены с номерами"""
+    old_version = client.get("/api/catalog").json()["version"]
+
+    response = client.post("/api/admin/import", content=TEXT_BODY.encode("utf-8"), headers=AUTH)
+
+    assert response.status_code == status.HTTP_200_OK
+    report = response.json()
+    assert report["committed"] is True
+    assert report["imported"] == 2
+    assert report["categories_created"] == 2
+    assert report["lines"] == 7
+    assert [error["line"] for error in report["errors"]] == [3, 4]
+
+    catalog = client.get("/api/catalog").json()
+    assert catalog["version"] == report["catalog_version"] != old_version
+    assert {c[2] for c in catalog["challenges"]} == {"Test Challenge", "Акварель", "Квадрат"}
+    square = db_session.query(Challenge).filter_by(name="Квадрат").one()
+    assert square.description == "Холст 1:1"
+
+
+def test_import_ndjson(client, db_session, sample_challenge_data, admin):
+    lines = [
+        {"category": "Test Category", "name": "Из NDJSON", "description": None},
+        {"category": "Новая", "name": "x" * 101},
+        "[1, 2]",
+        {"category": "Новая", "name": "Второе", "description": "Описание"},
+    ]
+    body = "\n".join(line if isinstance(line, str) else json.dumps(line, ensure_ascii=False) for line in lines)
+
+    response = client.post("/api/admin/import", content=body.encode("utf-8"),
+                           headers={**AUTH, "Content-Type": "application/x-ndjson"})
+
+    report = response.json()
+    assert report["format"] == "ndjson"
+    assert report["imported"] == 2
+    assert report["categories_created"] == 1
+    assert [error["line"] for error in report["errors"]] == [2, 3]
+    # Существующая категория используется повторно
+    assert db_session.query(ChallengeCategory).filter_by(name="Test Category").count() == 1
+
+
+def test_import_strict_rolls_back(client, db_session, sample_challenge_data, admin):
+    response = client.post("/api/admin/import?strict=true", content=TEXT_BODY.encode("utf-8"), headers=AUTH)
+
+    assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+    assert response.json()["committed"] is False
+    assert response.json()["error_count"] == 2
+    assert db_session.query(Challenge).count() == 1
+
+
+def test_import_replace(client, db_session, sample_challenge_data, admin, monkeypatch):
+    monkeypatch.setattr(importer, "IMPORT_BATCH_SIZE", 1)
+    batches = []
+    flush = importer.ChallengeImporter.flush
+
+    def counting_flush(self):
+        if self._batch:
+            batches.append(len(self._batch))
+        flush(self)
+
+    monkeypatch.setattr(importer.ChallengeImporter, "flush", counting_flush)
+
+    with warnings.catch_warnings():
+        warnings.simplefilter("error", SAWarning)
+        response = client.post("/api/admin/import?replace=true&format=text",
+                               content=TEXT_BODY.encode("utf-8"), headers=AUTH)
+
+    assert response.json()["committed"] is True
+    assert batches == [1, 1]
+    assert {c.name for c in db_session.query(Challenge)} == {"Акварель", "Квадрат"}
+    assert client.get("/api/random-challenge?category=Test Category").status_code == status.HTTP_404_NOT_FOUND
+
+    # Пустой импорт не может стереть каталог
+    response = client.post("/api/admin/import?replace=true", content="мусор\n".encode("utf-8"), headers=AUTH)
+    assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+    assert db_session.query(Challenge).count() == 2
+
+
+def test_import_seen_by_other_processes(db_session, sample_challenge_data, monkeypatch):
+    """Процесс переходит на каталог, замененный в другом процессе, не дожидаясь CATALOG_TTL"""
+    old = catalog.get_catalog(db_session)
+    monkeypatch.setattr(catalog, "CATALOG_VERSION_CHECK_INTERVAL", 0)
+
+    # Другой процесс импортировал каталог и записал его в общий кэш
+    new = catalog.CatalogSnapshot([{"id": 1, "category": "Новая", "name": "Импорт", "description": None}])
+    get_cache().set(catalog.CATALOG_CACHE_KEY, {"version": new.version, "challenges": list(new.challenges)}, 60)
+    get_cache().set(catalog.CATALOG_VERSION_KEY, new.version, None)
+
+    assert old.is_fresh()
+    assert catalog.get_catalog(db_session).version == new.version
@@ -0,0 +1,116 @@
+import pytest
+from unittest.mock import patch, Mock
+from fastapi import status
+
+from app import instrumentation
+from app.instrumentation import QUERY_BUDGETS, QueryBudgetExceeded, query_budget
+from app.crud import get_random_challenge
+
+
+@pytest.fixture
+def mock_color(mock_requests, sample_color_data):
+    mock_response = Mock()
+    mock_response.status_code = 200
+    mock_response.json.return_value = sample_color_data
+    mock_requests.get.return_value = mock_response
+    return mock_response
+
+
+@pytest.mark.parametrize("path", sorted(QUERY_BUDGETS))
+def test_endpoint_query_budget(client, db_session, mock_color, sample_challenge_data, health_checker, path):
+    """Эндпоинты не должны превышать заявленный бюджет SQL-запросов"""
+    db_session.expire_all()
+    if path == "/api/health/ready":
+        # Фоновые проверки в тестах не запущены — проверяем зависимости заранее
+        health_checker.run_once()
+
+    with query_budget(QUERY_BUDGETS[path]):
+        response = client.get(path)
+
+    assert response.status_code == status.HTTP_200_OK
+
+
+def test_get_random_challenge_no_lazy_load(db_session, sample_challenge_data):
+    """Категория загружается тем же запросом, что и усложнение"""
+    db_session.expire_all()
+
+    with query_budget(1) as stats:
+        result = get_random_challenge(db_session)
+        assert result["category"].name == "Test Category"
+
+    assert stats.count == 1
+
+
+def test_query_budget_exceeded(db_session, sample_challenge_data):
+    """Ленивая загрузка связи превышает бюджет в один запрос"""
+    from app.models import Challenge
+
+    db_session.expire_all()
+
+    with pytest.raises(QueryBudgetExceeded):
+        with query_budget(1):
+            challenge = db_session.query(Challenge).first()
+            _ = challenge.category.name
+
+
+def test_query_budget_ignores_background_threads(client, db_engine, sample_challenge_data):
+    """Запросы фоновых потоков вне HTTP-запроса не расходуют бюджет эндпоинта"""
+    import threading
+    from sqlalchemy import text
+
+    def background():
+        with db_engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+
+    with query_budget(1) as stats:
+        thread = threading.Thread(target=background)
+        thread.start()
+        thread.join()
+        assert client.get("/api/random-challenge").status_code == status.HTTP_200_OK
+
+    assert stats.count == 1
+
+
+def test_metrics_endpoint(client, sample_challenge_data):
+    """Метрики содержат число запросов и время БД по эндпоинтам"""
+    instrumentation.reset_metrics()
+    client.get("/api/random-challenge")
+
+    response = client.get("/api/metrics")
+
+    assert response.status_code == status.HTTP_200_OK
+    db_metrics = response.json()["db"]["/api/random-challenge"]
+    assert db_metrics["requests"] == 1
+    assert db_metrics["queries"] == 1
+    assert db_metrics["budget"] == QUERY_BUDGETS["/api/random-challenge"]
+    assert db_metrics["slowest_statement"] is not None
+
+
+def test_metrics_only_for_routes(client, sample_challenge_data):
+    """Несуществующие пути и статика не добавляют записей в метрики"""
+    instrumentation.reset_metrics()
+    for i in range(3):
+        client.get(f"/nope-{i}")
+        client.get(f"/static/x{i}.css")
+    client.get("/static/css/main.css")
+    client.get("/api/random-challenge?category=Test Category")
+
+    assert set(client.get("/api/metrics").json()["db"]) == {"/api/random-challenge"}
+
+
+def test_debug_headers(client, sample_challenge_data):
+    """В режиме отладки статистика отдается в заголовках"""
+    with patch.object(instrumentation, 'DEBUG', True):
+        response = client.get("/api/random-challenge")
+
+    assert response.headers["X-DB-Query-Count"] == "1"
+    assert "X-DB-Time-Ms" in response.headers
+    assert "X-DB-Slowest-Ms" in response.headers
+
+
+def test_no_debug_headers(client, sample_challenge_data):
+    """Без режима отладки заголовки не выставляются"""
+    with patch.object(instrumentation, 'DEBUG', False):
+        response = client.get("/api/random-challenge")
+
+    assert "X-DB-Query-Count" not in response.headers
@@ -68,4 +68,19 @@ def test_challenge_without_category(db_session, clean_db):
     with pytest.raises(IntegrityError):
         db_session.commit()
 
-    db_session.rollback()
\ No newline at end of file
+    db_session.rollback()
+
+
+def test_create_missing_indexes(db_engine):
+    """Индекс по категории появляется и в БД, созданной до него"""
+    from sqlalchemy import inspect, text
+    from app.models import create_missing_indexes
+
+    with db_engine.begin() as conn:
+        conn.execute(text("DROP INDEX ix_challenges_category_id_id"))
+
+    create_missing_indexes(db_engine)
+    create_missing_indexes(db_engine)
+
+    indexes = {index["name"] for index in inspect(db_engine).get_indexes("challenges")}
+    assert "ix_challenges_category_id_id" in indexes
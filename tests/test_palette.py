@@ -0,0 +1,54 @@
+import pytest
+from fastapi import status
+
+from app.colors import nearest_color_name, nearest_color_names
+from app.palette import build_palette
+
+
+def test_build_palette_harmonies():
+    """Гармонии красного считаются поворотом оттенка"""
+    palette = build_palette("#FF0000")
+
+    assert palette['base'] == {'name': 'Red', 'hex': '#FF0000'}
+    assert [c['hex'] for c in palette['palettes']['complementary']] == ['#FF0000', '#00FFFF']
+    assert [c['name'] for c in palette['palettes']['triadic']] == ['Red', 'Lime', 'Blue']
+    assert palette['palettes']['analogous'][1]['hex'] == '#FF0000'
+
+
+def test_build_palette_selected_schemes():
+    """Можно запросить только нужные гармонии; неизвестная — ошибка"""
+    palette = build_palette("f00", ["triadic"])
+    assert list(palette['palettes']) == ['triadic']
+
+    with pytest.raises(ValueError, match="rainbow"):
+        build_palette("#FF0000", ["rainbow"])
+
+
+def test_nearest_color_names_batch():
+    """Пакетный подбор названий совпадает с поштучным"""
+    hexes = ['#010203', '#7FFFD0', '#FF1493', '#123456', '#FEFEFE']
+    assert nearest_color_names(hexes) == [nearest_color_name(h) for h in hexes]
+
+
+def test_api_palette(client, mock_requests):
+    """Палитра по hex кэшируется и не обращается к сервису цветов"""
+    response = client.get("/api/palette", params={"hex": "#FF0000", "scheme": "complementary"})
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()['palettes']['complementary'][1]['name'] == 'Aqua'
+    assert "ETag" in response.headers
+    mock_requests.get.assert_not_called()
+
+    generated = client.get("/api/palette")
+    assert generated.status_code == status.HTTP_200_OK
+    assert set(generated.json()['palettes']) == {'complementary', 'triadic', 'analogous'}
+
+    seeded = client.get("/api/palette", params={"seed": "abc"})
+    assert seeded.json() == client.get("/api/palette", params={"seed": "abc"}).json()
+
+
+def test_api_palette_invalid(client):
+    assert client.get("/api/palette", params={"hex": "#GG0000"}).status_code == \
+        status.HTTP_422_UNPROCESSABLE_ENTITY
+    assert client.get("/api/palette", params={"scheme": "rainbow"}).status_code == \
+        status.HTTP_400_BAD_REQUEST
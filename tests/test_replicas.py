@@ -0,0 +1,163 @@
+import time
+
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+
+from app import crud, database
+from app.database import Base
+from app.replicas import ReplicaRouter
+
+
+def make_replica(path, name):
+    """SQLite-файл вместо реплики PostgreSQL; таблица marker отличает реплики"""
+    url = f"sqlite:///{path}"
+    engine = create_engine(url)
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE marker (name TEXT)"))
+        conn.execute(text("INSERT INTO marker VALUES (:name)"), {"name": name})
+    engine.dispose()
+    return url
+
+
+def read_marker(replica):
+    with replica.session_factory() as session:
+        return session.execute(text("SELECT name FROM marker")).scalar()
+
+
+@pytest.fixture
+def replica_urls(tmp_path):
+    return [make_replica(tmp_path / "r1.db", "r1"), make_replica(tmp_path / "r2.db", "r2")]
+
+
+def test_round_robin(replica_urls):
+    router = ReplicaRouter(replica_urls, create_engine)
+
+    names = []
+    for _ in range(4):
+        replica = router.acquire()
+        names.append(read_marker(replica))
+        router.release(replica)
+
+    assert names == ["r1", "r2", "r1", "r2"]
+    assert [r["sessions"] for r in router.metrics()["replicas"]] == [2, 2]
+
+
+def test_least_connections(replica_urls):
+    router = ReplicaRouter(replica_urls, create_engine, balancing="least_connections")
+
+    busy = router.acquire()
+    for _ in range(3):
+        replica = router.acquire()
+        assert replica is not busy
+        router.release(replica)
+
+
+def test_unhealthy_replica_skipped_and_recovered(tmp_path, replica_urls):
+    """Недоступная реплика пропускается и возвращается после восстановления"""
+    missing = tmp_path / "missing"
+    router = ReplicaRouter([f"sqlite:///{missing}/r3.db", replica_urls[0]], create_engine)
+
+    router.check_health()
+    for _ in range(3):
+        replica = router.acquire()
+        assert read_marker(replica) == "r1"
+        router.release(replica)
+    assert router.metrics()["replicas"][0]["healthy"] is False
+
+    missing.mkdir()
+    make_replica(missing / "r3.db", "r3")
+    router.check_health()
+    names = set()
+    for _ in range(2):
+        replica = router.acquire()
+        names.add(read_marker(replica))
+        router.release(replica)
+    assert names == {"r1", "r3"}
+
+
+def test_get_read_db_falls_back_to_primary(tmp_path, monkeypatch):
+    """Без исправных реплик чтение идет в основную БД"""
+    router = ReplicaRouter([f"sqlite:///{tmp_path}/missing/r.db"], create_engine)
+    router.check_health()
+    monkeypatch.setattr(database, "replica_router", router)
+
+    dependency = database.get_read_db()
+    db = next(dependency)
+    assert db.get_bind() is database.engine
+    dependency.close()
+
+    assert router.metrics()["fallbacks"] == 1
+
+
+def test_get_read_db_uses_replica(replica_urls, monkeypatch):
+    router = ReplicaRouter(replica_urls[:1], create_engine)
+    monkeypatch.setattr(database, "replica_router", router)
+
+    dependency = database.get_read_db()
+    db = next(dependency)
+    assert db.execute(text("SELECT name FROM marker")).scalar() == "r1"
+    assert router.replicas[0].active == 1
+    dependency.close()
+    assert router.replicas[0].active == 0
+
+
+def test_health_checked_in_background(tmp_path, replica_urls):
+    """Реплики проверяет фоновый поток, выбор реплики их не трогает"""
+    router = ReplicaRouter([f"sqlite:///{tmp_path}/missing/r.db", replica_urls[0]], create_engine,
+                           health_interval=0.01)
+    assert router.acquire().url.endswith("missing/r.db")
+
+    router.start()
+    deadline = time.monotonic() + 2
+    while router.metrics()["replicas"][0]["healthy"] and time.monotonic() < deadline:
+        time.sleep(0.01)
+    router.stop()
+
+    assert router.metrics()["replicas"][0]["healthy"] is False
+    assert router.metrics()["replicas"][0]["failures"] >= 1
+
+
+def test_lagging_replica_reads_primary(tmp_path, db_engine, db_session, sample_challenge_data, monkeypatch):
+    """Усложнение, которого еще нет на реплике, читается из основной БД без сброса каталога"""
+    replica_url = f"sqlite:///{tmp_path / 'lagging.db'}"
+    Base.metadata.create_all(bind=create_engine(replica_url))
+    router = ReplicaRouter([replica_url], create_engine)
+    monkeypatch.setattr(crud, "replica_router", router)
+    monkeypatch.setattr(crud, "SessionLocal", sessionmaker(bind=db_engine))
+    monkeypatch.setattr(crud, "invalidate_catalog", lambda: pytest.fail("каталог сброшен"))
+
+    crud.get_catalog(db_session)
+    replica = router.acquire()
+    replica_db = replica.session_factory()
+    try:
+        result = crud.get_random_challenge_in_categories(replica_db, ["Test Category"])
+        assert result["challenge"].name == "Test Challenge"
+        assert result["category"].name == "Test Category"
+
+        result = crud.get_next_challenge_for_client(replica_db, "client-1")
+        assert result["challenge"].name == "Test Challenge"
+    finally:
+        replica_db.close()
+        router.release(replica)
+
+
+def test_read_sessions_acquire_replica_per_session(replica_urls, monkeypatch):
+    """Долгое соединение берет реплику на каждую сессию и не держит ее между ними"""
+    router = ReplicaRouter(replica_urls, create_engine)
+    monkeypatch.setattr(database, "replica_router", router)
+    read_sessions = database.get_read_sessions()
+
+    names = []
+    for _ in range(2):
+        with read_sessions() as db:
+            names.append(db.execute(text("SELECT name FROM marker")).scalar())
+            assert sum(replica.active for replica in router.replicas) == 1
+    assert names == ["r1", "r2"]
+    assert sum(replica.active for replica in router.replicas) == 0
+
+    # Реплики вышли из строя — следующая сессия читает из основной БД
+    for replica in router.replicas:
+        replica.healthy = False
+    with read_sessions() as db:
+        assert db.get_bind() is database.engine
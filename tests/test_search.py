@@ -0,0 +1,82 @@
+import pytest
+from fastapi import status
+
+from app.catalog import CatalogSnapshot
+from app.crud import load_data_from_file
+from app.search import SearchIndex, bounded_levenshtein, get_search_index, tokenize
+
+
+@pytest.fixture(scope="module")
+def index():
+    """Индекс по каталогу из data.txt"""
+    challenges = []
+    for category in load_data_from_file("data.txt"):
+        for challenge in category['challenges']:
+            challenges.append({
+                'id': len(challenges) + 1,
+                'category': category['name'],
+                'name': challenge['name'],
+                'description': challenge['description']
+            })
+    return SearchIndex(CatalogSnapshot(challenges))
+
+
+def test_tokenize():
+    assert tokenize("Золотое Сечение: ёлка") == ["золотое", "сечение", "елка"]
+
+
+def test_bounded_levenshtein():
+    assert bounded_levenshtein("композиция", "композиция", 2) == 0
+    assert bounded_levenshtein("композиция", "кампозиция", 2) == 1
+    assert bounded_levenshtein("реализм", "сюрреализм", 1) == 2
+
+
+def test_search_exact_ranks_name_first():
+    """Совпадение в названии ранжируется выше совпадения в описании"""
+    index = SearchIndex(CatalogSnapshot([
+        {'id': 1, 'category': 'Стиль', 'name': 'Линии', 'description': 'Композиция из одних линий'},
+        {'id': 2, 'category': 'Стиль', 'name': 'Композиция', 'description': 'Расположение объектов'},
+    ]))
+
+    results = index.search("композиция")
+
+    assert [r['id'] for r in results] == [2, 1]
+    assert results[0]['score'] > results[1]['score']
+
+
+def test_search_prefix(index):
+    """Слово запроса находит словоформы по префиксу"""
+    names = {r['name'] for r in index.search("минут")}
+    assert {"5 минут", "1 минута"} <= names
+
+
+def test_search_typo(index):
+    """Поиск терпит опечатки"""
+    assert index.search("импрессианизм")[0]['name'] == "Импрессионизм"
+    assert index.search("сюрреолизм")[0]['name'] == "Сюрреализм"
+
+
+def test_search_no_results(index):
+    assert index.search("квантовая хромодинамика") == []
+
+
+def test_search_index_cached_by_version(index):
+    snapshot = CatalogSnapshot(list(index.documents))
+    first = get_search_index(snapshot)
+    assert get_search_index(CatalogSnapshot(list(index.documents))) is first
+
+
+def test_api_search(client, sample_challenge_data):
+    """Тест API поиска по каталогу"""
+    response = client.get("/api/challenges/search", params={"q": "chalenge"})
+
+    assert response.status_code == status.HTTP_200_OK
+    data = response.json()
+    assert data["query"] == "chalenge"
+    assert data["results"][0]["name"] == "Test Challenge"
+    assert data["results"][0]["category"] == "Test Category"
+
+
+def test_api_search_requires_query(client):
+    response = client.get("/api/challenges/search")
+    assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
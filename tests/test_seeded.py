@@ -0,0 +1,84 @@
+import pytest
+from fastapi import status
+
+from app.seeded import seeded_color, seeded_word, seeded_triple
+
+
+def test_seeded_color_deterministic():
+    """Одинаковый seed дает одинаковый цвет"""
+    assert seeded_color("class-7b") == seeded_color("class-7b")
+    assert seeded_color("class-7b")['hex'].startswith('#')
+
+
+def test_seeded_word_deterministic():
+    """Одинаковый seed дает одинаковое слово"""
+    assert seeded_word("42") == seeded_word("42")
+    words = {seeded_word(str(i)) for i in range(20)}
+    assert len(words) > 1
+
+
+def test_seeded_triple(db_session, sample_challenge_data):
+    """Тройка с seed берет усложнение из снимка каталога"""
+    triple = seeded_triple(db_session, "today")
+
+    assert triple == seeded_triple(db_session, "today")
+    assert triple['challenge']['name'] == "Test Challenge"
+
+
+def test_api_random_all_seeded_no_upstream(client, mock_requests, sample_challenge_data):
+    """Запрос с seed не обращается к внешнему сервису цветов"""
+    first = client.get("/api/random-all", params={"seed": "lesson-1"})
+    second = client.get("/api/random-all", params={"seed": "lesson-1"})
+
+    assert first.status_code == status.HTTP_200_OK
+    assert first.json() == second.json()
+    assert first.json()['challenge']['category'] == "Test Category"
+    mock_requests.get.assert_not_called()
+
+
+def test_api_seeded_cache_headers(client, sample_challenge_data):
+    """Ответы с seed содержат сильный ETag и поддерживают If-None-Match"""
+    response = client.get("/api/random-challenge", params={"seed": "abc"})
+
+    assert response.status_code == status.HTTP_200_OK
+    etag = response.headers["ETag"]
+    assert etag.startswith('"') and not etag.startswith('W/')
+    assert "max-age" in response.headers["Cache-Control"]
+
+    cached = client.get("/api/random-challenge", params={"seed": "abc"},
+                        headers={"If-None-Match": etag})
+    assert cached.status_code == status.HTTP_304_NOT_MODIFIED
+    assert cached.headers["ETag"] == etag
+
+
+@pytest.mark.parametrize("path", ["/api/random-color", "/api/random-word"])
+def test_api_seeded_parts_match_random_all(client, sample_challenge_data, path):
+    """Части тройки с seed совпадают с отдельными эндпоинтами"""
+    all_data = client.get("/api/random-all", params={"seed": "s"}).json()
+    part = client.get(path, params={"seed": "s"}).json()
+
+    if path == "/api/random-color":
+        assert part == all_data['color']
+    else:
+        assert part['word'] == all_data['word']
+
+
+def test_api_random_all_empty_catalog(client, mock_requests, clean_db):
+    """При пустом каталоге seed не превращает ответ в 404: отдается базовое задание"""
+    from app.catalog import FALLBACK_CHALLENGE
+    from app.colors import random_color
+
+    response = client.get("/api/random-all", params={"seed": "s"})
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()['challenge'] == FALLBACK_CHALLENGE
+    assert response.json()['color'] == seeded_color("s")
+
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr("app.main.get_random_color", random_color)
+        response = client.get("/api/random-all")
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()['challenge'] == FALLBACK_CHALLENGE
+
+    # Выбранные категории, в которых ничего нет, — по-прежнему 404
+    response = client.get("/api/random-all", params={"seed": "s", "category": "Нет такой"})
+    assert response.status_code == status.HTTP_404_NOT_FOUND
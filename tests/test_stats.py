@@ -0,0 +1,146 @@
+import pytest
+from datetime import datetime, timedelta
+from fastapi import status
+
+from app import stats
+from app.models import UsageRollup
+from app.stats import UsageCounters, compact, top_items, usage_series
+
+
+@pytest.fixture
+def clean_rollups(db_session):
+    db_session.query(UsageRollup).delete()
+    db_session.commit()
+    yield
+    db_session.query(UsageRollup).delete()
+    db_session.commit()
+
+
+def test_merge_is_idempotent(db_session, clean_rollups):
+    """Повторное слияние не меняет агрегаты"""
+    now = datetime(2024, 5, 1, 12, 30)
+    counters = UsageCounters("worker-1")
+    for _ in range(3):
+        counters.record(challenge={'category': 'Стиль', 'name': 'Реализм'}, challenge_id=7, now=now)
+
+    assert counters.merge(db_session, now=now) > 0
+    assert counters.merge(db_session, now=now) == 0
+
+    # Даже повторная запись тех же значений ничего не удваивает
+    counters._dirty = set(counters._counts)
+    counters.merge(db_session, now=now)
+
+    assert top_items(db_session, "challenge", now) == [{"item": "7", "count": 3}]
+
+
+def test_workers_are_summed(db_session, clean_rollups):
+    """Агрегаты разных процессов суммируются при чтении"""
+    now = datetime(2024, 5, 1, 12, 30)
+    first = UsageCounters("worker-1")
+    second = UsageCounters("worker-2")
+
+    first.record(challenge={'category': 'Стиль'}, challenge_id=1, now=now)
+    second.record(challenge={'category': 'Стиль'}, challenge_id=1, now=now)
+    second.record(challenge={'category': 'Время'}, challenge_id=2, now=now)
+    first.merge(db_session, now=now)
+    second.merge(db_session, now=now)
+
+    assert top_items(db_session, "category", now) == [
+        {"item": "Стиль", "count": 2},
+        {"item": "Время", "count": 1},
+    ]
+
+    series = usage_series(db_session, "category", "hour", now)
+    assert {"bucket": "2024-05-01T12:00:00", "item": "Стиль", "count": 2} in series
+
+
+def test_incremental_merge(db_session, clean_rollups):
+    """Новые события после слияния доходят до агрегатов"""
+    now = datetime(2024, 5, 1, 12, 30)
+    counters = UsageCounters("worker-1")
+
+    counters.record(word="кот", now=now)
+    counters.merge(db_session, now=now)
+    counters.record(word="кот", now=now + timedelta(minutes=5))
+    counters.merge(db_session, now=now)
+
+    assert top_items(db_session, "word", now) == [{"item": "кот", "count": 2}]
+
+
+def test_old_buckets_forgotten(db_session, clean_rollups):
+    """Счетчики давно закрытых интервалов не копятся в памяти"""
+    counters = UsageCounters("worker-1")
+    old = datetime(2024, 5, 1, 12, 30)
+
+    counters.record(word="кот", now=old)
+    counters.merge(db_session, now=old + timedelta(days=3))
+
+    assert counters.metrics()["counters"] == 0
+
+
+def test_compact_closed_buckets(db_session, clean_rollups):
+    """Строки прежних процессов за закрытые интервалы сводятся в одну, суммы не меняются"""
+    old = datetime(2024, 5, 1, 12, 30)
+    now = old + timedelta(days=3)
+    for worker_id in ("worker-1", "worker-2", "worker-3"):
+        counters = UsageCounters(worker_id)
+        counters.record(word="кот", now=old)
+        counters.merge(db_session, now=old)
+    current = UsageCounters("worker-4")
+    current.record(word="кот", now=now)
+    current.merge(db_session, now=now)
+
+    compact(db_session, now=now)
+
+    assert top_items(db_session, "word", old) == [{"item": "кот", "count": 4}]
+    workers = {row.worker_id for row in db_session.query(UsageRollup)}
+    assert workers == {stats.COMPACTED_WORKER_ID, "worker-4"}
+
+    # Следующее сведение прибавляет к уже сведенным строкам
+    late = UsageCounters("worker-5")
+    late.record(word="кот", now=old)
+    late.merge(db_session, now=old)
+    compact(db_session, now=now)
+    assert top_items(db_session, "word", old) == [{"item": "кот", "count": 5}]
+    assert db_session.query(UsageRollup).filter_by(worker_id="worker-5").count() == 0
+
+
+def test_seeded_and_fallback_counts(client, db_session, sample_challenge_data, clean_rollups, monkeypatch):
+    """Выдача по seed учитывается по id усложнения, заглушка — нет"""
+    challenge = sample_challenge_data['challenge']
+    counters = UsageCounters("worker-api")
+    monkeypatch.setattr(stats, "counters", counters)
+    monkeypatch.setattr("app.main.get_random_color", lambda: {"name": "Red", "hex": "#FF0000"})
+
+    client.get("/api/random-challenge", params={"seed": "abc"})
+    client.get("/api/random-all", params={"seed": "abc"})
+    client.get("/api/random-all", params={"category": "Нет такой"})
+    counters.merge(db_session)
+
+    now = datetime.utcnow()
+    assert top_items(db_session, "challenge", now) == [{"item": str(challenge.id), "count": 2}]
+    assert top_items(db_session, "category", now) == [{"item": "Test Category", "count": 2}]
+
+
+def test_api_stats_popular(client, db_session, sample_challenge_data, clean_rollups):
+    """Тест API популярных усложнений"""
+    challenge = sample_challenge_data['challenge']
+    counters = UsageCounters("worker-api")
+    for _ in range(2):
+        counters.record(challenge={'category': 'Test Category'}, challenge_id=challenge.id)
+    counters.merge(db_session)
+
+    response = client.get("/api/stats/popular", params={"kind": "challenge", "days": 1})
+
+    assert response.status_code == status.HTTP_200_OK
+    items = response.json()["items"]
+    assert items[0]["count"] == 2
+    assert items[0]["name"] == "Test Challenge"
+
+    response = client.get("/api/stats/usage", params={"kind": "category"})
+    assert response.json()["series"][0]["item"] == "Test Category"
+
+
+def test_api_stats_invalid_kind(client):
+    response = client.get("/api/stats/popular", params={"kind": "unknown"})
+    assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
@@ -0,0 +1,81 @@
+from unittest.mock import patch
+
+from app.colors import random_color
+
+
+def test_ws_reroll_all_actions(client, sample_challenge_data):
+    """Через одно соединение можно перегенерировать все по отдельности"""
+    with patch('app.main.get_random_color', random_color), \
+            patch('app.main.get_random_word', return_value="тестовое_слово"), \
+            client.websocket_connect("/ws/reroll") as ws:
+        ws.send_json({"id": 1, "action": "color"})
+        color = ws.receive_json()
+        assert color["id"] == 1
+        assert color["data"]["hex"].startswith("#")
+
+        ws.send_json({"id": 2, "action": "word"})
+        assert ws.receive_json()["data"] == {"word": "тестовое_слово"}
+
+        ws.send_json({"id": 3, "action": "challenge", "no_repeat": True})
+        assert ws.receive_json()["data"]["name"] == "Test Challenge"
+
+        ws.send_json({"id": 4, "action": "all"})
+        triple = ws.receive_json()
+        assert triple["action"] == "all"
+        assert triple["data"]["word"] == "тестовое_слово"
+        assert triple["data"]["challenge"]["category"] == "Test Category"
+
+
+def test_ws_reroll_seed_matches_http(client, sample_challenge_data):
+    """С seed канал отдает то же, что и HTTP-эндпоинт"""
+    expected = client.get("/api/random-all", params={"seed": "abc"}).json()
+
+    with client.websocket_connect("/ws/reroll") as ws:
+        ws.send_json({"id": "x", "action": "all", "seed": "abc"})
+        assert ws.receive_json()["data"] == expected
+
+
+def test_ws_reroll_errors_keep_connection(client, clean_db):
+    """Ошибки возвращаются с id запроса, соединение остается открытым"""
+    with client.websocket_connect("/ws/reroll") as ws:
+        ws.send_text("не json")
+        assert ws.receive_json()["error"]["status"] == 400
+
+        ws.send_json({"id": 1, "action": "dance"})
+        assert ws.receive_json() == {
+            "id": 1,
+            "error": {"status": 400, "detail": "Неизвестное действие: dance"}
+        }
+
+        ws.send_json({"id": 2, "action": "challenge"})
+        assert ws.receive_json()["error"]["status"] == 404
+
+        with patch('app.main.get_random_word', return_value="слово"):
+            ws.send_json({"id": 3, "action": "word"})
+            assert ws.receive_json()["data"] == {"word": "слово"}
+
+
+def test_ws_reroll_invalid_fields_keep_connection(client, sample_challenge_data):
+    """Поля неверного типа и сбои обработки не закрывают соединение"""
+    with client.websocket_connect("/ws/reroll") as ws:
+        ws.send_json({"id": 1, "action": "challenge", "category": 5})
+        assert ws.receive_json()["error"]["status"] == 400
+
+        ws.send_json({"id": 2, "action": "challenge", "category": ["Test Category", 1]})
+        assert ws.receive_json()["error"]["status"] == 400
+
+        ws.send_json({"id": 3, "action": "all", "seed": "x" * 129})
+        assert ws.receive_json()["error"]["status"] == 400
+
+        ws.send_json({"id": 4, "action": "all", "seed": 42})
+        assert ws.receive_json()["error"]["status"] == 400
+
+        with patch('app.main.get_random_word', side_effect=RuntimeError("сбой")):
+            ws.send_json({"id": 5, "action": "word"})
+            assert ws.receive_json() == {
+                "id": 5,
+                "error": {"status": 500, "detail": "Внутренняя ошибка сервера"}
+            }
+
+        ws.send_json({"id": 6, "action": "challenge", "category": "Test Category"})
+        assert ws.receive_json()["data"]["name"] == "Test Challenge"
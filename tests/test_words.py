@@ -0,0 +1,51 @@
+import pytest
+from fastapi import status
+
+from app import words
+
+
+@pytest.fixture
+def fresh_pools(monkeypatch):
+    monkeypatch.setattr(words, "WORD_POOL_MAX_LOCALES", 2)
+    words.reset_pools()
+    yield
+    words.reset_pools()
+
+
+def test_normalize_locale():
+    assert words.normalize_locale(None) == words.DEFAULT_WORD_LOCALE
+    assert words.normalize_locale("EN_gb") == "en-gb"
+    with pytest.raises(ValueError):
+        words.normalize_locale("xx")
+
+
+def test_word_pools_lru(fresh_pools):
+    """Словари грузятся при первом обращении, лишние вытесняются"""
+    assert words.get_word_pool("en") is words.get_word_pool("en")
+    words.get_word_pool("de")
+    words.get_word_pool("en")
+    words.get_word_pool("uk")
+
+    metrics = words.pool_metrics()
+    assert metrics["resident"] == ["en", "uk"]
+    assert metrics["evictions"] == 1
+    assert metrics["locales"]["en"]["loads"] == 1
+    assert metrics["locales"]["de"]["words"] > 0
+    assert metrics["locales"]["de"]["bytes"] > 0
+
+    # Вытесненная локаль загружается заново
+    words.get_word_pool("de")
+    assert words.pool_metrics()["locales"]["de"]["loads"] == 2
+
+
+def test_api_random_word_locale(client, sample_challenge_data, fresh_pools):
+    response = client.get("/api/random-word", params={"locale": "en"})
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()["word"] in words.get_word_pool("en")
+
+    seeded = client.get("/api/random-all", params={"seed": "abc", "locale": "en"})
+    assert seeded.json()["word"] in words.get_word_pool("en")
+
+    assert client.get("/api/random-word", params={"locale": "klingon"}).status_code == \
+        status.HTTP_400_BAD_REQUEST